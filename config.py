@@ -6,15 +6,27 @@ Configurazioni globali del gioco
 
 import pygame
 
-# Inizializza pygame per ottenere le informazioni sul display
-pygame.init()
+# Valori calcolati solo al primo accesso: interrogare il display all'import
+# costringerebbe a inizializzare pygame prima del necessario
+_VALORI_PIGRI = ('info_schermo', 'schermo_larghezza_sicura', 'schermo_altezza_sicura')
 
-# Ottieni la risoluzione dello schermo
-info_schermo = pygame.display.Info()
 
-# Calcola dimensioni sicure (90% della risoluzione dello schermo)
-schermo_larghezza_sicura = int(info_schermo.current_w * 0.9)
-schermo_altezza_sicura = int(info_schermo.current_h * 0.9)
+def __getattr__(nome):
+    """Calcola al primo accesso le configurazioni che richiedono il display"""
+    if nome not in _VALORI_PIGRI:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+    # Ottieni la risoluzione dello schermo
+    info_schermo = pygame.display.Info()
+    globals()['info_schermo'] = info_schermo
+
+    # Calcola dimensioni sicure (90% della risoluzione dello schermo)
+    globals()['schermo_larghezza_sicura'] = int(info_schermo.current_w * 0.9)
+    globals()['schermo_altezza_sicura'] = int(info_schermo.current_h * 0.9)
+    return globals()[nome]
 
 # Dimensioni della finestra di menu
 MENU_LARGHEZZA = 1024
@@ -28,6 +40,11 @@ GIOCO_ALTEZZA = 600
 LARGHEZZA_SCHERMO = 1024
 ALTEZZA_SCHERMO = 768
 
+# Dimensioni della finestra: le scene vengono scalate per riempirla
+FINESTRA_LARGHEZZA = MENU_LARGHEZZA
+FINESTRA_ALTEZZA = MENU_ALTEZZA
+FINESTRA_ADATTA_SCHERMO = False  # Usa schermo_larghezza/altezza_sicura
+
 # Configurazioni della finestra
 TITOLO_GIOCO = "Invasori Infinito"
 
@@ -35,6 +52,50 @@ TITOLO_GIOCO = "Invasori Infinito"
 FPS = 60
 VELOCITA_GIOCATORE = 300  # pixel al secondo
 
+# Simulazione a passo fisso (il rendering resta libero di andare a FPS)
+PASSO_FISSO = True
+FREQUENZA_SIMULAZIONE = 60  # Tick logici al secondo
+MAX_TICK_PER_FRAME = 5  # Protezione contro la "spirale della morte"
+MAX_DURATA_FRAME = 0.25  # Secondi massimi integrati dopo uno stallo
+
+# Secondi di gioco conservati per il rewind
+DURATA_STORIA_REWIND = 10
+BUDGET_STORIA_MB = 16  # Memoria massima della storia (stima)
+INTERVALLO_KEYFRAME = 60  # Tick tra due stati completi nella storia
+INTERVALLO_MINIATURE = 30  # Tick tra due miniature della barra di rewind
+
+# Rendering a rettangoli sporchi: aggiorna solo le aree cambiate invece
+# dell'intero frame (utile con il rendering software)
+RETTANGOLI_SPORCHI = False
+
+# Registrazione degli input di ogni partita, per riprodurla esattamente
+REGISTRA_PARTITE = True
+CARTELLA_REGISTRAZIONI = "registrazioni"
+
+# Salvataggi: slot espliciti (F5 salva, F9 carica, F6 cambia slot) e
+# salvataggio automatico periodico, ripreso con CONTINUA dal menu
+CARTELLA_SALVATAGGI = "salvataggi"
+NUMERO_SLOT = 3
+SALVATAGGIO_AUTOMATICO = True
+INTERVALLO_SALVATAGGIO_AUTOMATICO = 5  # Secondi di gioco tra due salvataggi automatici
+
+# Modalità attrazione: partite registrate rigiocate dietro al menu
+MODALITA_ATTRAZIONE = True
+ATTRAZIONE_BUDGET_CPU = 0.1  # Frazione massima del tempo reale per simulare e disegnare
+ATTRAZIONE_ATTESA = 5  # Secondi di menu senza input prima che la dimostrazione parta
+
+# Scatola nera: in caso di crash salva gli ultimi secondi di gioco, rigiocabili
+# con riproduci_registrazione.py
+SCATOLA_NERA = True
+CARTELLA_CRASH = "crash"
+DURATA_SCATOLA_NERA = 30  # Secondi conservati
+INTERVALLO_ISTANTANEE_SCATOLA_NERA = 5  # Secondi di gioco tra due istantanee
+
+# Modalità versus in rete con rollback (vedi versus.py)
+VERSUS_PORTA = 7500
+VERSUS_RITARDO_INPUT = 2  # Frame di ritardo dell'input locale, riducono i rollback
+VERSUS_MAX_ROLLBACK = 8  # Frame massimi risimulati; oltre si attende l'avversario
+
 # Colori
 COLORE_NERO = (0, 0, 0)
 COLORE_BIANCO = (255, 255, 255)
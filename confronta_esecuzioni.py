@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""
+Ricerca delle divergenze nella simulazione
+Riproduce la stessa registrazione due volte in lockstep confrontando a ogni
+tick l'impronta dello stato, oppure la confronta con la traccia delle
+impronte prodotta su un'altra macchina. Al primo tick diverso stampa i
+campi che non coincidono
+
+Esempi:
+    python confronta_esecuzioni.py registrazioni/partita.inv
+    python confronta_esecuzioni.py registrazioni/partita.inv --traccia macchina_a.trc
+    python confronta_esecuzioni.py registrazioni/partita.inv --riferimento macchina_a.trc --istantanea b.sav
+    python confronta_esecuzioni.py registrazioni/partita.inv --al-tick 1234 --istantanea a.sav
+    python confronta_esecuzioni.py --campi a.sav b.sav
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import struct
+import sys
+from array import array
+
+# Nessuna finestra né audio, come nelle simulazioni batch
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from core import salvataggio
+from core.registrazione import RiproduttoreInput
+from logic import istantanea
+from riproduci_registrazione import prepara_riproduzione
+
+# Traccia: magic, versione, seme, frequenza, numero di impronte; poi un
+# crc32 little endian per tick a partire dal tick 0
+MAGIC_TRACCIA = b"INVT"
+VERSIONE_TRACCIA = 1
+FORMATO_TRACCIA = struct.Struct("<4sBQHI")
+
+
+def esecuzione(percorso):
+    """Avvia una riproduzione della registrazione e restituisce (gioco, scena, riproduttore)"""
+    riproduttore = RiproduttoreInput.da_file(percorso)
+    gioco, scena = prepara_riproduzione(riproduttore)
+    return gioco, scena, riproduttore
+
+
+def confronta_in_parallelo(percorso):
+    """Riproduce la registrazione due volte in lockstep
+
+    Restituisce None se le impronte coincidono fino alla fine, altrimenti
+    (tick, differenze) per il primo tick divergente.
+    """
+    esecuzioni = [esecuzione(percorso), esecuzione(percorso)]
+    gioco, _, riproduttore = esecuzioni[0]
+    while True:
+        tick = gioco.orologio_simulazione.tick
+        stati = [istantanea.cattura(scena) for _, scena, _ in esecuzioni]
+        if istantanea.impronta(stati[0]) != istantanea.impronta(stati[1]):
+            return tick, istantanea.differenze(*stati)
+        if riproduttore.terminata(tick):
+            return None
+        for gioco_esecuzione, _, _ in esecuzioni:
+            gioco_esecuzione.passo()
+
+
+def traccia(percorso, fino_al_tick=None):
+    """Riproduce la registrazione e restituisce (impronte per tick, gioco, scena)
+
+    Con fino_al_tick si ferma a quel tick, lasciando la scena in quello stato.
+    """
+    gioco, scena, riproduttore = esecuzione(percorso)
+    impronte = array('I')
+    while True:
+        tick = gioco.orologio_simulazione.tick
+        impronte.append(scena.impronta_stato())
+        if riproduttore.terminata(tick) or tick == fino_al_tick:
+            return impronte, gioco, scena
+        gioco.passo()
+
+
+def scrivi_traccia(percorso, riproduttore, impronte):
+    """Salva le impronte per tick in un file di traccia"""
+    impronte = array('I', impronte)
+    if sys.byteorder != "little":
+        impronte.byteswap()
+    with open(percorso, "wb") as file:
+        file.write(FORMATO_TRACCIA.pack(MAGIC_TRACCIA, VERSIONE_TRACCIA, riproduttore.seme,
+                                        riproduttore.frequenza, len(impronte)))
+        file.write(impronte.tobytes())
+
+
+def leggi_traccia(percorso):
+    """Legge un file di traccia e restituisce (seme, frequenza, impronte)"""
+    with open(percorso, "rb") as file:
+        dati = file.read()
+    if len(dati) < FORMATO_TRACCIA.size:
+        raise ValueError("Traccia troncata")
+    magic, versione, seme, frequenza, numero = FORMATO_TRACCIA.unpack_from(dati)
+    if magic != MAGIC_TRACCIA:
+        raise ValueError("Il file non è una traccia di Invasori Infinito")
+    if versione != VERSIONE_TRACCIA:
+        raise ValueError(f"Versione di traccia non supportata: {versione}")
+    impronte = array('I')
+    impronte.frombytes(dati[FORMATO_TRACCIA.size:FORMATO_TRACCIA.size + numero * 4])
+    if sys.byteorder != "little":
+        impronte.byteswap()
+    return seme, frequenza, impronte
+
+
+def primo_divergente(impronte_a, impronte_b):
+    """Restituisce il primo tick in cui le due tracce differiscono, o None"""
+    for tick, (impronta_a, impronta_b) in enumerate(zip(impronte_a, impronte_b)):
+        if impronta_a != impronta_b:
+            return tick
+    if len(impronte_a) != len(impronte_b):
+        return min(len(impronte_a), len(impronte_b))
+    return None
+
+
+def stampa_differenze(differenze):
+    """Stampa i campi diversi tra due istantanee"""
+    for campo, valore_a, valore_b in differenze:
+        print(f"  {campo}: {valore_a!r} != {valore_b!r}")
+
+
+def main():
+    """Punto di ingresso da riga di comando"""
+    parser = argparse.ArgumentParser(description="Cerca divergenze nella simulazione di Invasori Infinito")
+    parser.add_argument("registrazione", nargs="?", help="file .inv da riprodurre")
+    parser.add_argument("--traccia", help="scrive le impronte per tick in questo file")
+    parser.add_argument("--riferimento", help="confronta con la traccia prodotta su un'altra macchina")
+    parser.add_argument("--al-tick", type=int, help="tick a cui salvare l'istantanea")
+    parser.add_argument("--istantanea", help="salva qui l'istantanea al tick divergente o a --al-tick")
+    parser.add_argument("--campi", nargs=2, metavar=("A", "B"), help="confronta campo per campo due istantanee .sav")
+    argomenti = parser.parse_args()
+
+    if argomenti.campi:
+        differenze = istantanea.differenze(*(salvataggio.leggi(percorso) for percorso in argomenti.campi))
+        if not differenze:
+            print("Le istantanee coincidono")
+            return 0
+        print(f"{len(differenze)} campi diversi:")
+        stampa_differenze(differenze)
+        return 1
+
+    if not argomenti.registrazione:
+        parser.error("Indicare la registrazione oppure --campi")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if argomenti.traccia or argomenti.riferimento or argomenti.al_tick is not None:
+            impronte, gioco, scena = traccia(argomenti.registrazione, argomenti.al_tick)
+            risultato = None
+        else:
+            risultato = confronta_in_parallelo(argomenti.registrazione)
+
+    if argomenti.traccia:
+        scrivi_traccia(argomenti.traccia, scena.riproduttore, impronte)
+        print(f"{len(impronte)} impronte scritte in {argomenti.traccia}")
+
+    if argomenti.riferimento:
+        seme, frequenza, riferimento = leggi_traccia(argomenti.riferimento)
+        if (seme, frequenza) != (scena.riproduttore.seme, scena.riproduttore.frequenza):
+            parser.error("La traccia di riferimento è di un'altra registrazione")
+        tick = primo_divergente(riferimento, impronte)
+        if tick is None:
+            print(f"Nessuna divergenza in {len(impronte)} tick")
+            return 0
+        print(f"Prima divergenza al tick {tick}")
+        if argomenti.istantanea:
+            # Rigioca fino al tick divergente: l'altra macchina salva lo
+            # stesso tick con --al-tick, poi --campi confronta i due file
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, _, scena = traccia(argomenti.registrazione, tick)
+            salvataggio.scrivi_atomico(argomenti.istantanea, salvataggio.codifica(istantanea.cattura(scena)))
+            print(f"Istantanea del tick {tick} salvata in {argomenti.istantanea}")
+        return 1
+
+    if argomenti.al_tick is not None:
+        if argomenti.istantanea:
+            salvataggio.scrivi_atomico(argomenti.istantanea, salvataggio.codifica(istantanea.cattura(scena)))
+            print(f"Istantanea del tick {gioco.orologio_simulazione.tick} salvata in {argomenti.istantanea}")
+        return 0
+
+    if argomenti.traccia:
+        return 0
+
+    if risultato is None:
+        print("Le due esecuzioni coincidono a ogni tick")
+        return 0
+    tick, differenze = risultato
+    print(f"Prima divergenza al tick {tick}, {len(differenze)} campi diversi:")
+    stampa_differenze(differenze)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Buffer circolare a capacità fissa
+Conserva gli ultimi N elementi con inserimento, rimozione, troncamento
+e accesso per indice in tempo costante
+"""
+
+import math
+
+
+class BufferCircolare:
+    """Sequenza a capacità fissa che sovrascrive gli elementi più vecchi"""
+
+    def __init__(self, capacita):
+        """Prealloca il buffer"""
+        if capacita < 1:
+            raise ValueError("La capacità del buffer deve essere almeno 1")
+        self.capacita = capacita
+        self.elementi = [None] * capacita
+        self.inizio = 0     # Posizione dell'elemento più vecchio
+        self.lunghezza = 0
+
+    @classmethod
+    def per_durata(cls, secondi, frequenza):
+        """Crea un buffer che contiene secondi di gioco a frequenza tick al secondo"""
+        return cls(max(1, math.ceil(secondi * frequenza)))
+
+    def __len__(self):
+        """Restituisce il numero di elementi presenti"""
+        return self.lunghezza
+
+    def posizione(self, indice):
+        """Converte un indice logico (anche negativo) nella posizione nel buffer"""
+        if indice < 0:
+            indice += self.lunghezza
+        if not 0 <= indice < self.lunghezza:
+            raise IndexError("Indice fuori dal buffer circolare")
+        return (self.inizio + indice) % self.capacita
+
+    def __getitem__(self, indice):
+        """Restituisce l'elemento all'indice logico (0 = il più vecchio)"""
+        return self.elementi[self.posizione(indice)]
+
+    def __setitem__(self, indice, elemento):
+        """Sostituisce l'elemento all'indice logico"""
+        self.elementi[self.posizione(indice)] = elemento
+
+    def __iter__(self):
+        """Scorre gli elementi dal più vecchio al più recente"""
+        for indice in range(self.lunghezza):
+            yield self.elementi[(self.inizio + indice) % self.capacita]
+
+    def pieno(self):
+        """Indica se il prossimo inserimento sovrascriverà l'elemento più vecchio"""
+        return self.lunghezza == self.capacita
+
+    def aggiungi(self, elemento):
+        """Aggiunge un elemento in coda e restituisce quello scartato (o None)"""
+        fine = (self.inizio + self.lunghezza) % self.capacita
+        scartato = None
+        if self.lunghezza == self.capacita:
+            scartato = self.elementi[fine]
+            self.inizio = (self.inizio + 1) % self.capacita
+        else:
+            self.lunghezza += 1
+        self.elementi[fine] = elemento
+        return scartato
+
+    def rimuovi_ultimo(self):
+        """Rimuove e restituisce l'elemento più recente"""
+        if not self.lunghezza:
+            raise IndexError("Buffer circolare vuoto")
+        self.lunghezza -= 1
+        fine = (self.inizio + self.lunghezza) % self.capacita
+        elemento = self.elementi[fine]
+        self.elementi[fine] = None
+        return elemento
+
+    def rimuovi_primo(self):
+        """Rimuove e restituisce l'elemento più vecchio"""
+        if not self.lunghezza:
+            raise IndexError("Buffer circolare vuoto")
+        elemento = self.elementi[self.inizio]
+        self.elementi[self.inizio] = None
+        self.inizio = (self.inizio + 1) % self.capacita
+        self.lunghezza -= 1
+        return elemento
+
+    def tronca_dopo(self, indice):
+        """Scarta tutti gli elementi successivi all'indice logico
+
+        Come in StoriaStati, un indice negativo svuota il buffer. Gli slot
+        scartati vengono ripuliti, così non trattengono gli elementi rimossi.
+        """
+        if indice < 0:
+            self.svuota()
+            return
+        while self.lunghezza > indice + 1:
+            self.rimuovi_ultimo()
+
+    def svuota(self):
+        """Rimuove tutti gli elementi"""
+        self.elementi = [None] * self.capacita
+        self.inizio = 0
+        self.lunghezza = 0
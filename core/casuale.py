@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Generatori casuali deterministici della simulazione
+Ogni sottosistema (spawn, power-up, boss, palle di fuoco) estrae da un
+proprio flusso con seme derivato da quello della partita: un'estrazione in
+più in un sottosistema non sposta le sequenze degli altri. I flussi sono
+PCG32 in Python puro, quindi danno gli stessi numeri su ogni macchina e
+versione di Python, e il loro stato è di soli 8 byte
+"""
+
+import struct
+import zlib
+
+MASCHERA_64 = (1 << 64) - 1
+MASCHERA_32 = (1 << 32) - 1
+
+# Costanti di PCG32 (O'Neill) e di SplitMix64 per derivare i semi
+MOLTIPLICATORE = 6364136223846793005
+INCREMENTO = 1442695040888963407
+
+# Flussi della simulazione, nell'ordine in cui vengono impacchettati
+FLUSSI = ('spawn', 'power_up', 'boss', 'palle_fuoco')
+FORMATO_STATO = struct.Struct('<' + 'Q' * len(FLUSSI))
+
+
+def mescola(valore):
+    """Passo di SplitMix64: trasforma un intero in 64 bit ben distribuiti"""
+    valore = (valore + 0x9E3779B97F4A7C15) & MASCHERA_64
+    valore = ((valore ^ (valore >> 30)) * 0xBF58476D1CE4E5B9) & MASCHERA_64
+    valore = ((valore ^ (valore >> 27)) * 0x94D049BB133111EB) & MASCHERA_64
+    return valore ^ (valore >> 31)
+
+
+def seme_flusso(seme, nome):
+    """Deriva il seme di un flusso dal seme della partita e dal nome del flusso"""
+    return mescola((seme & MASCHERA_64) ^ (zlib.crc32(nome.encode('utf-8')) << 32))
+
+
+class FlussoCasuale:
+    """Generatore PCG32 con un sottoinsieme dell'interfaccia di random.Random"""
+
+    def __init__(self, seme=0):
+        """Inizializza il generatore con il seme indicato"""
+        self.stato = mescola(seme)
+
+    def prossimo(self):
+        """Restituisce il prossimo intero casuale di 32 bit"""
+        vecchio = self.stato
+        self.stato = (vecchio * MOLTIPLICATORE + INCREMENTO) & MASCHERA_64
+        mescolato = (((vecchio >> 18) ^ vecchio) >> 27) & MASCHERA_32
+        rotazione = vecchio >> 59
+        return ((mescolato >> rotazione) | (mescolato << (-rotazione & 31))) & MASCHERA_32
+
+    def sotto(self, limite):
+        """Restituisce un intero uniforme in [0, limite), senza distorsione del modulo"""
+        soglia = (1 << 32) % limite
+        while True:
+            valore = self.prossimo()
+            if valore >= soglia:
+                return valore % limite
+
+    def random(self):
+        """Restituisce un float uniforme in [0, 1) con 53 bit di precisione"""
+        alto = self.prossimo() >> 5
+        basso = self.prossimo() >> 6
+        return (alto * 67108864.0 + basso) * (1.0 / 9007199254740992.0)
+
+    def randint(self, minimo, massimo):
+        """Restituisce un intero uniforme tra minimo e massimo inclusi"""
+        return minimo + self.sotto(massimo - minimo + 1)
+
+    def uniform(self, minimo, massimo):
+        """Restituisce un float uniforme tra minimo e massimo"""
+        return minimo + (massimo - minimo) * self.random()
+
+    def choice(self, sequenza):
+        """Restituisce un elemento a caso della sequenza"""
+        return sequenza[self.sotto(len(sequenza))]
+
+
+class FlussiCasuali:
+    """I flussi casuali di una partita, accessibili come attributi (es. flussi.spawn)"""
+
+    def __init__(self, seme=0):
+        """Crea i flussi a partire dal seme della partita"""
+        for nome in FLUSSI:
+            setattr(self, nome, FlussoCasuale())
+        self.inizializza(seme)
+
+    def inizializza(self, seme):
+        """Reimposta tutti i flussi per una nuova partita"""
+        for nome in FLUSSI:
+            getattr(self, nome).stato = seme_flusso(seme, nome)
+
+    def impacchetta(self):
+        """Restituisce lo stato di tutti i flussi (8 byte per flusso)"""
+        return FORMATO_STATO.pack(*(getattr(self, nome).stato for nome in FLUSSI))
+
+    def ripristina(self, dati):
+        """Ripristina lo stato di tutti i flussi da impacchetta()"""
+        for nome, stato in zip(FLUSSI, FORMATO_STATO.unpack(dati)):
+            getattr(self, nome).stato = stato
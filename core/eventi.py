@@ -9,33 +9,124 @@ import pygame
 
 class GestoreEventi:
     """Classe per gestire gli eventi di input"""
-    
+
     def __init__(self):
         """Inizializza il gestore degli eventi"""
         self.osservatori = []
-    
-    def aggiungi_osservatore(self, osservatore):
-        """Aggiunge un osservatore che riceverà gli eventi"""
+        self.iscrizioni = []  # (osservatore, tipi o None per tutti, tasti o None)
+        self.trasformazione_mouse = None  # Converte le coordinate della finestra
+
+        # Tabella di dispatch: tipo di evento -> osservatori interessati
+        self.tabella = {}
+        self.generici = ()  # Osservatori iscritti a tutti gli eventi
+
+        # Se attivo, la coda SDL accetta solo i tipi di evento richiesti
+        self.filtra_coda = False
+
+        # Istantanea dell'input, aggiornata una volta per frame
+        self.tasti_premuti = None
+        self.mouse_premuto = None
+        self.posizione_mouse = None
+
+    def aggiungi_osservatore(self, osservatore, tipi=None, tasti=None):
+        """Aggiunge un osservatore che riceverà gli eventi
+
+        tipi limita gli eventi ricevuti (None = tutti); tasti limita gli
+        eventi da tastiera ai codici indicati (None = tutti i tasti), mentre
+        gli eventi senza tasto passano comunque.
+        """
         self.osservatori.append(osservatore)
-    
+        self.iscrizioni.append((
+            osservatore,
+            frozenset(tipi) if tipi is not None else None,
+            frozenset(tasti) if tasti is not None else None
+        ))
+        self.ricostruisci_tabella()
+
     def rimuovi_osservatore(self, osservatore):
         """Rimuove un osservatore dalla lista"""
         if osservatore in self.osservatori:
             self.osservatori.remove(osservatore)
-    
+            self.iscrizioni = [iscrizione for iscrizione in self.iscrizioni if iscrizione[0] is not osservatore]
+            self.ricostruisci_tabella()
+
+    def ricostruisci_tabella(self):
+        """Ricalcola la tabella di dispatch e il filtro della coda SDL"""
+        tipi_richiesti = set()
+        for _, tipi, _ in self.iscrizioni:
+            if tipi is not None:
+                tipi_richiesti.update(tipi)
+
+        # Per ogni tipo, gli osservatori nell'ordine di iscrizione
+        self.tabella = {
+            tipo: tuple((osservatore, tasti) for osservatore, tipi, tasti in self.iscrizioni
+                        if tipi is None or tipo in tipi)
+            for tipo in tipi_richiesti
+        }
+        self.generici = tuple((osservatore, tasti) for osservatore, tipi, tasti in self.iscrizioni if tipi is None)
+
+        if self.filtra_coda and pygame.display.get_init():
+            if self.generici:
+                pygame.event.set_allowed(None)
+            else:
+                # Gli eventi che nessuno ascolta non entrano nemmeno nella coda
+                pygame.event.set_blocked(None)
+                pygame.event.set_allowed(list(tipi_richiesti))
+
     def processa_evento(self, evento):
-        """Processa un evento e lo invia a tutti gli osservatori"""
-        for osservatore in self.osservatori:
-            osservatore.gestisci_evento(evento)
+        """Processa un evento e lo invia agli osservatori interessati"""
+        # Riporta le coordinate del mouse nello spazio della scena
+        if self.trasformazione_mouse and hasattr(evento, 'pos'):
+            attributi = dict(evento.dict, pos=self.trasformazione_mouse(evento.pos))
+            evento = pygame.event.Event(evento.type, attributi)
+
+        tasto = getattr(evento, 'key', None)
+        for osservatore, tasti in self.tabella.get(evento.type, self.generici):
+            if tasti is None or tasto is None or tasto in tasti:
+                osservatore.gestisci_evento(evento)
+
+    def processa_eventi(self, eventi):
+        """Processa gli eventi del frame, unendo i movimenti del mouse consecutivi"""
+        movimento = None
+        for evento in eventi:
+            if evento.type == pygame.MOUSEMOTION:
+                if movimento is not None:
+                    # Un solo movimento con lo spostamento relativo complessivo
+                    rel = (movimento.rel[0] + evento.rel[0], movimento.rel[1] + evento.rel[1])
+                    evento = pygame.event.Event(pygame.MOUSEMOTION, dict(evento.dict, rel=rel))
+                movimento = evento
+                continue
+
+            # Il movimento in sospeso va consegnato prima, per preservare l'ordine
+            if movimento is not None:
+                self.processa_evento(movimento)
+                movimento = None
+            self.processa_evento(evento)
+
+        if movimento is not None:
+            self.processa_evento(movimento)
+
+    def aggiorna_istantanea(self):
+        """Legge una volta lo stato di tastiera e mouse per il frame corrente"""
+        self.tasti_premuti = pygame.key.get_pressed()
+        self.mouse_premuto = pygame.mouse.get_pressed()
+        self.posizione_mouse = pygame.mouse.get_pos()
 
     def controlla_tasto_premuto(self, tasto):
         """Controlla se un tasto specifico è premuto"""
-        return pygame.key.get_pressed()[tasto]
-    
+        if self.tasti_premuti is None:
+            return pygame.key.get_pressed()[tasto]
+        return self.tasti_premuti[tasto]
+
     def controlla_mouse_premuto(self):
         """Restituisce lo stato dei pulsanti del mouse"""
-        return pygame.mouse.get_pressed()
-    
+        if self.mouse_premuto is None:
+            return pygame.mouse.get_pressed()
+        return self.mouse_premuto
+
     def ottieni_posizione_mouse(self):
         """Restituisce la posizione corrente del mouse"""
-        return pygame.mouse.get_pos()
+        posizione = self.posizione_mouse if self.posizione_mouse is not None else pygame.mouse.get_pos()
+        if self.trasformazione_mouse:
+            return self.trasformazione_mouse(posizione)
+        return posizione
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+"""
+Cache dei font di sistema
+La ricerca dei font di sistema avviene una sola volta, in background
+"""
+
+import threading
+import pygame
+
+# Font già creati, per (nome, dimensione, grassetto)
+_cache_font = {}
+
+# Thread che esegue la scansione dei font di sistema
+_thread_ricerca = None
+
+
+def avvia_ricerca_font():
+    """Avvia in background la scansione dei font di sistema"""
+    global _thread_ricerca
+    if _thread_ricerca is None:
+        # match_font esegue la scansione completa la prima volta che viene chiamata
+        _thread_ricerca = threading.Thread(target=pygame.font.match_font, args=("Arial",), daemon=True)
+        _thread_ricerca.start()
+
+
+def ottieni_font(nome, dimensione, grassetto=False):
+    """Restituisce un font di sistema, creandolo solo la prima volta"""
+    chiave = (nome, dimensione, grassetto)
+    font = _cache_font.get(chiave)
+    if font is None:
+        # Evita una seconda scansione se quella in background non è finita
+        if _thread_ricerca is not None:
+            _thread_ricerca.join()
+        font = pygame.font.SysFont(nome, dimensione, bold=grassetto)
+        _cache_font[chiave] = font
+    return font
@@ -7,14 +7,18 @@ Gestisce il loop di gioco, il rendering e l'aggiornamento
 
 import pygame
 import time
+from fractions import Fraction
 from core.eventi import GestoreEventi
 from core.scena import GestoreScene
+from core.orologio import OrologioSimulazione
+from core.profiler import ProfilerFrame
+from core.rewind import BarraRewind
 import config
 
 class Gioco:
     """Classe principale che gestisce il gioco"""
 
-    def __init__(self, titolo, larghezza, altezza, fps):
+    def __init__(self, titolo, larghezza, altezza, fps, inizio_avvio=None):
         """Inizializza il gioco"""
         self.titolo = titolo
         self.larghezza = larghezza
@@ -25,66 +29,155 @@ class Gioco:
         import os
         os.environ['SDL_VIDEO_CENTERED'] = '1'
     
-        # Iniziamo con la dimensione del menu
-        self.schermo = pygame.display.set_mode((config.MENU_LARGHEZZA, config.MENU_ALTEZZA))
+        # Un'unica finestra per tutta la durata del gioco
+        if config.FINESTRA_ADATTA_SCHERMO:
+            dimensione_finestra = (config.schermo_larghezza_sicura, config.schermo_altezza_sicura)
+        else:
+            dimensione_finestra = (config.FINESTRA_LARGHEZZA, config.FINESTRA_ALTEZZA)
+        self.finestra = pygame.display.set_mode(dimensione_finestra)
         pygame.display.set_caption(titolo)
 
-        # Iniziamo con la dimensione del menu
-        self.schermo = pygame.display.set_mode((config.MENU_LARGHEZZA, config.MENU_ALTEZZA))
-        pygame.display.set_caption(titolo)
+        # Ogni scena disegna su una superficie logica della propria dimensione,
+        # che viene poi scalata sulla finestra una volta per frame
+        self.superfici_logiche = {}
+        self.schermo = self.superficie_logica((config.MENU_LARGHEZZA, config.MENU_ALTEZZA))
+        self.area_destinazione = self.finestra.get_rect()
+        self.scala = 1.0
+        self.rapporto_x = self.rapporto_y = Fraction(1)
+        self.aggiornamento_completo = True
 
         # Orologio per controllare gli FPS
         self.orologio = pygame.time.Clock()
 
-        # Gestore di eventi
+        # Gestore di eventi, con le coordinate del mouse riportate alla superficie logica
         self.gestore_eventi = GestoreEventi()
+        self.gestore_eventi.trasformazione_mouse = self.posizione_logica
+
+        # Solo i tipi di evento con un osservatore entrano nella coda SDL
+        self.gestore_eventi.filtra_coda = True
+        self.gestore_eventi.aggiungi_osservatore(
+            self, tipi=(pygame.QUIT, pygame.KEYDOWN, pygame.VIDEOEXPOSE), tasti=(pygame.K_F3,)
+        )
 
         # Gestore delle scene
         self.gestore_scene = GestoreScene(self)
 
+        # Profiler delle fasi del frame (overlay attivabile con F3)
+        self.profiler = ProfilerFrame(fps_obiettivo=fps)
+        self.gestore_scene.profiler = self.profiler
+
         # Stato del gioco
         self.in_esecuzione = False
         self.tempo_attuale = 0
         self.tempo_precedente = 0
         self.delta_tempo = 0
 
-        # Flag per il rewind
+        # Simulazione a passo fisso
+        self.passo_fisso = config.PASSO_FISSO
+        self.passo_simulazione = 1.0 / config.FREQUENZA_SIMULAZIONE
+        self.accumulatore = 0.0
+        self.alfa_interpolazione = 1.0  # Frazione del passo tra gli ultimi due stati
+
+        # Tempo simulato usato dalla logica di gioco al posto di get_ticks()
+        self.orologio_simulazione = OrologioSimulazione()
+
+        # Flag per il rewind e barra di scorrimento mostrata durante il rewind
         self.modalita_rewind = False
+        self.barra_rewind = BarraRewind(self)
+
+        # Rendering a rettangoli sporchi per le scene che lo supportano
+        self.rettangoli_sporchi = config.RETTANGOLI_SPORCHI
 
         # Flag per indicare se siamo in modalità menu o gioco
         self.in_menu = True
 
+        # Misura del tempo di avvio fino al primo frame mostrato
+        self.inizio_avvio = inizio_avvio if inizio_avvio is not None else time.perf_counter()
+        self.tempo_primo_frame = None
+
+        # Scatola nera opzionale (core.scatola_nera), scaricata su disco in caso di crash
+        self.scatola_nera = None
+
     def esegui(self):
         """Avvia il loop principale del gioco"""
         self.in_esecuzione = True
-        self.tempo_precedente = time.time()
+        self.tempo_precedente = time.perf_counter()
+        self.accumulatore = 0.0
 
         while self.in_esecuzione:
-            # Calcolo del delta tempo
-            self.tempo_attuale = time.time()
-            self.delta_tempo = self.tempo_attuale - self.tempo_precedente
+            # Calcolo del tempo trascorso dall'ultimo frame
+            self.tempo_attuale = time.perf_counter()
+            durata_frame = self.tempo_attuale - self.tempo_precedente
             self.tempo_precedente = self.tempo_attuale
+            if self.scatola_nera:
+                self.scatola_nera.frame(durata_frame)
 
             # Gestione eventi
+            inizio_fase = time.perf_counter()
             self.elabora_eventi()
+            self.profiler.aggiungi('eventi', inizio_fase)
 
-            # Aggiornamento logica
-            self.aggiorna()
+            # Aggiornamento logica (misurato da GestoreScene)
+            if self.passo_fisso:
+                self.esegui_passi_fissi(durata_frame)
+            else:
+                self.delta_tempo = durata_frame
+                self.alfa_interpolazione = 1.0
+                # Anche a passo variabile le collisioni spazzate partono dalle posizioni di inizio passo
+                self.gestore_scene.prepara_passo()
+                self.aggiorna()
 
             # Rendering
             self.disegna()
+            if self.tempo_primo_frame is None:
+                self.tempo_primo_frame = time.perf_counter() - self.inizio_avvio
+                print(f"Primo frame dopo {self.tempo_primo_frame * 1000:.0f} ms")
 
-            # Controllo FPS
+            # Controllo FPS: il tempo passato qui è tempo libero del frame
+            inizio_fase = time.perf_counter()
             self.orologio.tick(self.fps)
+            self.profiler.aggiungi('attesa', inizio_fase)
+            self.profiler.fine_frame()
+
+        # Chiude la scena attiva (ad esempio per salvare la registrazione della partita)
+        if self.gestore_scene.scena_corrente:
+            self.gestore_scene.scena_corrente.termina()
+
+    def esegui_passi_fissi(self, durata_frame):
+        """Esegue i tick logici a passo fisso accumulati durante il frame"""
+        # Dopo uno stallo non integriamo più di MAX_DURATA_FRAME secondi
+        self.accumulatore += min(durata_frame, config.MAX_DURATA_FRAME)
+        self.delta_tempo = self.passo_simulazione
+
+        tick_eseguiti = 0
+        while self.accumulatore >= self.passo_simulazione and tick_eseguiti < config.MAX_TICK_PER_FRAME:
+            self.gestore_scene.prepara_passo()
+            self.aggiorna()
+            self.accumulatore -= self.passo_simulazione
+            tick_eseguiti += 1
+
+        # Se la simulazione è rimasta indietro, scarta il tempo in eccesso
+        # invece di accumulare un ritardo sempre maggiore
+        if self.accumulatore >= self.passo_simulazione:
+            self.accumulatore %= self.passo_simulazione
+
+        # Frazione di passo non ancora simulata, usata per interpolare il rendering
+        self.alfa_interpolazione = self.accumulatore / self.passo_simulazione
 
     def elabora_eventi(self):
         """Elabora tutti gli eventi di input"""
-        for evento in pygame.event.get():
-            if evento.type == pygame.QUIT:
-                self.in_esecuzione = False
+        self.gestore_eventi.aggiorna_istantanea()
+        self.gestore_eventi.processa_eventi(pygame.event.get())
 
-            # Passa l'evento al gestore
-            self.gestore_eventi.processa_evento(evento)
+    def gestisci_evento(self, evento):
+        """Gestisce gli eventi che riguardano il gioco nel suo insieme"""
+        if evento.type == pygame.QUIT:
+            self.in_esecuzione = False
+        elif evento.type == pygame.KEYDOWN and evento.key == pygame.K_F3:
+            self.profiler.alterna()
+        elif evento.type == pygame.VIDEOEXPOSE:
+            # La finestra è stata coperta: i rettangoli sporchi non bastano
+            self.aggiornamento_completo = True
 
     def aggiorna(self):
         """Aggiorna la logica del gioco"""
@@ -92,38 +185,165 @@ class Gioco:
             self.gestore_scene.rewind(self.delta_tempo)
         else:
             self.gestore_scene.aggiorna(self.delta_tempo)
+            self.orologio_simulazione.avanza(self.delta_tempo)
 
     def disegna(self):
         """Disegna gli elementi sullo schermo"""
+        scena = self.gestore_scene.scena_corrente
+        if (self.rettangoli_sporchi and scena and scena.supporta_rettangoli_sporchi
+                and not self.profiler.visibile and not self.modalita_rewind):
+            self.disegna_rettangoli_sporchi()
+            return
+
         # Pulisci lo schermo
         self.schermo.fill((0, 0, 0))
 
-        # Disegna la scena corrente
+        # Disegna la scena corrente, per intero
+        inizio_fase = time.perf_counter()
+        if scena:
+            scena.invalida_rettangoli()
         self.gestore_scene.disegna(self.schermo)
+        self.profiler.aggiungi('disegna', inizio_fase)
+
+        # Barra del rewind
+        if self.modalita_rewind:
+            self.barra_rewind.disegna(self.schermo)
 
-        # Aggiorna lo schermo
+        # Overlay del profiler, se attivo
+        if self.profiler.visibile:
+            self.profiler.disegna(self.schermo, self.gestore_scene.conteggi_entita())
+
+        # Barra e overlay restano sulla superficie: quando spariscono, il
+        # percorso a rettangoli sporchi deve ridisegnare tutta la scena
+        if scena:
+            scena.invalida_rettangoli()
+
+        # Componi sulla finestra e aggiorna lo schermo
+        inizio_fase = time.perf_counter()
+        if self.schermo is not self.finestra:
+            pygame.transform.scale(self.schermo, self.area_destinazione.size,
+                                   self.finestra.subsurface(self.area_destinazione))
         pygame.display.flip()
+        self.aggiornamento_completo = False
+        self.profiler.aggiungi('flip', inizio_fase)
+
+    def disegna_rettangoli_sporchi(self):
+        """Disegna la scena e aggiorna sul display solo le aree modificate"""
+        inizio_fase = time.perf_counter()
+        rettangoli = self.gestore_scene.disegna(self.schermo)
+        self.profiler.aggiungi('disegna', inizio_fase)
+
+        inizio_fase = time.perf_counter()
+        if self.schermo is not self.finestra:
+            rettangoli = [self.componi_rettangolo(rect) for rect in rettangoli]
+        if self.aggiornamento_completo:
+            pygame.display.flip()
+            self.aggiornamento_completo = False
+        else:
+            pygame.display.update(rettangoli)
+        self.profiler.aggiungi('flip', inizio_fase)
+
+    def superficie_logica(self, dimensione):
+        """Restituisce la superficie logica di una dimensione, creandola una sola volta"""
+        # Se coincide con la finestra, la scena disegna direttamente sulla finestra
+        if dimensione == self.finestra.get_size():
+            return self.finestra
+
+        superficie = self.superfici_logiche.get(dimensione)
+        if superficie is None:
+            superficie = pygame.Surface(dimensione).convert()
+            self.superfici_logiche[dimensione] = superficie
+        return superficie
+
+    def imposta_superficie_logica(self, dimensione):
+        """Rende attiva la superficie logica e calcola dove disegnarla nella finestra"""
+        self.schermo = self.superficie_logica(dimensione)
+
+        # Scala uniforme con bande nere per preservare le proporzioni
+        larghezza_finestra, altezza_finestra = self.finestra.get_size()
+        larghezza, altezza = dimensione
+        self.scala = min(larghezza_finestra / larghezza, altezza_finestra / altezza)
+        self.area_destinazione = pygame.Rect(0, 0, int(larghezza * self.scala), int(altezza * self.scala))
+        self.area_destinazione.center = self.finestra.get_rect().center
+
+        # Blocchi di pixel logici che corrispondono a un numero intero di pixel
+        # della finestra: le aree allineate a questi blocchi scalano esattamente
+        # come l'intero frame
+        self.rapporto_x = Fraction(self.area_destinazione.width, larghezza)
+        self.rapporto_y = Fraction(self.area_destinazione.height, altezza)
+
+        # Pulisci le bande e mostra tutta la finestra al prossimo frame
+        self.finestra.fill((0, 0, 0))
+        self.aggiornamento_completo = True
+
+    def componi_rettangolo(self, rect):
+        """Scala un'area della superficie logica sulla finestra e restituisce l'area di destinazione"""
+        rect = rect.clip(self.schermo.get_rect())
+        if not rect.width or not rect.height:
+            return pygame.Rect(self.area_destinazione.topleft, (0, 0))
+
+        # Allarga l'area ai blocchi interi, così la scalatura parziale coincide pixel per pixel
+        blocco_x = self.rapporto_x.denominator
+        blocco_y = self.rapporto_y.denominator
+        sinistra = rect.left // blocco_x * blocco_x
+        alto = rect.top // blocco_y * blocco_y
+        destra = -(-rect.right // blocco_x) * blocco_x
+        basso = -(-rect.bottom // blocco_y) * blocco_y
+        sorgente = pygame.Rect(sinistra, alto, destra - sinistra, basso - alto)
+
+        destinazione = pygame.Rect(
+            self.area_destinazione.x + int(sinistra * self.rapporto_x),
+            self.area_destinazione.y + int(alto * self.rapporto_y),
+            int(sorgente.width * self.rapporto_x),
+            int(sorgente.height * self.rapporto_y)
+        )
+        pygame.transform.scale(self.schermo.subsurface(sorgente), destinazione.size,
+                               self.finestra.subsurface(destinazione))
+        return destinazione
+
+    def posizione_logica(self, posizione):
+        """Converte una posizione della finestra in coordinate della superficie logica"""
+        if self.schermo is self.finestra:
+            return posizione
+        x = (posizione[0] - self.area_destinazione.x) / self.scala
+        y = (posizione[1] - self.area_destinazione.y) / self.scala
+        return int(x), int(y)
 
     def cambia_scena(self, nome_scena):
         """Cambia la scena corrente"""
-        # Se stiamo passando dal menu al gioco, cambia la dimensione della finestra
-        if nome_scena == "gioco" and self.in_menu:
-            self.schermo = pygame.display.set_mode((config.GIOCO_LARGHEZZA, config.GIOCO_ALTEZZA))
-            self.in_menu = False
-        # Se stiamo tornando al menu, ripristina la dimensione del menu
-        elif nome_scena == "menu" and not self.in_menu:
-            self.schermo = pygame.display.set_mode((config.MENU_LARGHEZZA, config.MENU_ALTEZZA))
-            self.in_menu = True
+        scena = self.gestore_scene.ottieni_scena(nome_scena)
+        if scena is None:
+            return
+
+        if self.modalita_rewind:
+            self.disattiva_rewind()
+
+        # La finestra resta la stessa: cambia solo la superficie logica
+        self.imposta_superficie_logica(scena.dimensione_logica)
+        self.in_menu = nome_scena != "gioco"
 
         self.gestore_scene.cambia_scena(nome_scena)
 
     def attiva_rewind(self):
         """Attiva la modalità rewind"""
+        if self.modalita_rewind or not self.gestore_scene.inizia_rewind():
+            return
         self.modalita_rewind = True
 
+        # Durante il rewind la barra riceve tasti e mouse
+        self.gestore_eventi.aggiungi_osservatore(
+            self.barra_rewind,
+            tipi=(pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION),
+            tasti=(pygame.K_r, pygame.K_SPACE) + tuple(BarraRewind.TASTI_VELOCITA)
+        )
+
     def disattiva_rewind(self):
-        """Disattiva la modalità rewind"""
+        """Disattiva la modalità rewind, riprendendo dallo stato mostrato"""
+        if not self.modalita_rewind:
+            return
         self.modalita_rewind = False
+        self.gestore_eventi.rimuovi_osservatore(self.barra_rewind)
+        self.gestore_scene.riprendi()
 
     def termina(self):
         """Termina il gioco"""
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Backend di simulazione senza finestra
+Esegue le scene con il driver video fittizio di SDL, alla massima velocità della CPU
+"""
+
+import os
+import pygame
+from core.eventi import GestoreEventi
+from core.scena import GestoreScene
+from core.orologio import OrologioSimulazione
+import config
+
+
+def inizializza_pygame_headless():
+    """Inizializza pygame con i driver fittizi di SDL, se non c'è già una finestra"""
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return
+
+    # I driver vanno scelti prima di inizializzare il display
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+
+    # convert() e convert_alpha() richiedono una superficie video
+    pygame.display.set_mode((1, 1))
+
+
+class RendererNullo:
+    """Renderer che non disegna nulla, usato per la simulazione pura"""
+
+    def disegna(self, gestore_scene):
+        """Non disegna nulla"""
+        pass
+
+
+class RendererSuperficie:
+    """Renderer che disegna la scena su una superficie fuori schermo"""
+
+    def __init__(self, larghezza, altezza):
+        """Crea la superficie di destinazione"""
+        self.superficie = pygame.Surface((larghezza, altezza))
+
+    def disegna(self, gestore_scene):
+        """Disegna la scena corrente sulla superficie"""
+        self.superficie.fill((0, 0, 0))
+        gestore_scene.disegna(self.superficie)
+
+
+class GiocoHeadless:
+    """Ospita le scene di gioco senza finestra e senza limite di FPS"""
+
+    def __init__(self, frequenza_simulazione=config.FREQUENZA_SIMULAZIONE, renderer=None):
+        """Inizializza il gioco senza finestra"""
+        inizializza_pygame_headless()
+
+        self.larghezza = config.GIOCO_LARGHEZZA
+        self.altezza = config.GIOCO_ALTEZZA
+
+        # Renderer: di default non disegna nulla
+        self.renderer = renderer if renderer else RendererNullo()
+        if isinstance(self.renderer, RendererSuperficie):
+            self.schermo = self.renderer.superficie
+        else:
+            self.schermo = pygame.Surface((self.larghezza, self.altezza))
+
+        # Gestori condivisi con il gioco a finestra
+        self.gestore_eventi = GestoreEventi()
+        self.gestore_scene = GestoreScene(self)
+        self.orologio_simulazione = OrologioSimulazione()
+
+        # La storia per il rewind non serve in simulazione
+        self.gestore_scene.storia_attiva = False
+
+        # Simulazione a passo fisso
+        self.passo_simulazione = 1.0 / frequenza_simulazione
+        self.delta_tempo = self.passo_simulazione
+        self.alfa_interpolazione = 1.0
+        self.modalita_rewind = False
+        self.in_esecuzione = False
+        self.scatola_nera = None
+
+    def cambia_scena(self, nome_scena):
+        """Cambia la scena corrente"""
+        self.gestore_scene.cambia_scena(nome_scena)
+
+    def invia_evento(self, evento):
+        """Invia un evento di input alle scene"""
+        self.gestore_eventi.processa_evento(evento)
+
+    def passo(self):
+        """Esegue un singolo passo di simulazione"""
+        self.gestore_scene.prepara_passo()
+        self.gestore_scene.aggiorna(self.passo_simulazione)
+        self.orologio_simulazione.avanza(self.passo_simulazione)
+        self.renderer.disegna(self.gestore_scene)
+
+    def esegui(self, max_passi=None, condizione_arresto=None):
+        """Esegue passi finché non si raggiunge il limite o la condizione di arresto"""
+        self.in_esecuzione = True
+        passi = 0
+
+        while self.in_esecuzione:
+            if max_passi is not None and passi >= max_passi:
+                break
+            if condizione_arresto and condizione_arresto():
+                break
+            self.passo()
+            passi += 1
+
+        self.in_esecuzione = False
+        return passi
+
+    def termina(self):
+        """Termina la simulazione"""
+        self.in_esecuzione = False
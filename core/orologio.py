@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+"""
+Orologio della simulazione
+Sostituisce pygame.time.get_ticks() nella logica di gioco
+"""
+
+class OrologioSimulazione:
+    """Tiene il tempo simulato, avanzato solo dai passi logici"""
+
+    def __init__(self):
+        """Inizializza l'orologio a zero"""
+        self.tempo = 0.0  # Secondi simulati
+        self.tick = 0     # Passi logici eseguiti
+
+    def avanza(self, delta_tempo):
+        """Avanza l'orologio di un passo di simulazione"""
+        self.tempo += delta_tempo
+        self.tick += 1
+
+    def ottieni_ticks(self):
+        """Restituisce i millisecondi simulati, come pygame.time.get_ticks()"""
+        return int(self.tempo * 1000)
+
+    def azzera(self):
+        """Riporta l'orologio a zero"""
+        self.tempo = 0.0
+        self.tick = 0
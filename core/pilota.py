@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+"""
+Pilota automatico per le simulazioni
+Genera input da tastiera scriptati e riproducibili per ScenaGioco
+"""
+
+import random
+import pygame
+
+
+class PilotaAutomatico:
+    """Insegue il nemico più vicino al fondo sparando di continuo"""
+
+    def __init__(self, seme, tempo_reazione=0.15, probabilita_errore=0.02):
+        """Inizializza il pilota con un generatore casuale proprio"""
+        # Generatore separato: non consuma i numeri casuali della simulazione
+        self.casuale = random.Random(seme)
+        self.tempo_reazione = tempo_reazione  # Secondi tra una decisione e l'altra
+        self.probabilita_errore = probabilita_errore  # Probabilità di una mossa casuale
+        self.tempo_prossima_decisione = 0.0
+        self.tasti_premuti = set()
+
+    def decidi(self, scena, tempo):
+        """Restituisce gli eventi da inviare prima del prossimo passo"""
+        if tempo < self.tempo_prossima_decisione or scena.game_over_status:
+            return []
+        self.tempo_prossima_decisione = tempo + self.tempo_reazione * (0.5 + self.casuale.random())
+
+        # Tasti desiderati: si spara sempre, il movimento segue il bersaglio
+        desiderati = {pygame.K_UP}
+        nave = scena.nave_giocatore
+
+        if self.casuale.random() < self.probabilita_errore:
+            desiderati.add(self.casuale.choice([pygame.K_LEFT, pygame.K_RIGHT]))
+        else:
+            bersaglio = self.scegli_bersaglio(scena)
+            if bersaglio is not None:
+                distanza = bersaglio.centerx - nave.rect.centerx
+                if distanza < -5:
+                    desiderati.add(pygame.K_LEFT)
+                elif distanza > 5:
+                    desiderati.add(pygame.K_RIGHT)
+
+        return self.transizioni(desiderati)
+
+    def scegli_bersaglio(self, scena):
+        """Sceglie il nemico più vicino al fondo, o il boss se presente; restituisce il suo rect"""
+        nemici = scena.nemici
+        if len(nemici):
+            _, y, _, altezza = nemici.rettangoli()
+            return nemici.rettangolo(int((y + altezza).argmax()))
+        if scena.boss_attivo and scena.boss:
+            return scena.boss.rect
+        return None
+
+    def transizioni(self, desiderati):
+        """Converte l'insieme di tasti desiderati in eventi KEYDOWN/KEYUP"""
+        eventi = []
+        for tasto in sorted(self.tasti_premuti - desiderati):
+            eventi.append(pygame.event.Event(pygame.KEYUP, key=tasto))
+        for tasto in sorted(desiderati - self.tasti_premuti):
+            eventi.append(pygame.event.Event(pygame.KEYDOWN, key=tasto))
+        self.tasti_premuti = desiderati
+        return eventi
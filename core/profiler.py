@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""
+Profiler delle fasi del frame
+Misura il tempo di ogni fase del loop principale e lo mostra in sovrimpressione
+"""
+
+import time
+from collections import deque
+import pygame
+from core.font import ottieni_font
+
+
+class ProfilerFrame:
+    """Raccoglie i tempi per fase degli ultimi frame e disegna l'overlay"""
+
+    # Fasi misurate, nell'ordine in cui avvengono nel loop
+    FASI = ('eventi', 'aggiorna', 'salva_stato', 'disegna', 'flip', 'attesa')
+
+    def __init__(self, numero_campioni=240, fps_obiettivo=60):
+        """Inizializza il profiler"""
+        self.visibile = False
+        self.budget_ms = 1000.0 / fps_obiettivo
+
+        # Tempi (ms) degli ultimi frame, per fase
+        self.storia = {fase: deque(maxlen=numero_campioni) for fase in self.FASI}
+        self.lavoro = deque(maxlen=numero_campioni)  # Tempo di frame esclusa l'attesa
+        self.frame_corrente = dict.fromkeys(self.FASI, 0.0)
+
+        # Le statistiche e il testo vengono ricalcolati solo ogni tanto
+        self.intervallo_aggiornamento = 15
+        self.frame_dall_aggiornamento = 0
+        self.righe_cache = []
+        self.font = None
+
+    def aggiungi(self, fase, inizio):
+        """Aggiunge alla fase il tempo trascorso da inizio (perf_counter)"""
+        self.frame_corrente[fase] += (time.perf_counter() - inizio) * 1000.0
+
+    def fine_frame(self):
+        """Archivia i tempi del frame appena concluso"""
+        lavoro = 0.0
+        for fase in self.FASI:
+            durata = self.frame_corrente[fase]
+            self.storia[fase].append(durata)
+            if fase != 'attesa':
+                lavoro += durata
+            self.frame_corrente[fase] = 0.0
+        self.lavoro.append(lavoro)
+
+    def alterna(self):
+        """Mostra o nasconde l'overlay"""
+        self.visibile = not self.visibile
+        self.frame_dall_aggiornamento = self.intervallo_aggiornamento
+
+    @staticmethod
+    def percentili(valori):
+        """Restituisce p50, p95 e p99 di una sequenza di tempi"""
+        if not valori:
+            return 0.0, 0.0, 0.0
+        ordinati = sorted(valori)
+        ultimo = len(ordinati) - 1
+        return tuple(ordinati[int(ultimo * p)] for p in (0.50, 0.95, 0.99))
+
+    def calcola_righe(self, conteggi):
+        """Prepara le righe di testo dell'overlay"""
+        righe = [f"{'fase':<12}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for fase in self.FASI:
+            p50, p95, p99 = self.percentili(self.storia[fase])
+            righe.append(f"{fase:<12}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        p50, p95, p99 = self.percentili(self.lavoro)
+        righe.append(f"{'lavoro':<12}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+
+        if conteggi:
+            righe.append("")
+            righe.append("  ".join(f"{nome}:{numero}" for nome, numero in conteggi.items()))
+        return righe
+
+    def disegna(self, schermo, conteggi):
+        """Disegna l'overlay con percentili, sparkline e conteggio entità"""
+        if not self.visibile:
+            return
+
+        if self.font is None:
+            self.font = ottieni_font("Courier New", 13)
+
+        # Ricalcola il testo solo ogni intervallo_aggiornamento frame
+        self.frame_dall_aggiornamento += 1
+        if self.frame_dall_aggiornamento >= self.intervallo_aggiornamento:
+            self.frame_dall_aggiornamento = 0
+            self.righe_cache = [self.font.render(riga, True, (255, 255, 255))
+                                for riga in self.calcola_righe(conteggi)]
+
+        altezza_riga = self.font.get_linesize()
+        larghezza = max([riga.get_width() for riga in self.righe_cache] + [240]) + 16
+        altezza_sparkline = 50
+        altezza = len(self.righe_cache) * altezza_riga + altezza_sparkline + 24
+
+        # Pannello semi-trasparente
+        pannello = pygame.Surface((larghezza, altezza))
+        pannello.set_alpha(180)
+        pannello.fill((0, 0, 0))
+        schermo.blit(pannello, (4, 4))
+
+        y = 12
+        for riga in self.righe_cache:
+            schermo.blit(riga, (12, y))
+            y += altezza_riga
+
+        self.disegna_sparkline(schermo, pygame.Rect(12, y + 4, larghezza - 16, altezza_sparkline))
+
+    def disegna_sparkline(self, schermo, area):
+        """Disegna l'andamento del tempo di lavoro rispetto al budget del frame"""
+        scala_ms = self.budget_ms * 2  # L'area copre due volte il budget
+
+        # Linea del budget (es. 16.6 ms a 60 FPS)
+        y_budget = area.bottom - int(area.height * self.budget_ms / scala_ms)
+        pygame.draw.line(schermo, (255, 80, 80), (area.left, y_budget), (area.right, y_budget))
+
+        if len(self.lavoro) < 2:
+            return
+
+        passo_x = area.width / (self.lavoro.maxlen - 1)
+        punti = []
+        for i, durata in enumerate(self.lavoro):
+            altezza = min(durata / scala_ms, 1.0) * area.height
+            punti.append((area.left + i * passo_x, area.bottom - altezza))
+        pygame.draw.lines(schermo, (80, 255, 80), False, punti)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""
+Record della partita migliore
+Conserva una copia della registrazione con il punteggio più alto, usata
+come fantasma nelle sfide, e il punteggio da battere
+"""
+
+import os
+
+from core.registrazione import ESTENSIONE
+from core import salvataggio
+
+NOME_MIGLIORE = "migliore" + ESTENSIONE
+NOME_PUNTEGGIO = "migliore.txt"
+
+
+def percorso_migliore(cartella):
+    """Restituisce il percorso della registrazione della partita migliore"""
+    return os.path.join(cartella, NOME_MIGLIORE)
+
+
+def punteggio_migliore(cartella):
+    """Restituisce il punteggio della partita migliore, o None se non c'è"""
+    try:
+        with open(os.path.join(cartella, NOME_PUNTEGGIO), encoding="utf-8") as file:
+            punteggio = int(file.read().strip())
+    except (OSError, ValueError):
+        return None
+    return punteggio if os.path.exists(percorso_migliore(cartella)) else None
+
+
+def aggiorna_migliore(cartella, percorso, punteggio):
+    """Copia la registrazione come partita migliore se batte il record; restituisce True se l'ha fatto"""
+    record = punteggio_migliore(cartella)
+    if record is not None and punteggio <= record:
+        return False
+    with open(percorso, "rb") as file:
+        salvataggio.scrivi_atomico(percorso_migliore(cartella), file.read())
+    salvataggio.scrivi_atomico(os.path.join(cartella, NOME_PUNTEGGIO), str(punteggio).encode("utf-8"))
+    return True
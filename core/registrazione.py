@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+"""
+Registrazione e riproduzione degli input
+Salva le transizioni dei comandi di gioco con il tick di simulazione,
+in un formato binario compatto (tick delta in varint, compresso con zlib)
+"""
+
+import os
+import struct
+import time
+import zlib
+
+# Comandi registrati
+SINISTRA = 0
+DESTRA = 1
+SPARO = 2
+FINE = 3  # Segna il tick in cui la sessione è terminata
+
+# Intestazione: magic, versione, seme, tick al secondo
+MAGIC = b"INVR"
+VERSIONE = 3  # 2: flussi casuali per sottosistema (core/casuale.py); 3: collisioni spazzate
+FORMATO_INTESTAZIONE = "<4sBQH"
+DIMENSIONE_INTESTAZIONE = struct.calcsize(FORMATO_INTESTAZIONE)
+
+ESTENSIONE = ".inv"
+
+
+def scrivi_varint(buffer, valore):
+    """Aggiunge al buffer un intero non negativo in formato varint (LEB128)"""
+    while valore >= 0x80:
+        buffer.append((valore & 0x7F) | 0x80)
+        valore >>= 7
+    buffer.append(valore)
+
+
+def leggi_varint(dati, posizione):
+    """Legge un varint dai dati e restituisce (valore, nuova posizione)"""
+    valore = 0
+    spostamento = 0
+    while True:
+        byte = dati[posizione]
+        posizione += 1
+        valore |= (byte & 0x7F) << spostamento
+        if byte < 0x80:
+            return valore, posizione
+        spostamento += 7
+
+
+class RegistratoreInput:
+    """Registra le transizioni dei comandi di una partita"""
+
+    def __init__(self, seme, frequenza):
+        """Inizializza una registrazione vuota"""
+        self.seme = seme
+        self.frequenza = frequenza
+        self.corpo = bytearray()
+        self.ultimo_tick = 0
+
+    def registra(self, tick, comando, premuto=False):
+        """Registra una transizione del comando al tick indicato
+
+        Ogni record è un solo varint: (delta tick << 3) | (comando << 1) | premuto.
+        """
+        delta = tick - self.ultimo_tick
+        self.ultimo_tick = tick
+        scrivi_varint(self.corpo, (delta << 3) | (comando << 1) | int(premuto))
+
+    def tronca(self, tick):
+        """Scarta gli input registrati dopo il tick indicato (ripresa dopo un rewind)"""
+        tick_corrente = 0
+        posizione = 0
+        while posizione < len(self.corpo):
+            valore, successiva = leggi_varint(self.corpo, posizione)
+            if tick_corrente + (valore >> 3) > tick:
+                break
+            tick_corrente += valore >> 3
+            posizione = successiva
+        del self.corpo[posizione:]
+        self.ultimo_tick = tick_corrente
+
+    def in_bytes(self, tick_finale):
+        """Restituisce la registrazione completa, chiusa al tick finale"""
+        corpo = bytearray(self.corpo)
+        scrivi_varint(corpo, ((tick_finale - self.ultimo_tick) << 3) | (FINE << 1))
+        intestazione = struct.pack(FORMATO_INTESTAZIONE, MAGIC, VERSIONE, self.seme, self.frequenza)
+        return intestazione + zlib.compress(bytes(corpo), 9)
+
+    def salva(self, cartella, tick_finale):
+        """Salva la registrazione in un nuovo file della cartella e ne restituisce il percorso"""
+        os.makedirs(cartella, exist_ok=True)
+        nome = time.strftime("partita_%Y%m%d_%H%M%S") + f"_{self.seme}{ESTENSIONE}"
+        percorso = os.path.join(cartella, nome)
+        with open(percorso, "wb") as file:
+            file.write(self.in_bytes(tick_finale))
+        return percorso
+
+
+def leggi_intestazione(dati):
+    """Verifica l'intestazione di una registrazione e restituisce (seme, frequenza)"""
+    if len(dati) < DIMENSIONE_INTESTAZIONE:
+        raise ValueError("Registrazione troncata")
+    magic, versione, seme, frequenza = struct.unpack_from(FORMATO_INTESTAZIONE, dati)
+    if magic != MAGIC:
+        raise ValueError("Il file non è una registrazione di Invasori Infinito")
+    if versione != VERSIONE:
+        raise ValueError(f"Versione di registrazione non supportata: {versione}")
+    return seme, frequenza
+
+
+class RiproduttoreInput:
+    """Restituisce gli input registrati tick per tick"""
+
+    def __init__(self, dati):
+        """Decodifica una registrazione (bytes)"""
+        self.seme, self.frequenza = leggi_intestazione(dati)
+
+        # Decodifica i record in (tick, comando, premuto)
+        corpo = zlib.decompress(dati[DIMENSIONE_INTESTAZIONE:])
+        self.input = []
+        self.tick_finale = None
+        tick = 0
+        posizione = 0
+        while posizione < len(corpo):
+            valore, posizione = leggi_varint(corpo, posizione)
+            tick += valore >> 3
+            comando = (valore >> 1) & 0x3
+            if comando == FINE:
+                self.tick_finale = tick
+                break
+            self.input.append((tick, comando, bool(valore & 1)))
+
+        self.indice = 0
+
+    @classmethod
+    def da_file(cls, percorso):
+        """Carica una registrazione da file"""
+        with open(percorso, "rb") as file:
+            return cls(file.read())
+
+    def input_al_tick(self, tick):
+        """Restituisce gli input registrati fino al tick indicato non ancora consegnati"""
+        inizio = self.indice
+        while self.indice < len(self.input) and self.input[self.indice][0] <= tick:
+            self.indice += 1
+        return self.input[inizio:self.indice]
+
+    def terminata(self, tick):
+        """Indica se la sessione registrata è finita al tick indicato"""
+        return self.tick_finale is not None and tick >= self.tick_finale
+
+
+class RiproduttoreFlusso:
+    """Riproduttore che decodifica la registrazione dal file man mano che serve
+
+    Ha la stessa interfaccia di RiproduttoreInput, ma in memoria tiene solo
+    un blocco decompresso alla volta: il file viene letto e decompresso a
+    blocchi (zlib.decompressobj) quando il tick richiesto supera gli input
+    già decodificati.
+    """
+
+    DIMENSIONE_BLOCCO = 4096
+
+    def __init__(self, percorso):
+        """Apre la registrazione e ne legge soltanto l'intestazione"""
+        self.file = open(percorso, "rb")
+        try:
+            self.seme, self.frequenza = leggi_intestazione(self.file.read(DIMENSIONE_INTESTAZIONE))
+        except ValueError:
+            self.file.close()
+            raise
+        self.decompressore = zlib.decompressobj()
+        self.corpo = bytearray()  # Dati decompressi non ancora decodificati
+        self.posizione = 0
+        self.tick = 0
+        self.prossimo = None  # Primo input decodificato non ancora consegnato
+        self.tick_finale = None
+
+    def riempi(self):
+        """Decomprime il blocco successivo e restituisce False se il file è finito"""
+        if self.file.closed:
+            return False
+        # Il decompressore si ferma a DIMENSIONE_BLOCCO byte: il resto dell'input resta in coda
+        compresso = self.decompressore.unconsumed_tail or self.file.read(self.DIMENSIONE_BLOCCO)
+        if compresso:
+            self.corpo += self.decompressore.decompress(compresso, self.DIMENSIONE_BLOCCO)
+        else:
+            self.corpo += self.decompressore.flush()
+            self.file.close()
+        return True
+
+    def leggi_record(self):
+        """Decodifica il prossimo input, o None alla fine della registrazione"""
+        if self.tick_finale is not None:
+            return None
+        while True:
+            # Un varint completo termina con un byte senza il bit di continuazione
+            fine = next((indice for indice in range(self.posizione, len(self.corpo))
+                         if self.corpo[indice] < 0x80), None)
+            if fine is not None:
+                break
+            if not self.riempi():
+                return None
+
+        valore, self.posizione = leggi_varint(self.corpo, self.posizione)
+        if self.posizione >= self.DIMENSIONE_BLOCCO:
+            del self.corpo[:self.posizione]
+            self.posizione = 0
+
+        self.tick += valore >> 3
+        comando = (valore >> 1) & 0x3
+        if comando == FINE:
+            self.tick_finale = self.tick
+            self.chiudi()
+            return None
+        return self.tick, comando, bool(valore & 1)
+
+    def input_al_tick(self, tick):
+        """Restituisce gli input registrati fino al tick indicato non ancora consegnati"""
+        consegnati = []
+        while True:
+            if self.prossimo is None:
+                self.prossimo = self.leggi_record()
+                if self.prossimo is None:
+                    return consegnati
+            if self.prossimo[0] > tick:
+                return consegnati
+            consegnati.append(self.prossimo)
+            self.prossimo = None
+
+    def terminata(self, tick):
+        """Indica se la sessione registrata è finita al tick indicato"""
+        # La fine arriva dopo tutti gli input: se non ce ne sono in sospeso, si guarda avanti
+        if self.prossimo is None:
+            self.prossimo = self.leggi_record()
+        return self.tick_finale is not None and tick >= self.tick_finale
+
+    def chiudi(self):
+        """Chiude il file della registrazione"""
+        self.file.close()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+"""
+Rete per la modalità versus
+Trasporti intercambiabili (loopback in memoria con latenza e jitter
+simulati, UDP) e sessione di rollback: l'input remoto viene predetto e,
+quando arriva diverso dalla previsione, la partita torna all'istantanea del
+frame sbagliato e risimula fino al frame corrente
+"""
+
+import heapq
+import random
+import socket
+import struct
+import time
+
+from core.buffer_circolare import BufferCircolare
+from core.registrazione import SINISTRA, DESTRA, SPARO
+
+COMANDI = (SINISTRA, DESTRA, SPARO)
+
+# Pacchetto: magic, giocatore, frame corrente, vantaggio in frame, ack
+# (primo frame non ancora ricevuto), primo frame inviato, numero di input
+MAGIC = b"INVV"
+FORMATO_PACCHETTO = struct.Struct('<4sBIhIIB')
+MAX_INPUT_PACCHETTO = 255
+
+
+def maschera_comandi(premuti):
+    """Converte i comandi premuti in una maschera di bit (un byte per frame)"""
+    maschera = 0
+    for comando in premuti:
+        maschera |= 1 << comando
+    return maschera
+
+
+def codifica_pacchetto(giocatore, frame, vantaggio, ack, primo, input_frame):
+    """Costruisce un pacchetto con gli input dei frame da primo in poi"""
+    intestazione = FORMATO_PACCHETTO.pack(MAGIC, giocatore, frame, vantaggio, ack, primo, len(input_frame))
+    return intestazione + bytes(input_frame)
+
+
+def decodifica_pacchetto(dati):
+    """Restituisce (giocatore, frame, vantaggio, ack, primo, input) o None se non valido"""
+    if len(dati) < FORMATO_PACCHETTO.size:
+        return None
+    magic, giocatore, frame, vantaggio, ack, primo, numero = FORMATO_PACCHETTO.unpack_from(dati)
+    if magic != MAGIC or len(dati) != FORMATO_PACCHETTO.size + numero:
+        return None
+    return giocatore, frame, vantaggio, ack, primo, dati[FORMATO_PACCHETTO.size:]
+
+
+class TrasportoLoopback:
+    """Trasporto in memoria verso un altro TrasportoLoopback dello stesso processo
+
+    Ogni pacchetto arriva dopo latenza ± jitter secondi (quindi anche fuori
+    ordine) e può andare perso con la probabilità indicata. L'orologio è
+    iniettabile per le prove deterministiche.
+    """
+
+    def __init__(self, latenza=0.0, jitter=0.0, perdita=0.0, seme=None, orologio=time.perf_counter):
+        """Inizializza un'estremità non ancora collegata"""
+        self.latenza = latenza
+        self.jitter = jitter
+        self.perdita = perdita
+        self.casuale = random.Random(seme)
+        self.orologio = orologio
+        self.remoto = None
+        self.in_arrivo = []  # Heap di (istante di consegna, progressivo, dati)
+        self.progressivo = 0
+
+    def invia(self, dati):
+        """Invia un pacchetto all'altra estremità"""
+        if self.casuale.random() < self.perdita:
+            return
+        ritardo = max(0.0, self.latenza + self.casuale.uniform(-self.jitter, self.jitter))
+        self.progressivo += 1
+        heapq.heappush(self.remoto.in_arrivo, (self.orologio() + ritardo, self.progressivo, bytes(dati)))
+
+    def ricevi(self):
+        """Restituisce i pacchetti già consegnati"""
+        adesso = self.orologio()
+        pacchetti = []
+        while self.in_arrivo and self.in_arrivo[0][0] <= adesso:
+            pacchetti.append(heapq.heappop(self.in_arrivo)[2])
+        return pacchetti
+
+    def chiudi(self):
+        """Scarta i pacchetti in viaggio"""
+        self.in_arrivo.clear()
+
+
+def crea_loopback(latenza=0.0, jitter=0.0, perdita=0.0, seme=None, orologio=time.perf_counter):
+    """Crea due trasporti loopback collegati tra loro"""
+    seme_b = None if seme is None else seme + 1
+    primo = TrasportoLoopback(latenza, jitter, perdita, seme, orologio)
+    secondo = TrasportoLoopback(latenza, jitter, perdita, seme_b, orologio)
+    primo.remoto = secondo
+    secondo.remoto = primo
+    return primo, secondo
+
+
+class TrasportoUDP:
+    """Trasporto su socket UDP non bloccante verso un solo indirizzo remoto"""
+
+    def __init__(self, porta_locale, indirizzo_remoto, host_locale="0.0.0.0"):
+        """Apre il socket sulla porta locale"""
+        self.indirizzo_remoto = (socket.gethostbyname(indirizzo_remoto[0]), indirizzo_remoto[1])
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host_locale, porta_locale))
+        self.socket.setblocking(False)
+
+    def invia(self, dati):
+        """Invia un datagramma; gli errori sono trattati come perdite"""
+        try:
+            self.socket.sendto(dati, self.indirizzo_remoto)
+        except OSError:
+            pass
+
+    def ricevi(self):
+        """Restituisce i datagrammi arrivati dall'indirizzo remoto"""
+        pacchetti = []
+        while True:
+            try:
+                dati, mittente = self.socket.recvfrom(2048)
+            except BlockingIOError:
+                break
+            except OSError:
+                # Ad esempio ICMP "porta irraggiungibile" finché l'altro non è avviato
+                continue
+            if mittente == self.indirizzo_remoto:
+                pacchetti.append(dati)
+        return pacchetti
+
+    def chiudi(self):
+        """Chiude il socket"""
+        self.socket.close()
+
+
+class SessioneRollback:
+    """Sincronizza una partita a due giocatori con predizione e rollback
+
+    La partita deve offrire salva_stato(), carica_stato(stato) e
+    simula(maschere), dove maschere ha la maschera dei comandi di ciascun
+    giocatore per il frame da simulare.
+    """
+
+    def __init__(self, partita, trasporto, giocatore_locale, ritardo_input=2, max_rollback=8):
+        """Inizializza la sessione al frame 0"""
+        self.partita = partita
+        self.trasporto = trasporto
+        self.giocatore_locale = giocatore_locale
+        self.giocatore_remoto = 1 - giocatore_locale
+        self.ritardo_input = ritardo_input
+        self.max_rollback = max_rollback
+
+        self.frame = 0  # Prossimo frame da simulare
+        # Frame -> maschera locale e remota confermata; nei primi frame,
+        # coperti dal ritardo dell'input, nessuno preme nulla
+        self.input_locali = dict.fromkeys(range(ritardo_input), 0)
+        self.input_remoti = dict.fromkeys(range(ritardo_input), 0)
+        self.previsti = {}        # Frame -> maschera remota usata nella simulazione
+        self.ultimo_remoto = ritardo_input - 1  # Ultimo frame remoto confermato senza buchi
+        self.ack_remoto = ritardo_input  # Primo frame locale che l'altro non ha ancora ricevuto
+
+        # Istantanee all'inizio degli ultimi frame simulati
+        self.stati = BufferCircolare(max_rollback + 1)
+
+        # Sincronizzazione del ritmo: chi è avanti aspetta qualche frame
+        self.frame_remoto = 0
+        self.vantaggio_remoto = 0
+        self.frame_da_attendere = 0
+
+        # Statistiche
+        self.rollback = 0
+        self.frame_risimulati = 0
+        self.rollback_massimo = 0
+        self.tempo_rollback_massimo = 0.0
+        self.attese = 0
+
+    def primo_frame_stati(self):
+        """Restituisce il frame della prima istantanea conservata"""
+        return self.frame - len(self.stati)
+
+    def confermato(self):
+        """Indica se tutti i frame simulati usano input remoti confermati"""
+        return self.ultimo_remoto >= self.frame - 1
+
+    def maschera_remota(self, frame):
+        """Restituisce l'input remoto del frame, o la previsione (ultimo input noto)"""
+        maschera = self.input_remoti.get(frame)
+        if maschera is None:
+            maschera = self.input_remoti.get(self.ultimo_remoto, 0)
+        return maschera
+
+    def simula_frame(self, frame):
+        """Simula un frame con l'input locale e quello remoto (confermato o previsto)"""
+        maschere = [0, 0]
+        maschere[self.giocatore_locale] = self.input_locali[frame]
+        maschere[self.giocatore_remoto] = self.previsti[frame] = self.maschera_remota(frame)
+        self.partita.simula(maschere)
+
+    def ricevi(self):
+        """Elabora i pacchetti arrivati e restituisce il primo frame predetto male (o None)"""
+        errato = None
+        for dati in self.trasporto.ricevi():
+            pacchetto = decodifica_pacchetto(dati)
+            if pacchetto is None or pacchetto[0] != self.giocatore_remoto:
+                continue
+            _, frame, vantaggio, ack, primo, input_frame = pacchetto
+            if frame >= self.frame_remoto:
+                self.frame_remoto = frame
+                self.vantaggio_remoto = vantaggio
+            self.ack_remoto = max(self.ack_remoto, ack)
+
+            for frame_input, maschera in enumerate(input_frame, primo):
+                if frame_input <= self.ultimo_remoto or frame_input in self.input_remoti:
+                    continue
+                self.input_remoti[frame_input] = maschera
+                previsto = self.previsti.get(frame_input)
+                if frame_input < self.frame and previsto != maschera and (errato is None or frame_input < errato):
+                    errato = frame_input
+
+            while self.ultimo_remoto + 1 in self.input_remoti:
+                self.ultimo_remoto += 1
+        return errato
+
+    def risimula(self, dal_frame):
+        """Torna all'istantanea del frame e risimula fino al frame corrente"""
+        inizio = time.perf_counter()
+        base = self.primo_frame_stati()
+        self.partita.carica_stato(self.stati[dal_frame - base])
+        for frame in range(dal_frame, self.frame):
+            if frame > dal_frame:
+                self.stati[frame - base] = self.partita.salva_stato()
+            self.simula_frame(frame)
+
+        profondita = self.frame - dal_frame
+        self.rollback += 1
+        self.frame_risimulati += profondita
+        self.rollback_massimo = max(self.rollback_massimo, profondita)
+        self.tempo_rollback_massimo = max(self.tempo_rollback_massimo, time.perf_counter() - inizio)
+
+    def invia(self):
+        """Invia gli input locali non ancora confermati dall'altro giocatore"""
+        primo = self.ack_remoto
+        ultimo = min(self.frame + self.ritardo_input, primo + MAX_INPUT_PACCHETTO)
+        input_frame = [self.input_locali[frame] for frame in range(primo, ultimo)]
+        vantaggio = max(-0x8000, min(0x7FFF, self.frame - self.frame_remoto))
+        self.trasporto.invia(codifica_pacchetto(
+            self.giocatore_locale, self.frame, vantaggio, self.ultimo_remoto + 1, primo, input_frame))
+
+    def sincronizza(self):
+        """Calcola quanti frame aspettare se si è più avanti dell'altro giocatore"""
+        # Come in GGPO: metà della differenza tra i due vantaggi visti dai giocatori
+        differenza = (self.frame - self.frame_remoto) - self.vantaggio_remoto
+        if differenza >= 2 and self.frame_da_attendere == 0:
+            self.frame_da_attendere = min(differenza // 2, self.max_rollback)
+
+    def avanza(self, maschera_locale):
+        """Esegue un frame di rete e restituisce True se la simulazione è avanzata
+
+        Prima corregge le previsioni sbagliate con un rollback, poi simula il
+        frame corrente, a meno di essere troppo avanti rispetto all'altro.
+        """
+        errato = self.ricevi()
+        if errato is not None:
+            self.risimula(errato)
+
+        if self.frame % 60 == 0:
+            self.sincronizza()
+
+        avanzato = False
+        if self.frame - self.ultimo_remoto > self.max_rollback or self.frame_da_attendere:
+            # Troppi frame senza input remoto, o in attesa che l'altro recuperi
+            self.frame_da_attendere = max(0, self.frame_da_attendere - 1)
+            self.attese += 1
+        else:
+            self.input_locali[self.frame + self.ritardo_input] = maschera_locale
+            self.stati.aggiungi(self.partita.salva_stato())
+            self.simula_frame(self.frame)
+            self.frame += 1
+            avanzato = True
+
+        self.invia()
+        self.scarta_vecchi()
+        return avanzato
+
+    def scarta_vecchi(self):
+        """Dimentica gli input che non possono più servire"""
+        limite = min(self.primo_frame_stati(), self.ultimo_remoto)
+        for frame in [frame for frame in self.input_remoti if frame < limite]:
+            del self.input_remoti[frame]
+        for frame in [frame for frame in self.previsti if frame < limite]:
+            del self.previsti[frame]
+        for frame in [frame for frame in self.input_locali if frame < min(limite, self.ack_remoto)]:
+            del self.input_locali[frame]
+
+    def chiudi(self):
+        """Chiude il trasporto"""
+        self.trasporto.chiudi()
@@ -5,53 +5,398 @@ Sistema di rewind temporale
 Permette di tornare indietro nel tempo durante il gioco
 """
 
-class GestoreRewind:
-    """Gestisce la funzionalità di rewind temporale"""
-    
-    def __init__(self, capacita_massima=600):  # 10 secondi a 60 FPS
-        """Inizializza il gestore di rewind"""
-        self.capacita_massima = capacita_massima
-        self.stati = []
-        self.indice_corrente = -1
-    
-    def salva_stato(self, stato):
-        """Salva uno stato per il rewind"""
-        # Se siamo in mezzo alla storia (dopo un rewind), tronca la storia
-        if self.indice_corrente < len(self.stati) - 1:
-            self.stati = self.stati[:self.indice_corrente + 1]
-        
-        # Aggiungi il nuovo stato
-        self.stati.append(stato)
-        self.indice_corrente = len(self.stati) - 1
-        
-        # Limita la dimensione della storia
-        if len(self.stati) > self.capacita_massima:
-            self.stati.pop(0)
-            self.indice_corrente -= 1
-    
-    def ottieni_stato_precedente(self):
-        """Ottiene lo stato precedente per il rewind"""
-        if self.indice_corrente > 0:
-            self.indice_corrente -= 1
-            return self.stati[self.indice_corrente]
-        return None
-    
-    def ottieni_stato_successivo(self):
-        """Ottiene lo stato successivo (avanzamento dopo rewind)"""
-        if self.indice_corrente < len(self.stati) - 1:
-            self.indice_corrente += 1
-            return self.stati[self.indice_corrente]
+import pygame
+import config
+from core.buffer_circolare import BufferCircolare
+from core.font import ottieni_font
+
+# Valore di una chiave assente nello stato (ad esempio i dati del boss)
+ASSENTE = object()
+
+
+def calcola_delta(vecchio, nuovo):
+    """Restituisce i delta (avanti, indietro) tra due stati, per chiave"""
+    avanti = {}
+    indietro = {}
+    nuove = 0
+    for chiave, valore in nuovo.items():
+        precedente = vecchio.get(chiave, ASSENTE)
+        if precedente is ASSENTE or precedente != valore:
+            avanti[chiave] = valore
+            indietro[chiave] = precedente
+            nuove += precedente is ASSENTE
+
+    # Chiavi sparite dal nuovo stato
+    if len(vecchio) > len(nuovo) - nuove:
+        for chiave, valore in vecchio.items():
+            if chiave not in nuovo:
+                avanti[chiave] = ASSENTE
+                indietro[chiave] = valore
+    return avanti, indietro
+
+
+def applica_delta(stato, delta):
+    """Applica un delta allo stato, modificandolo sul posto"""
+    for chiave, valore in delta.items():
+        if valore is ASSENTE:
+            stato.pop(chiave, None)
+        else:
+            stato[chiave] = valore
+
+
+def stima_dimensione(valore):
+    """Stima in byte la memoria occupata da un valore dello stato"""
+    if valore is None or valore is ASSENTE:
+        return 0
+    if isinstance(valore, (bytes, bytearray)):
+        return 33 + len(valore)
+    if isinstance(valore, dict):
+        return 64 + sum(50 + stima_dimensione(v) for v in valore.values())
+    if isinstance(valore, (list, tuple)):
+        return 56 + sum(8 + stima_dimensione(v) for v in valore)
+    return 24
+
+
+def stima_riferimenti(dizionario):
+    """Stima la memoria di un dizionario i cui valori sono già contati altrove"""
+    if dizionario is None:
+        return 0
+    return 64 + 50 * len(dizionario)
+
+
+class StoriaStati:
+    """Storia del rewind a keyframe periodiche più delta per chiave
+
+    Ogni tick conserva solo le chiavi cambiate, in avanti e all'indietro:
+    uno stato si ricostruisce partendo dal più vicino tra l'ultimo stato,
+    l'ultimo letto e le keyframe. La storia rispetta sia la capacità in
+    tick sia un budget di memoria.
+    """
+
+    def __init__(self, capacita, budget_mb=config.BUDGET_STORIA_MB, intervallo_keyframe=config.INTERVALLO_KEYFRAME):
+        """Inizializza una storia vuota"""
+        self.registri = BufferCircolare(capacita)  # (avanti, indietro, keyframe, dimensione)
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.intervallo_keyframe = intervallo_keyframe
+        self.dimensione = 0  # Byte stimati occupati dai registri
+        self.dalla_keyframe = 0
+        self.scartati = 0  # Stati scartati dall'inizio: indice assoluto = scartati + indice
+
+        # Stati completi del tick più vecchio e di quello più recente
+        self.primo = None
+        self.ultimo = None
+
+        # Ultimo stato ricostruito, per scorrere la storia un tick alla volta
+        self.cursore = None  # (indice, stato)
+
+    @classmethod
+    def per_durata(cls, secondi, frequenza, **opzioni):
+        """Crea una storia che contiene secondi di gioco a frequenza tick al secondo"""
+        return cls(BufferCircolare.per_durata(secondi, frequenza).capacita, **opzioni)
+
+    def __len__(self):
+        """Restituisce il numero di stati nella storia"""
+        return len(self.registri)
+
+    def aggiungi(self, stato):
+        """Aggiunge lo stato più recente"""
+        if not self.registri:
+            self.primo = dict(stato)
+            self.ultimo = dict(stato)
+            self.registri.aggiungi((None, None, None, 0))
+            self.dalla_keyframe = 0
+            return
+
+        avanti, indietro = calcola_delta(self.ultimo, stato)
+
+        # Keyframe periodiche per limitare il costo della ricerca
+        keyframe = None
+        self.dalla_keyframe += 1
+        if self.dalla_keyframe >= self.intervallo_keyframe:
+            keyframe = dict(stato)
+            self.dalla_keyframe = 0
+
+        # I valori di indietro e delle keyframe sono gli stessi oggetti già
+        # conservati dai delta in avanti: si contano solo i riferimenti
+        dimensione = stima_dimensione(avanti) + stima_riferimenti(indietro) + stima_riferimenti(keyframe)
+        if self.registri.pieno():
+            self.scarta_primo()
+        self.registri.aggiungi((avanti, indietro, keyframe, dimensione))
+        self.dimensione += dimensione
+        applica_delta(self.ultimo, avanti)
+
+        # Rispetta il budget di memoria scartando gli stati più vecchi
+        while self.dimensione > self.budget and len(self.registri) > 1:
+            self.scarta_primo()
+
+    def scarta_primo(self):
+        """Scarta lo stato più vecchio: il successivo diventa la nuova base"""
+        self.registri.rimuovi_primo()
+        self.scartati += 1
+        if not self.registri:
+            self.primo = self.ultimo = None
+            self.cursore = None
+            return
+
+        avanti, _, _, dimensione = self.registri[0]
+        applica_delta(self.primo, avanti)
+        self.registri[0] = (None, None, None, 0)
+        self.dimensione -= dimensione
+
+        if self.cursore:
+            indice, stato = self.cursore
+            self.cursore = (indice - 1, stato) if indice > 0 else None
+
+    def rimuovi_ultimo(self):
+        """Rimuove e restituisce lo stato più recente"""
+        if not self.registri:
+            raise IndexError("Storia degli stati vuota")
+
+        stato = dict(self.ultimo)
+        _, indietro, keyframe, dimensione = self.registri.rimuovi_ultimo()
+        self.dimensione -= dimensione
+
+        if not self.registri:
+            self.primo = self.ultimo = None
+        else:
+            applica_delta(self.ultimo, indietro)
+
+        if keyframe is not None:
+            # La prossima aggiunta ricrea la keyframe rimossa
+            self.dalla_keyframe = self.intervallo_keyframe - 1
+        else:
+            self.dalla_keyframe = max(0, self.dalla_keyframe - 1)
+
+        if self.cursore and self.cursore[0] >= len(self.registri):
+            self.cursore = None
+        return stato
+
+    def stato(self, indice):
+        """Ricostruisce lo stato all'indice (0 = il più vecchio, negativi dalla fine)
+
+        Lo stato restituito non va modificato.
+        """
+        if indice < 0:
+            indice += len(self.registri)
+        if not 0 <= indice < len(self.registri):
+            raise IndexError("Indice fuori dalla storia degli stati")
+
+        # Parte dal più vicino tra l'ultimo stato e l'ultimo letto...
+        partenza, base = len(self.registri) - 1, self.ultimo
+        if self.cursore and abs(self.cursore[0] - indice) < abs(partenza - indice):
+            partenza, base = self.cursore
+        distanza = abs(partenza - indice)
+
+        # ...o da una keyframe precedente, se più vicina
+        indice_keyframe = indice
+        while indice - indice_keyframe < distanza:
+            if indice_keyframe == 0:
+                partenza, base = 0, self.primo
+                break
+            keyframe = self.registri[indice_keyframe][2]
+            if keyframe is not None:
+                partenza, base = indice_keyframe, keyframe
+                break
+            indice_keyframe -= 1
+
+        stato = dict(base)
+        if partenza <= indice:
+            for posizione in range(partenza + 1, indice + 1):
+                applica_delta(stato, self.registri[posizione][0])
+        else:
+            for posizione in range(partenza, indice, -1):
+                applica_delta(stato, self.registri[posizione][1])
+
+        self.cursore = (indice, stato)
+        return stato
+
+    def tronca_dopo(self, indice):
+        """Scarta tutti gli stati successivi all'indice"""
+        if indice >= len(self.registri) - 1:
+            return
+        if indice < 0:
+            self.svuota()
+            return
+
+        nuovo_ultimo = dict(self.stato(indice))
+        for posizione in range(indice + 1, len(self.registri)):
+            self.dimensione -= self.registri[posizione][3]
+        self.registri.tronca_dopo(indice)
+        self.ultimo = nuovo_ultimo
+
+        # Riparte il conteggio dall'ultima keyframe rimasta
+        self.dalla_keyframe = 0
+        while self.dalla_keyframe < indice and self.registri[indice - self.dalla_keyframe][2] is None:
+            self.dalla_keyframe += 1
+
+    def svuota(self):
+        """Cancella la storia"""
+        self.registri.svuota()
+        self.dimensione = 0
+        self.dalla_keyframe = 0
+        self.scartati = 0
+        self.primo = self.ultimo = None
+        self.cursore = None
+
+
+class LineaTemporale:
+    """Storia del rewind navigabile: ricerca, riproduzione all'indietro e miniature"""
+
+    def __init__(self, storia, intervallo_miniature=config.INTERVALLO_MINIATURE, dimensione_miniature=(96, 72)):
+        """Inizializza la linea temporale sopra una StoriaStati"""
+        self.storia = storia
+        self.indice = -1   # Stato mostrato durante il rewind
+        self.velocita = 1  # Stati saltati per tick all'indietro (0 = pausa)
+
+        # Miniature dello schermo catturate ogni intervallo_miniature stati
+        self.intervallo_miniature = intervallo_miniature
+        self.dimensione_miniature = dimensione_miniature
+        self.miniature = {}  # Indice assoluto -> superficie ridotta
+        self.miniatura_richiesta = None
+
+    def __len__(self):
+        """Restituisce il numero di stati disponibili"""
+        return len(self.storia)
+
+    def aggiungi(self, stato):
+        """Aggiunge lo stato del tick corrente"""
+        self.storia.aggiungi(stato)
+        assoluto = self.storia.scartati + len(self.storia) - 1
+        if assoluto % self.intervallo_miniature == 0:
+            self.miniatura_richiesta = assoluto
+
+    def cattura_miniatura(self, schermo):
+        """Salva una miniatura dello schermo appena disegnato, se richiesta"""
+        if self.miniatura_richiesta is None:
+            return
+        self.miniature[self.miniatura_richiesta] = pygame.transform.scale(schermo, self.dimensione_miniature)
+        self.miniatura_richiesta = None
+
+        # Scarta le miniature di stati usciti dalla storia
+        for assoluto in [a for a in self.miniature if a < self.storia.scartati]:
+            del self.miniature[assoluto]
+
+    def miniatura(self, indice):
+        """Restituisce la miniatura più vicina precedente all'indice, se presente"""
+        assoluto = self.storia.scartati + indice
+        assoluto -= assoluto % self.intervallo_miniature
+        while assoluto >= self.storia.scartati:
+            miniatura = self.miniature.get(assoluto)
+            if miniatura is not None:
+                return miniatura
+            assoluto -= self.intervallo_miniature
         return None
-    
-    def cancella_storia(self):
-        """Cancella la storia degli stati"""
-        self.stati = []
-        self.indice_corrente = -1
-    
-    def puo_tornare_indietro(self):
-        """Verifica se è possibile tornare indietro"""
-        return self.indice_corrente > 0
-    
-    def puo_andare_avanti(self):
-        """Verifica se è possibile andare avanti"""
-        return self.indice_corrente < len(self.stati) - 1
+
+    def inizia(self):
+        """Inizia il rewind dallo stato più recente a velocità 1x"""
+        self.indice = len(self.storia) - 1
+        self.velocita = 1
+
+    def vai_a(self, indice):
+        """Si sposta sullo stato all'indice e lo restituisce"""
+        self.indice = max(0, min(indice, len(self.storia) - 1))
+        return self.storia.stato(self.indice)
+
+    def indietro(self):
+        """Arretra di velocita stati e restituisce il nuovo stato (None se fermo)"""
+        if not self.storia or self.velocita == 0 or self.indice == 0:
+            return None
+        return self.vai_a(self.indice - self.velocita)
+
+    def riprendi(self):
+        """Scarta gli stati successivi a quello mostrato: il gioco riparte da lì"""
+        # Lo stato mostrato verrà salvato di nuovo dal prossimo tick
+        self.storia.tronca_dopo(self.indice - 1)
+        fine = self.storia.scartati + len(self.storia)
+        for assoluto in [a for a in self.miniature if a >= fine]:
+            del self.miniature[assoluto]
+        if not self.storia:
+            self.miniature.clear()
+        self.miniatura_richiesta = None
+        self.indice = -1
+
+    def svuota(self):
+        """Cancella storia e miniature"""
+        self.storia.svuota()
+        self.miniature.clear()
+        self.miniatura_richiesta = None
+        self.indice = -1
+
+
+class BarraRewind:
+    """Barra di scorrimento del rewind, con anteprima delle miniature"""
+
+    # Tasti per la velocità di riproduzione all'indietro
+    TASTI_VELOCITA = {pygame.K_1: 1, pygame.K_2: 2, pygame.K_4: 4}
+
+    def __init__(self, gioco):
+        """Inizializza la barra"""
+        self.gioco = gioco
+        self.area = pygame.Rect(0, 0, 0, 0)  # Calcolata al disegno
+        self.indice_anteprima = None  # Indice sotto il mouse
+        self.font = None
+
+    def indice_da_posizione(self, x):
+        """Converte una coordinata x sulla barra nell'indice dello stato"""
+        linea = self.gioco.gestore_scene.linea_temporale
+        frazione = (x - self.area.left) / max(1, self.area.width - 1)
+        return round(max(0.0, min(frazione, 1.0)) * (len(linea) - 1))
+
+    def gestisci_evento(self, evento):
+        """Gestisce tasti e mouse durante il rewind"""
+        linea = self.gioco.gestore_scene.linea_temporale
+        if evento.type == pygame.KEYDOWN:
+            if evento.key == pygame.K_r:
+                self.gioco.disattiva_rewind()
+            elif evento.key == pygame.K_SPACE:
+                linea.velocita = 0 if linea.velocita else 1
+            elif evento.key in self.TASTI_VELOCITA:
+                linea.velocita = self.TASTI_VELOCITA[evento.key]
+
+        elif evento.type == pygame.MOUSEBUTTONDOWN:
+            if evento.button == 1 and self.area.collidepoint(evento.pos):
+                linea.velocita = 0
+                self.gioco.gestore_scene.vai_a(self.indice_da_posizione(evento.pos[0]))
+
+        elif evento.type == pygame.MOUSEMOTION:
+            # Area sensibile un po' più alta della barra
+            if self.area.inflate(0, 20).collidepoint(evento.pos):
+                self.indice_anteprima = self.indice_da_posizione(evento.pos[0])
+                if evento.buttons[0]:
+                    linea.velocita = 0
+                    self.gioco.gestore_scene.vai_a(self.indice_anteprima)
+            else:
+                self.indice_anteprima = None
+
+    def disegna(self, schermo):
+        """Disegna la barra, la posizione corrente e l'anteprima"""
+        linea = self.gioco.gestore_scene.linea_temporale
+        if self.font is None:
+            self.font = ottieni_font("Arial", 18)
+
+        larghezza, altezza = schermo.get_size()
+        self.area = pygame.Rect(40, altezza - 40, larghezza - 80, 10)
+        totale = max(1, len(linea) - 1)
+
+        # Barra con la parte di storia che precede lo stato mostrato
+        pygame.draw.rect(schermo, (60, 60, 60), self.area)
+        x_corrente = self.area.left + int(self.area.width * linea.indice / totale)
+        pygame.draw.rect(schermo, (0, 170, 255), (self.area.left, self.area.top, x_corrente - self.area.left, self.area.height))
+        pygame.draw.rect(schermo, (255, 255, 255), (x_corrente - 2, self.area.top - 4, 4, self.area.height + 8))
+
+        # Anteprima dello stato sotto il mouse, altrimenti di quello mostrato
+        indice = self.indice_anteprima if self.indice_anteprima is not None else linea.indice
+        miniatura = linea.miniatura(indice)
+        if miniatura:
+            x = self.area.left + int(self.area.width * indice / totale) - miniatura.get_width() // 2
+            x = max(0, min(x, larghezza - miniatura.get_width()))
+            rect = schermo.blit(miniatura, (x, self.area.top - miniatura.get_height() - 12))
+            pygame.draw.rect(schermo, (255, 255, 255), rect, 1)
+
+        # Velocità e distanza dal presente
+        secondi = (len(linea) - 1 - linea.indice) / config.FREQUENZA_SIMULAZIONE
+        stato = f"<< {linea.velocita}x" if linea.velocita else "PAUSA"
+        testo = self.font.render(f"REWIND {stato}   -{secondi:.1f} s   [R riprendi, 1/2/4 velocità, SPAZIO pausa]",
+                                 True, (255, 255, 255))
+        schermo.blit(testo, (self.area.left, self.area.bottom + 6))
+
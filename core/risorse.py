@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Caricamento delle risorse in background
+Decodifica e ridimensiona le immagini su un pool di thread
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+
+def carica_immagine(percorso, dimensione=None, ritaglia=False):
+    """Decodifica un'immagine e la porta alla dimensione richiesta (sicura per i thread)"""
+    immagine = pygame.image.load(percorso)
+    if dimensione is None:
+        return immagine
+
+    larghezza_finale, altezza_finale = dimensione
+    if ritaglia:
+        # Ritaglia la parte centrale mantenendo il rapporto di aspetto finale
+        larghezza_originale = immagine.get_width()
+        altezza_originale = immagine.get_height()
+        rapporto_originale = larghezza_originale / altezza_originale
+        rapporto_finale = larghezza_finale / altezza_finale
+
+        if rapporto_originale > rapporto_finale:
+            # L'immagine è troppo larga, la ritaglia sui lati
+            nuova_larghezza = int(altezza_originale * rapporto_finale)
+            area_ritaglio = ((larghezza_originale - nuova_larghezza) // 2, 0, nuova_larghezza, altezza_originale)
+        else:
+            # L'immagine è troppo alta, la ritaglia in alto e in basso
+            nuova_altezza = int(larghezza_originale / rapporto_finale)
+            area_ritaglio = (0, (altezza_originale - nuova_altezza) // 2, larghezza_originale, nuova_altezza)
+
+        immagine = immagine.subsurface(area_ritaglio)
+
+    return pygame.transform.scale(immagine, (larghezza_finale, altezza_finale))
+
+
+class CaricatoreRisorse:
+    """Carica le immagini su thread di lavoro e le rende disponibili già convertite"""
+
+    def __init__(self, numero_thread=2):
+        """Inizializza il pool di thread"""
+        self.esecutore = ThreadPoolExecutor(max_workers=numero_thread, thread_name_prefix="risorse")
+        self.futuri = {}      # Chiave -> Future con la superficie decodificata
+        self.convertite = {}  # Chiave -> superficie convertita nel formato del display
+        self.blocco = threading.Lock()
+
+    def richiedi(self, chiave, funzione, *argomenti):
+        """Avvia il caricamento in background, se non già richiesto, e restituisce il Future"""
+        with self.blocco:
+            futuro = self.futuri.get(chiave)
+            if futuro is None:
+                futuro = self.esecutore.submit(funzione, *argomenti)
+                self.futuri[chiave] = futuro
+            return futuro
+
+    def richiedi_immagine(self, percorso, dimensione=None, ritaglia=False, alpha=False):
+        """Avvia il caricamento di un'immagine e restituisce il Future"""
+        chiave = (percorso, dimensione, ritaglia, alpha)
+        return self.richiedi(chiave, carica_immagine, percorso, dimensione, ritaglia)
+
+    def ottieni_immagine(self, percorso, dimensione=None, ritaglia=False, alpha=False):
+        """Restituisce l'immagine pronta per il display, attendendo se necessario
+
+        Solleva l'eccezione del caricamento se l'immagine non è disponibile.
+        """
+        chiave = (percorso, dimensione, ritaglia, alpha)
+        immagine = self.convertite.get(chiave)
+        if immagine is None:
+            decodificata = self.richiedi_immagine(percorso, dimensione, ritaglia, alpha).result()
+
+            # La conversione usa il display, quindi avviene sul thread principale
+            immagine = decodificata.convert_alpha() if alpha else decodificata.convert()
+            self.convertite[chiave] = immagine
+        return immagine
+
+    def progresso(self):
+        """Restituisce la frazione (0-1) delle richieste completate"""
+        with self.blocco:
+            totali = len(self.futuri)
+            completate = sum(1 for futuro in self.futuri.values() if futuro.done())
+        return completate / totali if totali else 1.0
+
+    def termina(self):
+        """Ferma il pool di thread"""
+        self.esecutore.shutdown(wait=False, cancel_futures=True)
+
+
+# Caricatore condiviso da scene ed entità
+_caricatore = None
+
+
+def caricatore_risorse():
+    """Restituisce il caricatore di risorse condiviso, creandolo al primo utilizzo"""
+    global _caricatore
+    if _caricatore is None:
+        _caricatore = CaricatoreRisorse()
+    return _caricatore
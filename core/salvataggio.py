@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+"""
+Salvataggi su disco delle partite
+Codifica le istantanee della scena in un file compatto con checksum e lo
+scrive in modo atomico (file temporaneo + rename) su un thread separato,
+così il ciclo dei frame non attende mai il disco
+"""
+
+import os
+import struct
+import threading
+import zlib
+
+from core.registrazione import scrivi_varint, leggi_varint
+
+# Intestazione: magic, versione, crc32 del corpo compresso
+MAGIC = b"INVS"
+VERSIONE = 3  # 2: flussi casuali per sottosistema (core/casuale.py); 3: collisioni spazzate
+FORMATO_INTESTAZIONE = "<4sBI"
+DIMENSIONE_INTESTAZIONE = struct.calcsize(FORMATO_INTESTAZIONE)
+
+ESTENSIONE = ".sav"
+NOME_AUTOMATICO = "automatico" + ESTENSIONE
+
+
+def percorso_slot(cartella, slot):
+    """Restituisce il percorso del file di uno slot di salvataggio"""
+    return os.path.join(cartella, f"slot_{slot}{ESTENSIONE}")
+
+
+def percorso_automatico(cartella):
+    """Restituisce il percorso del salvataggio automatico"""
+    return os.path.join(cartella, NOME_AUTOMATICO)
+
+
+def codifica(sezioni):
+    """Codifica un dizionario nome -> bytes in un salvataggio
+
+    Ogni sezione è scritta come varint della lunghezza del nome, nome,
+    varint della lunghezza dei dati, dati; il tutto viene compresso.
+    """
+    corpo = bytearray()
+    for nome, dati in sezioni.items():
+        nome = nome.encode('utf-8')
+        scrivi_varint(corpo, len(nome))
+        corpo += nome
+        scrivi_varint(corpo, len(dati))
+        corpo += dati
+    compresso = zlib.compress(bytes(corpo), 6)
+    return struct.pack(FORMATO_INTESTAZIONE, MAGIC, VERSIONE, zlib.crc32(compresso)) + compresso
+
+
+def decodifica(dati):
+    """Decodifica un salvataggio nel dizionario nome -> bytes"""
+    if len(dati) < DIMENSIONE_INTESTAZIONE:
+        raise ValueError("Salvataggio troncato")
+    magic, versione, crc = struct.unpack_from(FORMATO_INTESTAZIONE, dati)
+    if magic != MAGIC:
+        raise ValueError("Il file non è un salvataggio di Invasori Infinito")
+    if versione != VERSIONE:
+        raise ValueError(f"Versione di salvataggio non supportata: {versione}")
+    compresso = dati[DIMENSIONE_INTESTAZIONE:]
+    if zlib.crc32(compresso) != crc:
+        raise ValueError("Salvataggio danneggiato (checksum errato)")
+
+    corpo = zlib.decompress(compresso)
+    sezioni = {}
+    posizione = 0
+    while posizione < len(corpo):
+        lunghezza, posizione = leggi_varint(corpo, posizione)
+        nome = corpo[posizione:posizione + lunghezza].decode('utf-8')
+        posizione += lunghezza
+        lunghezza, posizione = leggi_varint(corpo, posizione)
+        sezioni[nome] = corpo[posizione:posizione + lunghezza]
+        posizione += lunghezza
+    return sezioni
+
+
+def scrivi_atomico(percorso, dati):
+    """Scrive il file in modo atomico: il vecchio contenuto resta valido fino al rename"""
+    cartella = os.path.dirname(percorso) or "."
+    os.makedirs(cartella, exist_ok=True)
+    temporaneo = percorso + ".tmp"
+    with open(temporaneo, "wb") as file:
+        file.write(dati)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporaneo, percorso)
+
+
+def leggi(percorso):
+    """Legge e decodifica un salvataggio da file"""
+    with open(percorso, "rb") as file:
+        return decodifica(file.read())
+
+
+class ScrittoreSalvataggi:
+    """Codifica e scrive i salvataggi su un thread in background
+
+    Per ogni file resta in attesa solo la richiesta più recente: se il disco
+    è lento, i salvataggi intermedi vengono saltati invece di accodarsi.
+    """
+
+    def __init__(self):
+        """Avvia il thread di scrittura"""
+        self.in_attesa = {}  # Percorso -> sezioni da scrivere
+        self.in_scrittura = 0
+        self.condizione = threading.Condition()
+        self.attivo = True
+        self.ultimo_errore = None
+        self.thread = threading.Thread(target=self.esegui, name="salvataggi", daemon=True)
+        self.thread.start()
+
+    def richiedi(self, percorso, sezioni):
+        """Accoda la scrittura delle sezioni (bytes immutabili) nel file indicato
+
+        Sezioni None richiedono invece la rimozione del file.
+        """
+        with self.condizione:
+            self.in_attesa[percorso] = sezioni
+            self.condizione.notify_all()
+
+    def rimuovi(self, percorso):
+        """Accoda la rimozione del file, scartando le scritture ancora in attesa"""
+        self.richiedi(percorso, None)
+
+    def esegui(self):
+        """Ciclo del thread: scrive le richieste finché lo scrittore è attivo"""
+        while True:
+            with self.condizione:
+                while self.attivo and not self.in_attesa:
+                    self.condizione.wait()
+                if not self.in_attesa:
+                    return
+                percorso, sezioni = self.in_attesa.popitem()
+                self.in_scrittura += 1
+
+            try:
+                if sezioni is None:
+                    if os.path.exists(percorso):
+                        os.remove(percorso)
+                else:
+                    scrivi_atomico(percorso, codifica(sezioni))
+            except OSError as e:
+                self.ultimo_errore = e
+                print(f"Errore nel salvataggio di {percorso}: {e}")
+
+            with self.condizione:
+                self.in_scrittura -= 1
+                self.condizione.notify_all()
+
+    def attendi(self):
+        """Attende che tutte le scritture richieste siano completate"""
+        with self.condizione:
+            while self.in_attesa or self.in_scrittura:
+                self.condizione.wait()
+
+    def termina(self):
+        """Completa le scritture in attesa e ferma il thread"""
+        with self.condizione:
+            self.attivo = False
+            self.condizione.notify_all()
+        self.thread.join()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+Scatola nera del gioco
+Tiene in memoria gli ultimi secondi di input, le durate dei frame e
+un'istantanea della partita a intervalli regolari. Se il gioco termina con
+un'eccezione, scrive tutto su disco insieme al traceback: il file si rigioca
+senza finestra con riproduci_registrazione.py
+"""
+
+import os
+import platform
+import struct
+import time
+from collections import deque
+
+import pygame
+
+from core import salvataggio
+from core.registrazione import RegistratoreInput
+
+ESTENSIONE = ".crash"
+
+
+class ScatolaNera:
+    """Registro circolare degli ultimi secondi di gioco
+
+    Per frame costa un append su una deque a lunghezza fissa; le istantanee
+    sono catturate dalla scena ogni intervallo secondi di simulazione. Gli
+    input più vecchi della prima istantanea conservata vengono scartati,
+    perché senza uno stato di partenza non servirebbero a rigiocare.
+    """
+
+    def __init__(self, durata, fps, intervallo):
+        """Dimensiona i buffer per coprire durata secondi"""
+        self.durata = durata
+        self.intervallo = intervallo
+        self.tempi_frame = deque(maxlen=int(durata * fps))
+        # Un'istantanea in più, così la più vecchia precede l'inizio della finestra
+        self.istantanee = deque(maxlen=int(durata // intervallo) + 1)
+        self.input = deque()
+        self.seme = None
+        self.frequenza = None
+
+    def frame(self, durata_frame):
+        """Registra la durata di un frame in secondi"""
+        self.tempi_frame.append(durata_frame)
+
+    def nuova_partita(self, seme, frequenza):
+        """Dimentica la partita precedente"""
+        self.seme = seme
+        self.frequenza = frequenza
+        self.istantanee.clear()
+        self.input.clear()
+
+    def passi_istantanea(self):
+        """Restituisce il numero di tick tra due istantanee"""
+        return max(1, round(self.intervallo * self.frequenza))
+
+    def registra_input(self, tick, comando, premuto):
+        """Registra una transizione di comando"""
+        self.input.append((tick, comando, premuto))
+
+    def registra_istantanea(self, tick, stato):
+        """Conserva un'istantanea della partita e scarta gli input ormai inutili"""
+        self.istantanee.append((tick, stato))
+        primo_tick = self.istantanee[0][0]
+        while self.input and self.input[0][0] < primo_tick:
+            self.input.popleft()
+
+    def sezioni(self, traccia, nome_scena, tick=None):
+        """Restituisce il contenuto della scatola nera come sezioni di un salvataggio"""
+        tempi = [durata * 1000 for durata in self.tempi_frame]
+        sezioni = {
+            'crash.traccia': traccia.encode('utf-8'),
+            'crash.scena': (nome_scena or "").encode('utf-8'),
+            'crash.sistema': (f"{platform.platform()} python {platform.python_version()} "
+                              f"pygame {pygame.version.ver}").encode('utf-8'),
+            'crash.tempi_frame': struct.pack(f'<{len(tempi)}f', *tempi),
+        }
+        if self.istantanee and tick is not None:
+            # Registrazione dalla prima istantanea al tick del crash
+            registratore = RegistratoreInput(self.seme, self.frequenza)
+            for tick_input, comando, premuto in self.input:
+                registratore.registra(tick_input, comando, premuto)
+            # Il tick del crash non è stato completato: va rigiocato anche lui
+            sezioni['crash.registrazione'] = registratore.in_bytes(tick + 1)
+
+            ticks = [tick_istantanea for tick_istantanea, _ in self.istantanee]
+            sezioni['crash.istantanee'] = struct.pack(f'<{len(ticks)}q', *ticks)
+            for indice, (_, stato) in enumerate(self.istantanee):
+                for nome, dati in stato.items():
+                    sezioni[f"{indice}.{nome}"] = dati
+        return sezioni
+
+    def scarica(self, cartella, traccia, nome_scena, tick=None):
+        """Scrive la scatola nera su disco e restituisce il percorso del file"""
+        nome_file = f"crash_{time.strftime('%Y%m%d_%H%M%S')}{ESTENSIONE}"
+        percorso = os.path.join(cartella, nome_file)
+        salvataggio.scrivi_atomico(percorso, salvataggio.codifica(self.sezioni(traccia, nome_scena, tick)))
+        return percorso
+
+
+def istantanea_crash(sezioni, indice):
+    """Estrae dalle sezioni di un crash l'istantanea con l'indice indicato"""
+    prefisso = f"{indice}."
+    return {nome[len(prefisso):]: dati for nome, dati in sezioni.items() if nome.startswith(prefisso)}
+
+
+def tick_istantanee(sezioni):
+    """Restituisce i tick delle istantanee di un crash"""
+    dati = sezioni.get('crash.istantanee', b"")
+    return list(struct.unpack(f'<{len(dati) // 8}q', dati))
@@ -5,6 +5,11 @@ Sistema di gestione delle scene del gioco
 Gestisce transizioni tra menu, gameplay, game over, ecc.
 """
 
+import importlib
+import time
+import config
+from core.rewind import StoriaStati, LineaTemporale
+
 class Scena:
     """Classe base per tutte le scene del gioco"""
     
@@ -12,6 +17,8 @@ class Scena:
         """Inizializza la scena"""
         self.gioco = gioco
         self.attivo = False
+        self.supporta_rettangoli_sporchi = False  # Vedi invalida_rettangoli
+        self.dimensione_logica = (config.LARGHEZZA_SCHERMO, config.ALTEZZA_SCHERMO)
     
     def inizializza(self):
         """Inizializza la scena quando diventa attiva"""
@@ -25,6 +32,10 @@ class Scena:
         """Gestisce gli eventi specifici della scena"""
         pass
     
+    def prepara_passo(self):
+        """Chiamato prima di ogni passo di simulazione a passo fisso"""
+        pass
+
     def aggiorna(self, delta_tempo):
         """Aggiorna la logica della scena"""
         pass
@@ -32,15 +43,27 @@ class Scena:
     def disegna(self, schermo):
         """Disegna la scena sullo schermo"""
         pass
+
+    def invalida_rettangoli(self):
+        """Richiede un ridisegno completo (solo per scene a rettangoli sporchi)"""
+        pass
     
     def salva_stato(self):
         """Salva lo stato attuale per il rewind"""
         return {}
+
+    def conteggi_entita(self):
+        """Restituisce il numero di entità vive per tipo, per il profiler"""
+        return {}
     
     def carica_stato(self, stato):
         """Carica uno stato salvato durante il rewind"""
         pass
 
+    def riprendi_dopo_rewind(self):
+        """Chiamato quando il gioco riparte dallo stato scelto con il rewind"""
+        pass
+
 
 class GestoreScene:
     """Gestisce le scene e le transizioni tra di esse"""
@@ -49,43 +72,98 @@ class GestoreScene:
         """Inizializza il gestore delle scene"""
         self.gioco = gioco
         self.scene = {}
+        self.fabbriche = {}  # Scene registrate ma non ancora create
         self.scena_corrente = None
-        self.storia_stati = []
+        self.storia_stati = StoriaStati.per_durata(config.DURATA_STORIA_REWIND, config.FREQUENZA_SIMULAZIONE)
+        self.linea_temporale = LineaTemporale(self.storia_stati)
+        self.storia_attiva = True  # Disattivabile nelle simulazioni senza rewind
+        self.profiler = None  # ProfilerFrame opzionale
     
     def aggiungi_scena(self, nome, scena):
         """Aggiunge una scena al gestore"""
         self.scene[nome] = scena
     
+    def registra_scena(self, nome, modulo, classe):
+        """Registra una scena da importare e creare solo al primo utilizzo"""
+        self.fabbriche[nome] = (modulo, classe)
+
+    def ottieni_scena(self, nome):
+        """Restituisce la scena, importandola e creandola se necessario"""
+        if nome not in self.scene and nome in self.fabbriche:
+            modulo, classe = self.fabbriche.pop(nome)
+            self.scene[nome] = getattr(importlib.import_module(modulo), classe)(self.gioco)
+        return self.scene.get(nome)
+
     def cambia_scena(self, nome):
         """Cambia la scena corrente"""
-        if nome in self.scene:
+        if self.ottieni_scena(nome):
             if self.scena_corrente:
                 self.scena_corrente.termina()
             
+            # La storia del rewind appartiene alla scena precedente
+            self.linea_temporale.svuota()
+
             self.scena_corrente = self.scene[nome]
             self.scena_corrente.inizializza()
     
+    def prepara_passo(self):
+        """Prepara la scena corrente al prossimo passo di simulazione"""
+        if self.scena_corrente:
+            self.scena_corrente.prepara_passo()
+
     def aggiorna(self, delta_tempo):
         """Aggiorna la scena corrente"""
         if self.scena_corrente:
             # Salva lo stato corrente per il rewind
-            stato = self.scena_corrente.salva_stato()
-            self.storia_stati.append(stato)
-            
-            # Limita la dimensione della storia
-            if len(self.storia_stati) > 1000:
-                self.storia_stati.pop(0)
-            
+            if self.storia_attiva:
+                inizio = time.perf_counter()
+                stato = self.scena_corrente.salva_stato()
+
+                # Conserva solo le differenze; oltre capacità o budget i più vecchi vengono scartati
+                self.linea_temporale.aggiungi(stato)
+                if self.profiler:
+                    self.profiler.aggiungi('salva_stato', inizio)
+
             # Aggiorna la scena
+            inizio = time.perf_counter()
             self.scena_corrente.aggiorna(delta_tempo)
+            if self.profiler:
+                self.profiler.aggiungi('aggiorna', inizio)
     
     def disegna(self, schermo):
-        """Disegna la scena corrente"""
+        """Disegna la scena corrente e restituisce le eventuali aree modificate"""
         if self.scena_corrente:
-            self.scena_corrente.disegna(schermo)
+            rettangoli = self.scena_corrente.disegna(schermo)
+            self.linea_temporale.cattura_miniatura(schermo)
+            return rettangoli
+        return None
     
+    def conteggi_entita(self):
+        """Restituisce il conteggio delle entità della scena corrente"""
+        if self.scena_corrente:
+            return self.scena_corrente.conteggi_entita()
+        return {}
+
+    def inizia_rewind(self):
+        """Prepara la linea temporale al rewind; False se non c'è storia"""
+        if not self.linea_temporale or not self.scena_corrente:
+            return False
+        self.linea_temporale.inizia()
+        return True
+
     def rewind(self, delta_tempo):
-        """Esegue il rewind se ci sono stati salvati"""
-        if self.storia_stati and self.scena_corrente:
-            stato = self.storia_stati.pop()
+        """Riporta la scena indietro di uno o più stati, secondo la velocità del rewind"""
+        stato = self.linea_temporale.indietro()
+        if stato is not None and self.scena_corrente:
             self.scena_corrente.carica_stato(stato)
+
+    def vai_a(self, indice):
+        """Porta la scena allo stato della storia all'indice indicato"""
+        if self.linea_temporale and self.scena_corrente:
+            self.scena_corrente.carica_stato(self.linea_temporale.vai_a(indice))
+
+    def riprendi(self):
+        """Fa ripartire il gioco dallo stato mostrato, scartando quelli successivi"""
+        self.linea_temporale.riprendi()
+        if self.scena_corrente:
+            self.scena_corrente.riprendi_dopo_rewind()
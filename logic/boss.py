@@ -5,147 +5,167 @@ Gestione del boss nemico che appare ogni 2500 punti
 """
 
 import pygame
-import random
 import os
 import math
-from logic.laser import Laser
-
-class BossLaser(Laser):
-    """Classe che rappresenta un laser sparato dal boss"""
-
-    def __init__(self, x, y, velocita=200, colore=(255, 0, 0)):
-        """Inizializza un laser del boss"""
-        super().__init__(x, y, velocita)
-        self.colore = colore  # Rosso per i laser del boss
-
-        # Aggiorna la direzione: verso il basso
-        self.direzione = 1  # 1 = giù, -1 = su
-
-        # Velocità direzionali per lasers delle esplosioni
-        self.velocita_x = 0
-        self.velocita_y = velocita
-        self.direzione_personalizzata = False
-
-        # Carica immagine del laser del boss
-        self.immagine = self.carica_immagine()
-
-    def carica_immagine(self):
-        """Carica l'immagine del laser o crea un placeholder"""
-        superficie = pygame.Surface((self.larghezza, self.altezza), pygame.SRCALPHA)
-        pygame.draw.rect(superficie, self.colore, (0, 0, self.larghezza, self.altezza))
-        return superficie
+from itertools import repeat
+import numpy as np
+from logic.magazzino import Magazzino
+from core.risorse import caricatore_risorse
+from core.casuale import FlussiCasuali
+
+class MagazzinoLaserBoss(Magazzino):
+    """Tutti i laser sparati dal boss o nati dall'esplosione delle palle di fuoco"""
+
+    LARGHEZZA = 4
+    ALTEZZA = 15
+    VELOCITA = 200
+    COLORE = (255, 0, 0)  # Rosso per i laser del boss
+    COLONNE = (
+        ('velocita', np.float64),
+        # Velocità direzionali: (0, velocita) verso il basso, qualsiasi per le esplosioni
+        ('velocita_x', np.float64),
+        ('velocita_y', np.float64),
+        ('direzione_personalizzata', np.bool_),
+    )
+
+    def aggiungi(self, x, y, velocita=VELOCITA):
+        """Aggiunge un laser diretto verso il basso"""
+        return super().aggiungi(x, y, velocita=velocita, velocita_y=velocita)
+
+    def aggiungi_esplosione(self, x, y):
+        """Aggiunge gli 8 laser dell'esplosione di una palla di fuoco nel punto indicato"""
+        for velocita_x, velocita_y in DIREZIONI_ESPLOSIONE:
+            super().aggiungi(x, y, velocita=self.VELOCITA, velocita_x=velocita_x, velocita_y=velocita_y,
+                             direzione_personalizzata=True)
 
     def aggiorna(self, delta_tempo):
-        """Aggiorna la posizione del laser"""
-        if self.direzione_personalizzata:
-            # Movimento direzionale per i laser delle esplosioni
-            self.x += self.velocita_x * delta_tempo
-            self.y += self.velocita_y * delta_tempo
-            self.rect.x = int(self.x)
-            self.rect.y = int(self.y)
-        else:
-            # Movimento standard verso il basso
-            self.y += self.velocita * delta_tempo * self.direzione
-            self.rect.y = int(self.y)
-
-        # Disattiva il laser se esce dallo schermo
-        if self.y > 800 or self.y < 0 or self.x < 0 or self.x > 1200:
-            self.attivo = False
-
-class PallaDiFuoco:
-    """Classe che rappresenta una palla di fuoco lanciata dal boss che esplode in più laser"""
-
-    def __init__(self, x, y, velocita=150):
-        """Inizializza una palla di fuoco"""
-        self.larghezza = 20
-        self.altezza = 20
-        self.x = x
-        self.y = y
-        self.velocita = velocita
-        self.colore = (255, 165, 0)  # Arancione
-        self.rect = pygame.Rect(self.x, self.y, self.larghezza, self.altezza)
-        self.attivo = True
-        self.esplosa = False
-        self.tempo_esplosione = random.uniform(0.5, 1.5)  # Esplode dopo un tempo casuale
-        self.tempo_accumulato = 0
-
-        # Carica immagine
-        self.immagine = self.carica_immagine()
-
-    def carica_immagine(self):
-        """Carica l'immagine della palla di fuoco o crea un placeholder"""
-        superficie = pygame.Surface((self.larghezza, self.altezza), pygame.SRCALPHA)
-        pygame.draw.circle(superficie, self.colore,
-                             (self.larghezza // 2, self.altezza // 2),
-                             self.larghezza // 2)
-        return superficie
+        """Aggiorna la posizione di tutti i laser"""
+        # I laser verso il basso hanno velocita_x nulla: un solo movimento vale per tutti
+        x = self.x
+        y = self.y
+        x += self.velocita_x * delta_tempo
+        y += self.velocita_y * delta_tempo
+
+        # Disattiva i laser usciti dallo schermo
+        self.attivo[(y > 800) | (y < 0) | (x < 0) | (x > 1200)] = False
+
+    def immagini(self):
+        """Restituisce l'immagine di ogni laser"""
+        if self.immagine is None:
+            self.immagine = pygame.Surface((self.LARGHEZZA, self.ALTEZZA), pygame.SRCALPHA)
+            pygame.draw.rect(self.immagine, self.COLORE, (0, 0, self.LARGHEZZA, self.ALTEZZA))
+        return repeat(self.immagine)
+
+
+# Velocità degli 8 laser di un'esplosione, ogni 45 gradi a partire da destra
+DIREZIONI_ESPLOSIONE = tuple((math.cos(math.radians(angolo)) * 150, math.sin(math.radians(angolo)) * 150)
+                             for angolo in range(0, 360, 45))
+
+
+class MagazzinoPalleFuoco(Magazzino):
+    """Tutte le palle di fuoco lanciate dal boss, che esplodono in più laser"""
+
+    LARGHEZZA = 20
+    ALTEZZA = 20
+    VELOCITA = 150
+    COLORE = (255, 165, 0)  # Arancione
+    COLONNE = (
+        ('tempo_esplosione', np.float64),
+        ('tempo_accumulato', np.float64),
+        ('esplosa', np.bool_),
+    )
+
+    def __init__(self, capacita=16):
+        """Inizializza il magazzino vuoto"""
+        super().__init__(capacita)
+
+    def aggiungi(self, x, y, tempo_esplosione=1.0):
+        """Aggiunge una palla di fuoco che esplode dopo tempo_esplosione secondi"""
+        return super().aggiungi(x, y, tempo_esplosione=tempo_esplosione)
 
     def aggiorna(self, delta_tempo):
-        """Aggiorna la posizione della palla di fuoco e controlla se deve esplodere"""
-        self.y += self.velocita * delta_tempo
-        self.rect.y = int(self.y)
+        """Aggiorna la posizione delle palle di fuoco e segna quelle che devono esplodere"""
+        y = self.y
+        y += self.VELOCITA * delta_tempo
 
         # Aggiorna il tempo accumulato
-        self.tempo_accumulato += delta_tempo
-
-        # Verifica se è ora di esplodere
-        if self.tempo_accumulato >= self.tempo_esplosione:
-            self.esplosa = True
-            self.attivo = False
-
-        # Disattiva se esce dallo schermo
-        if self.y > 800:
-            self.attivo = False
-
-    def esplodi(self):
-        """Crea i laser dell'esplosione"""
-        laser_esplosione = []
+        tempo_accumulato = self.tempo_accumulato
+        tempo_accumulato += delta_tempo
 
-        # Crea 8 laser in direzioni diverse
-        for i in range(8):
-            angolo = i * 45  # Angoli: 0, 45, 90, 135, 180, 225, 270, 315
-            radianti = math.radians(angolo)
+        # Le palle esplose e quelle uscite dallo schermo si disattivano
+        esplosa = tempo_accumulato >= self.tempo_esplosione
+        self.esplosa[:] = esplosa
+        self.attivo[esplosa | (y > 800)] = False
 
-            # Calcola la direzione in base all'angolo
-            dx = math.cos(radianti)
-            dy = math.sin(radianti)
+    def centri_esplosioni(self):
+        """Restituisce i centri delle palle esplose in questo passo, in ordine"""
+        esplosa = self.esplosa
+        return zip((self.x[esplosa] + self.LARGHEZZA / 2).tolist(), (self.y[esplosa] + self.ALTEZZA / 2).tolist())
 
-            # Crea un nuovo laser nella posizione della palla di fuoco
-            laser = BossLaser(self.x + (self.larghezza / 2), self.y + (self.altezza / 2))
-
-            # Imposta la velocità in base alla direzione
-            laser.velocita_x = dx * 150
-            laser.velocita_y = dy * 150
-            laser.direzione_personalizzata = True  # Indica che ha una direzione personalizzata
-
-            laser_esplosione.append(laser)
-
-        return laser_esplosione
-
-    def disegna(self, schermo):
-        """Disegna la palla di fuoco sullo schermo"""
-        schermo.blit(self.immagine, self.rect)
+    def immagini(self):
+        """Restituisce l'immagine di ogni palla di fuoco"""
+        if self.immagine is None:
+            self.immagine = pygame.Surface((self.LARGHEZZA, self.ALTEZZA), pygame.SRCALPHA)
+            pygame.draw.circle(self.immagine, self.COLORE,
+                               (self.LARGHEZZA // 2, self.ALTEZZA // 2),
+                               self.LARGHEZZA // 2)
+        return repeat(self.immagine)
 
 
 class Boss:
     """Classe che rappresenta il boss nemico"""
 
-    def __init__(self, area_gioco, livello=1):
-        """Inizializza il boss"""
+    __slots__ = ('area_gioco', 'casuale', 'livello', 'larghezza', 'altezza', 'x', 'y', 'x_prec', 'y_prec',
+                 'velocita_base', 'velocita', 'direzione', 'tempo_cambio_direzione', 'tempo_accumulato',
+                 'attivo', 'sconfitto', 'salute_massima', 'salute', 'ritardo_tiro_base', 'ritardo_tiro',
+                 'tempo_ultimo_tiro', 'usa_palle_fuoco', 'ritardo_palla_fuoco', 'tempo_ultima_palla_fuoco',
+                 'rect', 'immagine', 'colore_barra_salute', 'colore_sfondo_barra')
+
+    LARGHEZZA = 100
+    ALTEZZA = 80
+    PERCORSO_IMMAGINE = os.path.join("entita", "boss.png")
+
+    # Formule di difficoltà per livello, sovrascrivibili per il bilanciamento
+    PARAMETRI_PREDEFINITI = {
+        'velocita_base': 80,
+        'velocita_per_livello': 10,
+        'salute_base': 10,
+        'salute_per_livello': 5,
+        'ritardo_tiro_base': 2.0,  # Secondi tra un tiro e l'altro
+        'ritardo_tiro_per_livello': 0.2,
+        'ritardo_tiro_minimo': 0.5,
+        'ritardo_palla_fuoco_base': 5.0,
+        'ritardo_palla_fuoco_per_livello': 0.5,
+        'ritardo_palla_fuoco_minimo': 3.0,
+        'livello_palle_fuoco': 2,  # Livello da cui lancia palle di fuoco
+    }
+
+    def __init__(self, area_gioco, livello=1, parametri=None, casuale=None):
+        """Inizializza il boss
+
+        casuale è il FlussiCasuali della partita: il boss estrae dal flusso
+        boss e le sue palle di fuoco dal flusso palle_fuoco.
+        """
         self.area_gioco = area_gioco
+        self.casuale = casuale if casuale is not None else FlussiCasuali()
         self.livello = livello  # Livello del boss, aumenta la difficoltà
-        self.larghezza = 100
-        self.altezza = 80
+        self.larghezza = self.LARGHEZZA
+        self.altezza = self.ALTEZZA
+
+        # Parametri di difficoltà effettivi
+        p = dict(self.PARAMETRI_PREDEFINITI)
+        if parametri:
+            p.update(parametri)
 
         # Posizione: centra il boss nella parte superiore dell'area di gioco
         self.x = area_gioco.centerx - self.larghezza // 2
         self.y = 50  # Distanza dall'alto
 
         # Velocità e movimento
-        self.velocita_base = 80
-        self.velocita = self.velocita_base + (self.livello * 10)  # Aumenta con il livello
-        self.direzione = random.choice([-1, 1])  # -1 = sinistra, 1 = destra
-        self.tempo_cambio_direzione = random.uniform(1.5, 3.0)  # Secondi prima di cambiare direzione
+        self.velocita_base = p['velocita_base']
+        self.velocita = self.velocita_base + (self.livello * p['velocita_per_livello'])  # Aumenta con il livello
+        self.direzione = self.casuale.boss.choice([-1, 1])  # -1 = sinistra, 1 = destra
+        self.tempo_cambio_direzione = self.casuale.boss.uniform(1.5, 3.0)  # Secondi prima di cambiare direzione
         self.tempo_accumulato = 0
 
         # Stato del boss
@@ -153,17 +173,19 @@ class Boss:
         self.sconfitto = False
 
         # Salute
-        self.salute_massima = 10 + (self.livello * 5)  # Aumenta con il livello
+        self.salute_massima = p['salute_base'] + (self.livello * p['salute_per_livello'])  # Aumenta con il livello
         self.salute = self.salute_massima
 
         # Tiro
-        self.ritardo_tiro_base = 2.0  # Secondi tra un tiro e l'altro
-        self.ritardo_tiro = max(0.5, self.ritardo_tiro_base - (self.livello * 0.2))  # Diminuisce con il livello
+        self.ritardo_tiro_base = p['ritardo_tiro_base']
+        self.ritardo_tiro = max(p['ritardo_tiro_minimo'],
+                                self.ritardo_tiro_base - (self.livello * p['ritardo_tiro_per_livello']))  # Diminuisce con il livello
         self.tempo_ultimo_tiro = 0
 
         # Lancio palle di fuoco (dal livello 2 in poi)
-        self.usa_palle_fuoco = livello >= 2
-        self.ritardo_palla_fuoco = max(3.0, 5.0 - (self.livello * 0.5))
+        self.usa_palle_fuoco = livello >= p['livello_palle_fuoco']
+        self.ritardo_palla_fuoco = max(p['ritardo_palla_fuoco_minimo'],
+                                       p['ritardo_palla_fuoco_base'] - (self.livello * p['ritardo_palla_fuoco_per_livello']))
         self.tempo_ultima_palla_fuoco = 0
 
         # Rettangolo di collisione
@@ -180,9 +202,8 @@ class Boss:
         """Carica l'immagine del boss"""
         try:
             # Carica l'immagine dalla directory entita
-            percorso = os.path.join("entita", "boss.png")
-            immagine = pygame.image.load(percorso).convert_alpha()
-            return pygame.transform.scale(immagine, (self.larghezza, self.altezza))
+            return caricatore_risorse().ottieni_immagine(
+                self.PERCORSO_IMMAGINE, (self.larghezza, self.altezza), alpha=True)
         except Exception as e:
             print(f"Errore nel caricamento dell'immagine del boss: {e}")
             # Crea un placeholder se l'immagine non è disponibile
@@ -197,8 +218,8 @@ class Boss:
 
         # Cambia direzione dopo un certo tempo
         if self.tempo_accumulato >= self.tempo_cambio_direzione:
-            self.direzione = random.choice([-1, 1])
-            self.tempo_cambio_direzione = random.uniform(1.5, 3.0)
+            self.direzione = self.casuale.boss.choice([-1, 1])
+            self.tempo_cambio_direzione = self.casuale.boss.uniform(1.5, 3.0)
             self.tempo_accumulato = 0
 
         # Aggiorna la posizione
@@ -217,7 +238,7 @@ class Boss:
         self.rect.y = int(self.y)
 
     def spara(self, tempo_corrente):
-        """Verifica se il boss deve sparare e crea un laser se necessario"""
+        """Verifica se il boss deve sparare e restituisce la posizione del nuovo laser, o None"""
         # Verifica se è passato abbastanza tempo dall'ultimo tiro
         if tempo_corrente - self.tempo_ultimo_tiro >= self.ritardo_tiro * 1000:  # Converti in millisecondi
             self.tempo_ultimo_tiro = tempo_corrente
@@ -226,21 +247,25 @@ class Boss:
             x_laser = self.x + (self.larghezza // 2) - 4  # 4 è metà della larghezza del laser
             y_laser = self.y + self.altezza + 5  # Poco sotto il boss
 
-            return BossLaser(x_laser, y_laser)
+            return x_laser, y_laser
 
         return None
 
     def lancia_palla_fuoco(self, tempo_corrente):
-        """Verifica se il boss deve lanciare una palla di fuoco"""
+        """Verifica se il boss deve lanciare una palla di fuoco
+
+        Restituisce posizione e tempo di esplosione della nuova palla, o None.
+        """
         # Verifica se il boss può lanciare palle di fuoco e se è passato abbastanza tempo
         if self.usa_palle_fuoco and tempo_corrente - self.tempo_ultima_palla_fuoco >= self.ritardo_palla_fuoco * 1000:
             self.tempo_ultima_palla_fuoco = tempo_corrente
 
             # Crea una palla di fuoco in posizione casuale sotto il boss
-            x_palla = self.x + random.randint(0, self.larghezza - 20)
+            x_palla = self.x + self.casuale.palle_fuoco.randint(0, self.larghezza - 20)
             y_palla = self.y + self.altezza + 10
 
-            return PallaDiFuoco(x_palla, y_palla)
+            # Esplode dopo un tempo casuale
+            return x_palla, y_palla, self.casuale.palle_fuoco.uniform(0.5, 1.5)
 
         return None
 
@@ -257,24 +282,26 @@ class Boss:
         return False  # Boss ancora attivo
 
     def disegna(self, schermo):
-        """Disegna il boss e la barra della salute"""
+        """Disegna il boss e la barra della salute, restituendo l'area modificata"""
         # Disegna il boss
-        schermo.blit(self.immagine, self.rect)
+        area = schermo.blit(self.immagine, self.rect)
 
         # Disegna la barra della salute
         larghezza_barra = 100
         altezza_barra = 10
-        x_barra = self.x
-        y_barra = self.y - 20
+        x_barra = self.rect.x
+        y_barra = self.rect.y - 20
 
         # Sfondo della barra
-        pygame.draw.rect(schermo, self.colore_sfondo_barra, (x_barra, y_barra, larghezza_barra, altezza_barra))
+        area_barra = pygame.draw.rect(schermo, self.colore_sfondo_barra, (x_barra, y_barra, larghezza_barra, altezza_barra))
 
         # Barra della salute
         percentuale_salute = self.salute / self.salute_massima
         larghezza_attuale = larghezza_barra * percentuale_salute
         pygame.draw.rect(schermo, self.colore_barra_salute, (x_barra, y_barra, larghezza_attuale, altezza_barra))
 
+        return area.union(area_barra)
+
     def collide_con(self, altro_rect):
         """Controlla se il boss collide con un altro rettangolo"""
         return self.rect.colliderect(altro_rect)
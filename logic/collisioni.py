@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+Collisioni AABB in blocco
+Confronta interi array di rettangoli (x, y, larghezza, altezza) con una
+sola operazione NumPy, con le stesse regole di pygame.Rect.colliderect:
+i bordi che si toccano non collidono. I rettangoli devono avere larghezza
+e altezza positive, come tutte le entità del gioco: pygame scarta quelli
+vuoti, qui non vengono controllati. I proiettili veloci usano il test
+spazzato, che segue i rettangoli lungo tutto il tragitto di un passo
+"""
+
+import numpy as np
+
+
+def sovrapposti(a, b):
+    """Restituisce la maschera delle coppie a[i], b[i] che si sovrappongono
+
+    a e b sono tuple (x, y, larghezza, altezza) di array della stessa
+    lunghezza, oppure di scalari per confrontare tutto con un solo rettangolo.
+    """
+    ax, ay, al, aa = a
+    bx, by, bl, ba = b
+    return (ax < bx + bl) & (ax + al > bx) & (ay < by + ba) & (ay + aa > by)
+
+
+def intervallo(distanza, spostamento, larghezza_a, larghezza_b):
+    """Restituisce la frazione di passo (entrata, uscita) in cui due proiezioni si sovrappongono
+
+    distanza è la posizione iniziale di a meno quella di b su un asse,
+    spostamento il moto relativo di a nel passo. L'intervallo è aperto;
+    senza moto relativo è tutto il passo o nessun istante.
+    """
+    # Anche con scalari Python la divisione per zero deve dare inf, non un'eccezione
+    distanza = np.asarray(distanza, np.float64)
+    spostamento = np.asarray(spostamento, np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (-larghezza_a - distanza) / spostamento
+        t2 = (larghezza_b - distanza) / spostamento
+    fermi = spostamento == 0
+    sovrapposti_fermi = (distanza > -larghezza_a) & (distanza < larghezza_b)
+    entrata = np.where(fermi, np.where(sovrapposti_fermi, -np.inf, np.inf), np.minimum(t1, t2))
+    uscita = np.where(fermi, np.where(sovrapposti_fermi, np.inf, -np.inf), np.maximum(t1, t2))
+    return entrata, uscita
+
+
+def spazzati(a, b):
+    """Restituisce la maschera delle coppie che si sovrappongono in un istante qualsiasi del passo
+
+    a e b sono tuple (x_inizio, y_inizio, x, y, larghezza, altezza): il
+    rettangolo si muove in linea retta dalla posizione iniziale a quella
+    attuale. A fine passo il risultato coincide con sovrapposti(), ma un
+    proiettile veloce non può più attraversare un bersaglio tra due tick.
+    """
+    return istanti_contatto(a, b) < np.inf
+
+
+def istanti_contatto(a, b):
+    """Restituisce la frazione di passo in [0, 1) del primo contatto di ogni coppia, o inf
+
+    Stessa forma di spazzati(); 0 se le due entità erano già sovrapposte
+    all'inizio del passo.
+    """
+    # Due tragitti possono toccarsi solo se i loro ingombri si sovrappongono
+    vicini = sovrapposti(ingombro(a), ingombro(b))
+    if not np.any(vicini):
+        return np.full(np.shape(vicini), np.inf)
+    ax0, ay0, ax, ay, al, aa = a
+    bx0, by0, bx, by, bl, ba = b
+    entrata_x, uscita_x = intervallo(ax0 - bx0, (ax - ax0) - (bx - bx0), al, bl)
+    entrata_y, uscita_y = intervallo(ay0 - by0, (ay - ay0) - (by - by0), aa, ba)
+    entrata = np.maximum(entrata_x, entrata_y)
+    uscita = np.minimum(uscita_x, uscita_y)
+    # Qualche istante in (0, 1] in cui si sovrappongono su entrambi gli assi
+    contatto = vicini & (entrata < uscita) & (entrata < 1) & (uscita > 0)
+    return np.where(contatto, np.maximum(entrata, 0.0), np.inf)
+
+
+def ingombro(rettangoli):
+    """Restituisce il rettangolo (x, y, larghezza, altezza) che contiene tutto il tragitto"""
+    if len(rettangoli) == 4:
+        return rettangoli
+    x_inizio, y_inizio, x, y, larghezza, altezza = rettangoli
+    return (np.minimum(x_inizio, x), np.minimum(y_inizio, y),
+            np.abs(x - x_inizio) + larghezza, np.abs(y - y_inizio) + altezza)
+
+
+def con_inizio(rettangoli):
+    """Restituisce i rettangoli come tragitti, con inizio uguale alla fine se mancava"""
+    if len(rettangoli) == 4:
+        return (rettangoli[0], rettangoli[1]) + tuple(rettangoli)
+    return rettangoli
+
+
+def confronta(a, b):
+    """Applica sovrapposti o spazzati a seconda che i rettangoli abbiano una posizione iniziale"""
+    if len(a) == 4 and len(b) == 4:
+        return sovrapposti(a, b)
+    return spazzati(con_inizio(a), con_inizio(b))
+
+
+def con_rect(a, rect):
+    """Restituisce la maschera dei rettangoli di a che si sovrappongono a un pygame.Rect"""
+    return sovrapposti(a, (rect.x, rect.y, rect.width, rect.height))
+
+
+def matrice(a, b):
+    """Restituisce la matrice len(a) x len(b) delle sovrapposizioni
+
+    Qui e sotto i rettangoli possono essere (x, y, larghezza, altezza) o,
+    per il test spazzato, (x_inizio, y_inizio, x, y, larghezza, altezza).
+    """
+    return confronta(colonna(a), b)
+
+
+def matrice_istanti(a, b):
+    """Restituisce la matrice len(a) x len(b) degli istanti di primo contatto, o inf"""
+    return istanti_contatto(con_inizio(colonna(a)), con_inizio(b))
+
+
+def colonna(rettangoli):
+    """Dispone i rettangoli lungo il primo asse, per confrontarli con tutti quelli dell'altro"""
+    return tuple(np.asarray(valori)[:, None] for valori in rettangoli)
+
+
+def coppie(a, b):
+    """Restituisce gli indici (i, j) di tutte le coppie a[i], b[j] che si sovrappongono
+
+    Le coppie sono ordinate per i e poi per j.
+    """
+    return np.nonzero(matrice(a, b))
+
+
+def primo_colpito(a, b):
+    """Restituisce per ogni rettangolo di a il primo rettangolo di b colpito, o -1
+
+    È la regola del laser che danneggia al più un nemico: vale quello che
+    tocca per primo lungo il tragitto e, a pari istante, quello con
+    l'indice minore, cioè il primo creato.
+    """
+    istanti = matrice_istanti(a, b)
+    if not istanti.shape[1]:
+        return np.full(istanti.shape[0], -1, np.intp)
+    # argmin restituisce il primo indice tra quelli con lo stesso istante
+    primi = istanti.argmin(axis=1)
+    return np.where(istanti.min(axis=1) < np.inf, primi, -1)
+
+
+def primo_per_riga(righe, colonne, numero_righe):
+    """Riduce coppie (riga, colonna) ordinate per riga alla prima colonna di ogni riga, o -1"""
+    primi = np.full(numero_righe, -1, np.intp)
+    if len(righe):
+        nuove = np.ones(len(righe), bool)
+        nuove[1:] = righe[1:] != righe[:-1]
+        primi[righe[nuove]] = colonne[nuove]
+    return primi
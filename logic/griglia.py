@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+"""
+Griglia spaziale uniforme per le collisioni
+Ogni rettangolo viene registrato nelle celle che copre; una ricerca
+confronta soltanto le entità delle celle vicine, così il costo delle
+collisioni cresce con il numero di entità e non con il suo quadrato
+"""
+
+import numpy as np
+
+from logic import collisioni
+
+
+class GrigliaSpaziale:
+    """Spatial hash a celle quadrate sopra l'area di gioco
+
+    Si ricostruisce a ogni tick da array di rettangoli interi (x, y,
+    larghezza, altezza), come quelli di Magazzino.rettangoli(), o dai
+    tragitti di Magazzino.movimenti(). Le celle
+    continuano oltre i bordi dell'area, che ne fissa solo l'origine: i
+    nemici in attesa sopra lo schermo non si ammassano in una cella. Le
+    ricerche restituiscono gli indici delle entità registrate in ordine
+    crescente, cioè nell'ordine di creazione.
+
+    Le celle si calcolano solo alla prima ricerca che ne ha bisogno: finché
+    le coppie possibili sono poche, confrontare tutto con tutto in un'unica
+    operazione costa meno che costruire l'indice.
+    """
+
+    # Sotto questo numero di coppie possibili si confronta direttamente
+    SOGLIA_CONFRONTO_DIRETTO = 32768
+
+    def __init__(self, area, lato_cella=80):
+        """Prepara una griglia vuota con origine nell'angolo dell'area (pygame.Rect)"""
+        self.sinistra = area.left
+        self.alto = area.top
+        self.lato_cella = lato_cella
+        self.svuota()
+
+    def svuota(self):
+        """Elimina tutte le entità registrate"""
+        vuoto = np.zeros(0, np.int32)
+        self.rettangoli = (vuoto, vuoto, vuoto, vuoto)
+        self.chiavi = None  # Celle ordinate, calcolate da indicizza()
+        self.elementi = None  # Entità nella cella corrispondente
+
+    def __len__(self):
+        """Restituisce il numero di entità registrate"""
+        return len(self.rettangoli[0])
+
+    def celle(self, rettangoli):
+        """Restituisce (proprietario, cella) per ogni cella coperta da ogni rettangolo"""
+        x, y, larghezza, altezza = collisioni.ingombro(rettangoli)
+        lato = self.lato_cella
+        # Un rettangolo copre i pixel da x a x + larghezza - 1 compresi
+        colonna_inizio = (x - self.sinistra) // lato
+        colonna_fine = (x + np.maximum(larghezza, 1) - 1 - self.sinistra) // lato
+        riga_inizio = (y - self.alto) // lato
+        riga_fine = (y + np.maximum(altezza, 1) - 1 - self.alto) // lato
+
+        larghezze = colonna_fine - colonna_inizio + 1
+        conteggi = larghezze * (riga_fine - riga_inizio + 1)
+        proprietari = np.repeat(np.arange(len(x)), conteggi)
+        # Posizione di ogni cella all'interno del rettangolo del suo proprietario
+        locale = np.arange(len(proprietari)) - np.repeat(np.cumsum(conteggi) - conteggi, conteggi)
+        larghezze = larghezze[proprietari]
+        colonna = colonna_inizio[proprietari] + locale % larghezze
+        riga = riga_inizio[proprietari] + locale // larghezze
+        # Chiave unica per cella anche con righe e colonne negative
+        return proprietari, (riga.astype(np.int64) << 32) + colonna
+
+    def costruisci(self, rettangoli):
+        """Registra i rettangoli, sostituendo quelli del tick precedente
+
+        rettangoli è una tupla di array (x, y, larghezza, altezza), oppure
+        (x_inizio, y_inizio, x, y, larghezza, altezza) per entità in moto: in
+        quel caso conta tutto il tragitto del passo (vedi collisioni.spazzati).
+        """
+        self.rettangoli = tuple(np.asarray(valori, np.int32) for valori in rettangoli)
+        self.chiavi = None
+        self.elementi = None
+
+    def indicizza(self):
+        """Assegna i rettangoli registrati alle celle, se non è già stato fatto"""
+        if self.chiavi is not None:
+            return
+        proprietari, chiavi = self.celle(self.rettangoli)
+        ordine = np.argsort(chiavi, kind='stable')
+        self.chiavi = chiavi[ordine]
+        self.elementi = proprietari[ordine]
+
+    def candidati(self, rettangoli):
+        """Restituisce le coppie (ricerca, entità) che condividono almeno una cella
+
+        Una coppia può comparire una volta per ogni cella in comune.
+        """
+        self.indicizza()
+        proprietari, chiavi = self.celle(rettangoli)
+        inizi = np.searchsorted(self.chiavi, chiavi, 'left')
+        conteggi = np.searchsorted(self.chiavi, chiavi, 'right') - inizi
+        ricerche = np.repeat(proprietari, conteggi)
+        posizioni = (np.arange(len(ricerche)) - np.repeat(np.cumsum(conteggi) - conteggi, conteggi)
+                     + np.repeat(inizi, conteggi))
+        return ricerche, self.elementi[posizioni]
+
+    def coppie(self, rettangoli):
+        """Restituisce le coppie (ricerca, entità) di rettangoli che si sovrappongono
+
+        rettangoli ha la stessa forma accettata da costruisci(). Le coppie
+        sono ordinate per rettangolo di ricerca e poi per entità.
+        """
+        rettangoli = tuple(np.asarray(valori, np.int32) for valori in rettangoli)
+        numero = len(rettangoli[0])
+        if not numero or not len(self):
+            vuoto = np.zeros(0, np.intp)
+            return vuoto, vuoto
+        if numero * len(self) <= self.SOGLIA_CONFRONTO_DIRETTO:
+            return collisioni.coppie(rettangoli, self.rettangoli)
+        ricerche, entita = self.candidati(rettangoli)
+
+        # Test esatto sulle sole coppie candidate
+        sovrapposti = collisioni.confronta(tuple(valori[ricerche] for valori in rettangoli),
+                                           tuple(valori[entita] for valori in self.rettangoli))
+
+        # Toglie i doppioni delle coppie che condividono più celle
+        chiavi = np.unique(ricerche[sovrapposti].astype(np.int64) * len(self) + entita[sovrapposti])
+        return chiavi // len(self), chiavi % len(self)
+
+    def interroga_rect(self, rect):
+        """Restituisce gli indici delle entità che si sovrappongono al rettangolo"""
+        _, entita = self.coppie(([rect.x], [rect.y], [rect.width], [rect.height]))
+        return entita
+
+    def interroga_punto(self, x, y):
+        """Restituisce gli indici delle entità che contengono il punto"""
+        _, entita = self.coppie(([x], [y], [1], [1]))
+        return entita
+
+    def primo_colpito(self, rettangoli):
+        """Restituisce per ogni rettangolo di ricerca la prima entità colpita, o -1
+
+        Come collisioni.primo_colpito: conta il primo contatto lungo il
+        tragitto e, a pari istante, l'entità con l'indice minore.
+        """
+        numero = len(rettangoli[0])
+        if numero * len(self) <= self.SOGLIA_CONFRONTO_DIRETTO:
+            return collisioni.primo_colpito(rettangoli, self.rettangoli)
+        ricerche, entita = self.coppie(rettangoli)
+        istanti = collisioni.istanti_contatto(
+            collisioni.con_inizio(tuple(np.asarray(valori)[ricerche] for valori in rettangoli)),
+            collisioni.con_inizio(tuple(valori[entita] for valori in self.rettangoli)))
+        ordine = np.lexsort((entita, istanti, ricerche))
+        return collisioni.primo_per_riga(ricerche[ordine], entita[ordine], numero)
+
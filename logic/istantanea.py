@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+"""
+Istantanee complete dello stato di ScenaGioco
+Ogni tipo di entità viene impacchettato in un unico buffer struct, così
+cattura e ripristino sono poche copie in blocco invece di un dizionario
+per oggetto; per i magazzini in array il buffer è direttamente quello di
+un array strutturato NumPy
+"""
+
+import struct
+import zlib
+from operator import attrgetter
+
+import numpy as np
+
+from logic.boss import Boss
+from core.casuale import FLUSSI, FORMATO_STATO as FORMATO_FLUSSI
+
+# Campi salvati per ogni tipo di entità, con il formato struct corrispondente
+CAMPI_NAVE = ('x', 'y', 'velocita', 'ritardo_sparo', 'tempo_ultimo_sparo', 'danno',
+              'movimento_sinistra', 'movimento_destra', 'sparo_attivo')
+FORMATO_NAVE = struct.Struct('<ddddqb???')
+
+CAMPI_SCALARI = ('punteggio', 'vite', 'game_over_status', 'tempo_game_over', 'tempo_ultimo_spawn',
+                 'punteggio_ultimo_power_up', 'punteggio_ultimo_boss', 'livello_boss', 'boss_attivo',
+                 'tempo_messaggio_power_up')
+FORMATO_SCALARI = struct.Struct('<qb?qqqqi?q')
+FORMATO_OROLOGIO = struct.Struct('<dq')
+
+CAMPI_BOSS = ('livello', 'x', 'y', 'velocita', 'direzione', 'tempo_cambio_direzione', 'tempo_accumulato',
+              'salute', 'salute_massima', 'ritardo_tiro', 'tempo_ultimo_tiro', 'usa_palle_fuoco',
+              'ritardo_palla_fuoco', 'tempo_ultima_palla_fuoco', 'attivo', 'sconfitto')
+FORMATO_BOSS = struct.Struct('<idddddddddq?dq??')
+
+# Magazzini di entità: (attributo della scena, campi, formato di un elemento).
+# attivo serve perché le entità colpite restano nei magazzini fino al tick successivo
+LISTE = (
+    ('lasers', ('x', 'y', 'velocita', 'attivo'), '<ddd?'),
+    ('nemici', ('x', 'y', 'tipo', 'salute', 'attivo'), '<ddbb?'),
+    ('power_ups', ('x', 'y', 'tipo', 'attivo'), '<ddb?'),
+    ('laser_boss', ('x', 'y', 'velocita', 'velocita_x', 'velocita_y', 'direzione_personalizzata', 'attivo'),
+     '<ddddd??'),
+    ('palle_fuoco', ('x', 'y', 'tempo_esplosione', 'tempo_accumulato', 'attivo'), '<dddd?'),
+)
+FORMATI_LISTE = {nome: struct.Struct(formato) for nome, _, formato in LISTE}
+
+# Tipi NumPy equivalenti ai codici struct usati sopra
+TIPI_STRUCT = {'d': '<f8', 'q': '<i8', 'i': '<i4', 'b': 'i1', '?': '?'}
+
+# Array strutturato con la stessa disposizione in byte del formato struct
+TIPI_LISTE = {nome: np.dtype([(campo, TIPI_STRUCT[codice]) for campo, codice in zip(campi, formato[1:])])
+              for nome, campi, formato in LISTE}
+
+
+def impacchetta_lista(magazzino, nome):
+    """Impacchetta tutte le entità di un magazzino in un unico buffer"""
+    if not len(magazzino):
+        return b''
+    return magazzino.righe(TIPI_LISTE[nome]).tobytes()
+
+
+def ripristina_lista(magazzino, dati, nome):
+    """Riporta il magazzino al contenuto del buffer"""
+    magazzino.ripristina(np.frombuffer(dati, TIPI_LISTE[nome]))
+
+
+def cattura(scena):
+    """Restituisce lo stato completo della scena come dizionario di buffer per tipo"""
+    orologio = scena.gioco.orologio_simulazione
+    stato = {
+        'nave': FORMATO_NAVE.pack(*attrgetter(*CAMPI_NAVE)(scena.nave_giocatore)),
+        'scalari': FORMATO_SCALARI.pack(*attrgetter(*CAMPI_SCALARI)(scena)),
+        'orologio': FORMATO_OROLOGIO.pack(orologio.tempo, orologio.tick),
+        'messaggio': scena.messaggio_power_up.encode('utf-8'),
+        'casuale': scena.casuale.impacchetta(),
+    }
+    for nome, _, _ in LISTE:
+        stato[nome] = impacchetta_lista(getattr(scena, nome), nome)
+    if scena.boss:
+        stato['boss'] = FORMATO_BOSS.pack(*attrgetter(*CAMPI_BOSS)(scena.boss))
+    return stato
+
+
+def impronta(stato):
+    """Restituisce un crc32 dell'istantanea, economico da calcolare a ogni tick"""
+    crc = 0
+    for nome in sorted(stato):
+        crc = zlib.crc32(nome.encode('utf-8'), crc)
+        crc = zlib.crc32(stato[nome], crc)
+    return crc
+
+
+def descrivi(stato):
+    """Decodifica l'istantanea in un dizionario ordinato campo -> valore"""
+    campi = {}
+    campi.update(zip(('nave.' + campo for campo in CAMPI_NAVE), FORMATO_NAVE.unpack(stato['nave'])))
+    campi.update(zip(('scena.' + campo for campo in CAMPI_SCALARI), FORMATO_SCALARI.unpack(stato['scalari'])))
+    campi.update(zip(('orologio.tempo', 'orologio.tick'), FORMATO_OROLOGIO.unpack(stato['orologio'])))
+    campi['scena.messaggio_power_up'] = stato['messaggio'].decode('utf-8')
+    campi.update(zip(('casuale.' + nome for nome in FLUSSI), FORMATO_FLUSSI.unpack(stato['casuale'])))
+    for nome, nomi_campi, _ in LISTE:
+        formato = FORMATI_LISTE[nome]
+        righe = list(formato.iter_unpack(stato[nome])) if stato[nome] else []
+        campi[nome + '.numero'] = len(righe)
+        for indice, valori in enumerate(righe):
+            campi.update(zip((f"{nome}[{indice}].{campo}" for campo in nomi_campi), valori))
+    if 'boss' in stato:
+        campi.update(zip(('boss.' + campo for campo in CAMPI_BOSS), FORMATO_BOSS.unpack(stato['boss'])))
+    else:
+        campi['boss'] = None
+    return campi
+
+
+def differenze(stato_a, stato_b):
+    """Restituisce i campi diversi tra due istantanee come lista di (campo, valore_a, valore_b)"""
+    campi_a = descrivi(stato_a)
+    campi_b = descrivi(stato_b)
+    assenti = object()
+    diversi = []
+    for campo in list(campi_a) + [campo for campo in campi_b if campo not in campi_a]:
+        valore_a = campi_a.get(campo, assenti)
+        valore_b = campi_b.get(campo, assenti)
+        if valore_a != valore_b:
+            diversi.append((campo, None if valore_a is assenti else valore_a,
+                            None if valore_b is assenti else valore_b))
+    return diversi
+
+
+def posiziona(entita, x, y):
+    """Imposta la posizione di un'entità e il suo rect di collisione"""
+    entita.x = x
+    entita.y = y
+    entita.rect.x = int(x)
+    entita.rect.y = int(y)
+
+
+def ripristina(scena, stato):
+    """Riporta la scena allo stato catturato da cattura()"""
+    nave = scena.nave_giocatore
+    for campo, valore in zip(CAMPI_NAVE, FORMATO_NAVE.unpack(stato['nave'])):
+        setattr(nave, campo, valore)
+    posiziona(nave, nave.x, nave.y)
+    nave.immagine = nave.immagini[nave.danno]
+
+    for campo, valore in zip(CAMPI_SCALARI, FORMATO_SCALARI.unpack(stato['scalari'])):
+        setattr(scena, campo, valore)
+    scena.messaggio_power_up = stato['messaggio'].decode('utf-8')
+
+    orologio = scena.gioco.orologio_simulazione
+    orologio.tempo, orologio.tick = FORMATO_OROLOGIO.unpack(stato['orologio'])
+
+    for nome, _, _ in LISTE:
+        ripristina_lista(getattr(scena, nome), stato[nome], nome)
+
+    if 'boss' in stato:
+        valori = FORMATO_BOSS.unpack(stato['boss'])
+        if scena.boss is None or scena.boss.livello != valori[0]:
+            scena.boss = Boss(scena.area_gioco, valori[0], scena.parametri_boss, scena.casuale)
+        for campo, valore in zip(CAMPI_BOSS, valori):
+            setattr(scena.boss, campo, valore)
+        posiziona(scena.boss, scena.boss.x, scena.boss.y)
+    else:
+        scena.boss = None
+
+    # Per ultimo, perché la creazione del boss estrae numeri casuali
+    scena.casuale.ripristina(stato['casuale'])
@@ -4,31 +4,26 @@
 Gestione dei laser sparati dalla nave del giocatore
 """
 
-import pygame
+import numpy as np
+from logic.magazzino import Magazzino
 
-class Laser:
-    """Classe che rappresenta un laser sparato dalla nave del giocatore"""
+class MagazzinoLaser(Magazzino):
+    """Tutti i laser sparati dalla nave del giocatore"""
 
-    def __init__(self, x, y, velocita=400):
-        """Inizializza un laser"""
-        self.larghezza = 4
-        self.altezza = 15
-        self.x = x
-        self.y = y
-        self.velocita = velocita
-        self.colore = (0, 255, 0)  # Verde
-        self.rect = pygame.Rect(self.x, self.y, self.larghezza, self.altezza)
-        self.attivo = True
+    LARGHEZZA = 4
+    ALTEZZA = 15
+    VELOCITA = 400
+    COLORE = (0, 255, 0)  # Verde
+    COLONNE = (('velocita', np.float64),)
 
-    def aggiorna(self, delta_tempo):
-        """Aggiorna la posizione del laser"""
-        self.y -= self.velocita * delta_tempo
-        self.rect.y = int(self.y)
+    def aggiungi(self, x, y, velocita=VELOCITA):
+        """Aggiunge un laser e ne restituisce l'indice"""
+        return super().aggiungi(x, y, velocita=velocita)
 
-        # Disattiva il laser se esce dallo schermo
-        if self.y < 0:
-            self.attivo = False
+    def aggiorna(self, delta_tempo):
+        """Aggiorna la posizione di tutti i laser"""
+        y = self.y
+        y -= self.velocita * delta_tempo
 
-    def disegna(self, schermo):
-        """Disegna il laser sullo schermo"""
-        pygame.draw.rect(schermo, self.colore, self.rect)
\ No newline at end of file
+        # Disattiva i laser usciti dallo schermo
+        self.attivo[y < 0] = False
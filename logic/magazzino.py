@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+"""
+Magazzino delle entità in array NumPy
+Le entità di un tipo vivono in array paralleli, una riga per entità: il
+movimento, lo scarto di quelle uscite dallo schermo e le collisioni con un
+rettangolo sono poche operazioni vettoriali per tipo, invece di un metodo
+Python per oggetto
+"""
+
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+from logic import collisioni
+
+# Colonne comuni a tutti i tipi di entità
+COLONNE_BASE = (
+    ('x', np.float64),
+    ('y', np.float64),
+    ('x_prec', np.float64),  # Posizione al passo precedente, per l'interpolazione
+    ('y_prec', np.float64),
+    ('larghezza', np.int32),
+    ('altezza', np.int32),
+    ('attivo', np.bool_),
+)
+
+
+class Magazzino:
+    """Entità di un tipo in array NumPy paralleli (structure of arrays)
+
+    Le colonne si leggono come attributi, ad esempio magazzino.y, e sono
+    viste sulle sole righe occupate, modificabili sul posto (magazzino.y[:] = ...
+    o magazzino.y += ...). Come nelle vecchie liste di oggetti, un'entità
+    disattivata resta al suo posto con attivo=False finché compatta() non la
+    scarta, e l'ordine delle righe è quello di creazione.
+    """
+
+    LARGHEZZA = 0
+    ALTEZZA = 0
+    COLONNE = ()  # Colonne proprie del tipo: (nome, dtype)
+    COLORE = (255, 255, 255)  # Colore dell'immagine predefinita
+
+    def __init__(self, capacita=64):
+        """Alloca le colonne; raddoppiano quando si riempiono"""
+        self.colonne = {nome: np.zeros(capacita, tipo) for nome, tipo in COLONNE_BASE + self.COLONNE}
+        self.buffer_righe = {}  # Array strutturati riusati da righe(), per tipo
+        self.immagine = None  # Immagine comune a tutte le righe, creata al primo disegno
+        self.imposta_numero(0)
+
+    def imposta_numero(self, numero):
+        """Cambia il numero di righe occupate e rinnova le viste sulle colonne"""
+        self.numero = numero
+        for nome, colonna in self.colonne.items():
+            setattr(self, nome, colonna[:numero])
+
+    def __len__(self):
+        """Restituisce il numero di entità, comprese quelle disattivate"""
+        return self.numero
+
+    def cresci(self, capacita):
+        """Porta tutte le colonne almeno alla capacità indicata"""
+        attuale = len(self.colonne['x'])
+        if capacita <= attuale:
+            return
+        while attuale < capacita:
+            attuale *= 2
+        for nome, colonna in self.colonne.items():
+            nuova = np.zeros(attuale, colonna.dtype)
+            nuova[:self.numero] = colonna[:self.numero]
+            self.colonne[nome] = nuova
+
+    def aggiungi(self, x, y, **valori):
+        """Aggiunge un'entità in fondo e ne restituisce l'indice
+
+        Le colonne non indicate partono da zero; larghezza e altezza dalle
+        dimensioni del tipo.
+        """
+        indice = self.numero
+        self.cresci(indice + 1)
+        for colonna in self.colonne.values():
+            colonna[indice] = 0
+        colonne = self.colonne
+        colonne['x'][indice] = colonne['x_prec'][indice] = x
+        colonne['y'][indice] = colonne['y_prec'][indice] = y
+        colonne['larghezza'][indice] = self.LARGHEZZA
+        colonne['altezza'][indice] = self.ALTEZZA
+        colonne['attivo'][indice] = True
+        for nome, valore in valori.items():
+            colonne[nome][indice] = valore
+        self.imposta_numero(indice + 1)
+        return indice
+
+    def svuota(self):
+        """Elimina tutte le entità"""
+        self.imposta_numero(0)
+
+    def compatta(self):
+        """Scarta le entità disattivate mantenendo l'ordine delle altre"""
+        attivi = self.attivo
+        if not self.numero or attivi.all():
+            return
+        # Copia: la colonna attivo viene riscritta insieme alle altre
+        attivi = attivi.copy()
+        rimasti = int(np.count_nonzero(attivi))
+        for colonna in self.colonne.values():
+            colonna[:rimasti] = colonna[:self.numero][attivi]
+        self.imposta_numero(rimasti)
+
+    def prepara_passo(self):
+        """Memorizza le posizioni correnti prima del passo per l'interpolazione"""
+        self.x_prec[:] = self.x
+        self.y_prec[:] = self.y
+
+    def rettangoli(self):
+        """Restituisce i rettangoli interi di collisione come array x, y, larghezza, altezza
+
+        Come pygame.Rect, le coordinate sono troncate verso lo zero.
+        """
+        return self.x.astype(np.int32), self.y.astype(np.int32), self.larghezza, self.altezza
+
+    def movimenti(self):
+        """Restituisce i tragitti del passo come array x_inizio, y_inizio, x, y, larghezza, altezza
+
+        L'inizio è la posizione memorizzata da prepara_passo(), troncata come
+        quella finale; è la forma accettata da collisioni.spazzati.
+        """
+        return (self.x_prec.astype(np.int32), self.y_prec.astype(np.int32)) + self.rettangoli()
+
+    def rettangolo(self, indice):
+        """Restituisce il rettangolo di collisione di un'entità come pygame.Rect"""
+        colonne = self.colonne
+        return pygame.Rect(int(colonne['x'][indice]), int(colonne['y'][indice]),
+                           int(colonne['larghezza'][indice]), int(colonne['altezza'][indice]))
+
+    def collide_con(self, rect):
+        """Restituisce la maschera delle entità che si sovrappongono al rettangolo"""
+        return collisioni.con_rect(self.rettangoli(), rect)
+
+    def collide_nel_passo(self, movimento):
+        """Restituisce la maschera delle entità che toccano un'entità in moto durante il passo
+
+        movimento è (x_inizio, y_inizio, x, y, larghezza, altezza); anche le
+        entità del magazzino sono seguite lungo tutto il tragitto.
+        """
+        return collisioni.spazzati(self.movimenti(), movimento)
+
+    def posizioni_interpolate(self, alfa):
+        """Restituisce le posizioni intere di disegno tra il passo precedente e l'attuale"""
+        x_prec = self.x_prec
+        y_prec = self.y_prec
+        x = (x_prec + (self.x - x_prec) * alfa).astype(np.int32)
+        y = (y_prec + (self.y - y_prec) * alfa).astype(np.int32)
+        return zip(x.tolist(), y.tolist())
+
+    def immagini(self):
+        """Restituisce l'immagine di ogni riga (iterabile): di base un rettangolo pieno del COLORE del tipo"""
+        if self.immagine is None:
+            self.immagine = pygame.Surface((self.LARGHEZZA, self.ALTEZZA))
+            self.immagine.fill(self.COLORE)
+        return repeat(self.immagine)
+
+    def disegna(self, schermo, alfa):
+        """Disegna tutte le entità interpolate e restituisce le aree modificate"""
+        if not self.numero:
+            return []
+        return schermo.blits(zip(self.immagini(), self.posizioni_interpolate(alfa)))
+
+    def righe(self, tipo):
+        """Restituisce le righe come array strutturato con i campi di tipo
+
+        L'array è riusato dalla chiamata successiva con lo stesso tipo: va
+        copiato (ad esempio con tobytes) se deve sopravviverle.
+        """
+        buffer = self.buffer_righe.get(tipo)
+        if buffer is None or len(buffer) < self.numero:
+            buffer = self.buffer_righe[tipo] = np.empty(len(self.colonne['x']), tipo)
+        righe = buffer[:self.numero]
+        for nome in tipo.names:
+            righe[nome] = self.colonne[nome][:self.numero]
+        return righe
+
+    def ripristina(self, righe):
+        """Sostituisce tutte le entità con quelle di un array strutturato"""
+        numero = len(righe)
+        self.cresci(numero)
+        for colonna in self.colonne.values():
+            colonna[:numero] = 0
+        for nome in righe.dtype.names:
+            self.colonne[nome][:numero] = righe[nome]
+        self.imposta_numero(numero)
+        self.larghezza[:] = self.LARGHEZZA
+        self.altezza[:] = self.ALTEZZA
+        self.completa_righe()
+        self.prepara_passo()
+
+    def completa_righe(self):
+        """Ricava le colonne che non fanno parte dello stato salvato"""
+        pass
@@ -4,95 +4,102 @@
 Gestione dei nemici che attaccano il giocatore
 """
 
-import pygame
-import random
 import os
+import numpy as np
+import pygame
+from core.risorse import caricatore_risorse
+from logic.magazzino import Magazzino
+
+class MagazzinoNemici(Magazzino):
+    """Tutti i nemici in campo"""
+
+    # Immagine e dimensioni per tipo
+    IMMAGINI = {
+        1: ("Enemy_1.png", 40, 30),
+        2: ("Enemy_2.png", 50, 40),
+        3: ("Enemy_3.png", 70, 50),
+    }
+
+    # Caratteristiche per tipo: velocità, colore, punti e salute iniziale
+    CARATTERISTICHE = {
+        1: (100, (255, 0, 0), 10, 1),  # Nemico piccolo, rosso, muore con un colpo
+        2: (80, (255, 100, 0), 20, 2),  # Nemico medio, arancione, richiede due colpi
+        3: (60, (255, 0, 100), 30, 3),  # Nemico grande, fucsia, richiede tre colpi
+    }
+
+    COLONNE = (
+        ('tipo', np.int8),
+        ('salute', np.int8),
+        ('velocita', np.float64),
+        ('punti', np.int32),
+    )
+
+    # Tabelle indicizzate per tipo, per ricavare le colonne in blocco
+    TABELLA_VELOCITA = np.array([0] + [valori[0] for valori in CARATTERISTICHE.values()], np.float64)
+    TABELLA_PUNTI = np.array([0] + [valori[2] for valori in CARATTERISTICHE.values()], np.int32)
+    TABELLA_LARGHEZZA = np.array([0] + [valori[1] for valori in IMMAGINI.values()], np.int32)
+    TABELLA_ALTEZZA = np.array([0] + [valori[2] for valori in IMMAGINI.values()], np.int32)
 
-class Nemico:
-    """Classe che rappresenta un nemico"""
-
-    def __init__(self, x, y, tipo=1):
-        """Inizializza un nemico"""
-        self.tipo = tipo
-
-        # Dimensioni in base al tipo
-        if tipo == 1:  # Nemico piccolo
-            self.larghezza = 40
-            self.altezza = 30
-            self.velocita = 100
-            self.colore = (255, 0, 0)  # Rosso
-            self.punti = 10
-            self.salute = 1  # Nemico debole, muore con un colpo
-            self.nome_file = "Enemy_1.png"
-        elif tipo == 2:  # Nemico medio
-            self.larghezza = 50
-            self.altezza = 40
-            self.velocita = 80
-            self.colore = (255, 100, 0)  # Arancione
-            self.punti = 20
-            self.salute = 2  # Nemico medio, richiede due colpi
-            self.nome_file = "Enemy_2.png"
-        else:  # Nemico grande
-            self.larghezza = 70
-            self.altezza = 50
-            self.velocita = 60
-            self.colore = (255, 0, 100)  # Fucsia
-            self.punti = 30
-            self.salute = 3  # Nemico resistente, richiede tre colpi
-            self.nome_file = "Enemy_3.png"
-
-        # Posizione
-        self.x = x
-        self.y = y
-
-        # Rect per collisioni e disegno
-        self.rect = pygame.Rect(self.x, self.y, self.larghezza, self.altezza)
-
-        # Carica immagine
-        self.immagine = self.carica_immagine()
-
-        # Flag di attività
-        self.attivo = True
-
-    def prendi_danno(self, danno=1):
-        """Riduce la salute del nemico quando colpito"""
-        self.salute -= danno
-        if self.salute <= 0:
-            self.attivo = False
-            return True  # Nemico distrutto
-        return False  # Nemico ancora attivo
-
-    def carica_immagine(self):
-        """Carica l'immagine del nemico o crea un placeholder"""
+    def __init__(self, capacita=64):
+        """Inizializza il magazzino vuoto"""
+        super().__init__(capacita)
+        self.immagini_tipo = {}
+
+    def aggiungi(self, x, y, tipo=1):
+        """Aggiunge un nemico del tipo indicato e ne restituisce l'indice"""
+        velocita, _, punti, salute = self.CARATTERISTICHE[tipo]
+        _, larghezza, altezza = self.IMMAGINI[tipo]
+        return super().aggiungi(x, y, tipo=tipo, salute=salute, velocita=velocita, punti=punti,
+                                larghezza=larghezza, altezza=altezza)
+
+    def completa_righe(self):
+        """Ricava velocità, punti e dimensioni dal tipo"""
+        tipo = self.tipo
+        self.velocita[:] = self.TABELLA_VELOCITA[tipo]
+        self.punti[:] = self.TABELLA_PUNTI[tipo]
+        self.larghezza[:] = self.TABELLA_LARGHEZZA[tipo]
+        self.altezza[:] = self.TABELLA_ALTEZZA[tipo]
+
+    def prendi_danno(self, indici):
+        """Toglie un punto di salute per ogni colpo e restituisce i punti guadagnati
+
+        indici contiene il nemico colpito da ciascun colpo, anche ripetuto.
+        Come colpendo un nemico alla volta, ogni colpo che lo lascia a
+        salute zero o meno vale i suoi punti.
+        """
+        colpi = np.bincount(indici, minlength=self.numero).astype(self.salute.dtype)
+        distruttivi = np.clip(colpi - self.salute + 1, 0, colpi)
+        self.salute -= colpi
+        self.attivo[(colpi > 0) & (self.salute <= 0)] = False  # Nemici distrutti
+        return int((distruttivi * self.punti).sum())
+
+    def carica_immagine(self, tipo):
+        """Carica l'immagine di un tipo di nemico o crea un placeholder"""
+        nome_file, larghezza, altezza = self.IMMAGINI[tipo]
         try:
             # Modificato per utilizzare le immagini dalla cartella entita/Nautolan
-            percorso = os.path.join("entita", "Nautolan", self.nome_file)
-            immagine = pygame.image.load(percorso).convert_alpha()
-            return pygame.transform.scale(immagine, (self.larghezza, self.altezza))
+            percorso = os.path.join("entita", "Nautolan", nome_file)
+            return caricatore_risorse().ottieni_immagine(percorso, (larghezza, altezza), alpha=True)
         except Exception as e:
-            print(f"Errore nel caricamento dell'immagine {self.nome_file}: {e}")
+            print(f"Errore nel caricamento dell'immagine {nome_file}: {e}")
             # Se l'immagine non è disponibile, crea un placeholder
-            superficie = pygame.Surface((self.larghezza, self.altezza), pygame.SRCALPHA)
-            pygame.draw.rect(superficie, self.colore, (0, 0, self.larghezza, self.altezza))
+            superficie = pygame.Surface((larghezza, altezza), pygame.SRCALPHA)
+            pygame.draw.rect(superficie, self.CARATTERISTICHE[tipo][1], (0, 0, larghezza, altezza))
             return superficie
 
     def aggiorna(self, delta_tempo):
-        """Aggiorna la posizione del nemico"""
+        """Aggiorna la posizione di tutti i nemici"""
         # Movimento verso il basso
-        self.y += self.velocita * delta_tempo
-        self.rect.y = int(self.y)
-
-        # Disattiva se esce dallo schermo
-        if self.y > 800:  # Usa un valore abbastanza grande per assicurarsi che sia fuori schermo
-            self.attivo = False
-
-    def disegna(self, schermo):
-        """Disegna il nemico sullo schermo"""
-        schermo.blit(self.immagine, self.rect)
-        
-        # Debug: visualizza il rettangolo di collisione
-        # pygame.draw.rect(schermo, (255, 0, 0), self.rect, 1)
-
-    def collide_con(self, altro_rect):
-        """Controlla se il nemico collide con un altro rettangolo"""
-        return self.rect.colliderect(altro_rect)
+        y = self.y
+        y += self.velocita * delta_tempo
+
+        # Disattiva quelli usciti dallo schermo (valore abbastanza grande per esserne sicuri)
+        self.attivo[y > 800] = False
+
+    def immagini(self):
+        """Restituisce l'immagine di ogni nemico, secondo il tipo"""
+        immagini = self.immagini_tipo
+        if len(immagini) < len(self.IMMAGINI):
+            for tipo in self.IMMAGINI:
+                immagini[tipo] = self.carica_immagine(tipo)
+        return map(immagini.__getitem__, self.tipo.tolist())
@@ -5,50 +5,82 @@ Alien Invader - Gioco principale
 Un clone del classico Space Invaders creato per la Game JAM
 """
 
+import time
+
+# Riferimento per misurare il tempo fino al primo frame, prima di ogni import pesante
+INIZIO_AVVIO = time.perf_counter()
+
 import pygame
 import sys
+import traceback
 from core.gioco import Gioco
+from core.font import avvia_ricerca_font
+from core.scatola_nera import ScatolaNera
 import config
-from scene.menu import MenuPrincipale
-from scene.gioco import ScenaGioco
-from scene.introduzione import ScenaIntroduzione
+
+
+def scarica_scatola_nera(gioco, traccia):
+    """Salva su disco la scatola nera dopo un crash, se attiva"""
+    if gioco.scatola_nera is None:
+        return
+    scena = gioco.gestore_scene.scena_corrente
+    nome_scena = type(scena).__name__ if scena else None
+
+    # La partita si può rigiocare solo se il crash è avvenuto durante il gioco
+    tick = None
+    if not gioco.in_menu and not gioco.modalita_rewind:
+        tick = gioco.orologio_simulazione.tick
+    try:
+        percorso = gioco.scatola_nera.scarica(config.CARTELLA_CRASH, traccia, nome_scena, tick)
+    except OSError as e:
+        print(f"Impossibile salvare i dati del crash: {e}")
+    else:
+        print(f"Dati del crash salvati in {percorso}")
+
 
 def main():
     """Funzione principale che avvia il gioco"""
     
-    # Inizializzazione di pygame
-    pygame.init()
-    pygame.mixer.init()
+    # Inizializzazione dei soli moduli di pygame usati dal gioco
+    pygame.display.init()
+    pygame.font.init()
+
+    # La scansione dei font di sistema procede mentre si apre la finestra
+    avvia_ricerca_font()
     
     # Creazione del gioco
     alieno_invader = Gioco(
         titolo=config.TITOLO_GIOCO,
         larghezza=config.LARGHEZZA_SCHERMO,
         altezza=config.ALTEZZA_SCHERMO,
-        fps=config.FPS
+        fps=config.FPS,
+        inizio_avvio=INIZIO_AVVIO
     )
+
+    # Ultimi secondi di gioco, scaricati su disco in caso di crash
+    if config.SCATOLA_NERA:
+        alieno_invader.scatola_nera = ScatolaNera(
+            config.DURATA_SCATOLA_NERA, config.FPS, config.INTERVALLO_ISTANTANEE_SCATOLA_NERA
+        )
     
-    # Aggiungi le scene al gioco
-    introduzione = ScenaIntroduzione(alieno_invader)
-    menu_principale = MenuPrincipale(alieno_invader)
-    scena_gioco = ScenaGioco(alieno_invader)
-    
-    alieno_invader.gestore_scene.aggiungi_scena("intro", introduzione)
-    alieno_invader.gestore_scene.aggiungi_scena("menu", menu_principale)
-    alieno_invader.gestore_scene.aggiungi_scena("gioco", scena_gioco)
+    # Registra le scene: moduli importati e scene create al primo utilizzo
+    alieno_invader.gestore_scene.registra_scena("intro", "scene.introduzione", "ScenaIntroduzione")
+    alieno_invader.gestore_scene.registra_scena("menu", "scene.menu", "MenuPrincipale")
+    alieno_invader.gestore_scene.registra_scena("gioco", "scene.gioco", "ScenaGioco")
     
     # Imposta la scena iniziale come il menu
-    alieno_invader.gestore_scene.cambia_scena("menu")
+    alieno_invader.cambia_scena("menu")
     
     # Esecuzione del gioco
     try:
         alieno_invader.esegui()
     except Exception as errore:
         print(f"Errore durante l'esecuzione del gioco: {errore}")
+        scarica_scatola_nera(alieno_invader, traceback.format_exc())
     finally:
         # Pulizia e uscita
         pygame.quit()
         sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
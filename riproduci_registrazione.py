@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+Riproduzione di una partita registrata
+Rigioca senza finestra gli input di un file .inv con lo stesso seme e la
+stessa frequenza di simulazione, e stampa lo stato finale della partita.
+Accetta anche i file .crash della scatola nera: li rigioca dalla prima
+istantanea conservata fino al tick del crash
+
+Esempi:
+    python riproduci_registrazione.py registrazioni/partita_20250101_120000_42.inv
+    python riproduci_registrazione.py crash/crash_20250101_120000.crash
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import struct
+import sys
+import time
+import traceback
+
+# Nessuna finestra né audio, come nelle simulazioni batch
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import config
+from core.headless import GiocoHeadless
+from core.registrazione import RiproduttoreInput
+from core import salvataggio
+from core.scatola_nera import ScatolaNera, ESTENSIONE as ESTENSIONE_CRASH, istantanea_crash, tick_istantanee
+
+
+def prepara_riproduzione(riproduttore):
+    """Crea un gioco senza finestra con la scena pronta a riprodurre la registrazione"""
+    from scene.gioco import ScenaGioco
+
+    gioco = GiocoHeadless(frequenza_simulazione=riproduttore.frequenza)
+    scena = ScenaGioco(gioco)
+    scena.seme = riproduttore.seme
+    scena.registra_input = False
+    scena.salvataggio_automatico = False
+    scena.riproduttore = riproduttore
+    gioco.gestore_scene.aggiungi_scena("gioco", scena)
+    gioco.cambia_scena("gioco")
+    return gioco, scena
+
+
+def riproduci(riproduttore):
+    """Riproduce la registrazione fino al tick finale e restituisce la scena"""
+    gioco, scena = prepara_riproduzione(riproduttore)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while not riproduttore.terminata(gioco.orologio_simulazione.tick):
+            gioco.passo()
+    return gioco, scena
+
+
+def riproduci_crash(sezioni):
+    """Rigioca un crash della scatola nera dalla sua prima istantanea
+
+    Restituisce il gioco, la scena, i tick in cui le istantanee della
+    riproduzione non coincidono con quelle registrate e l'eccezione
+    riprodotta (None se la riproduzione arriva in fondo senza errori).
+    """
+    from logic import istantanea
+
+    riproduttore = RiproduttoreInput(sezioni['crash.registrazione'])
+    gioco, scena = prepara_riproduzione(riproduttore)
+    istantanea.ripristina(scena, istantanea_crash(sezioni, 0))
+    scena.prepara_passo()
+
+    # Una scatola nera uguale cattura le istantanee della riproduzione agli stessi tick
+    gioco.scatola_nera = ScatolaNera(config.DURATA_SCATOLA_NERA, config.FPS,
+                                     config.INTERVALLO_ISTANTANEE_SCATOLA_NERA)
+    scena.riparti_scatola_nera()
+
+    errore = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            while not riproduttore.terminata(gioco.orologio_simulazione.tick):
+                gioco.passo()
+        except Exception as e:
+            errore = e
+
+    registrate = {tick: istantanea_crash(sezioni, indice) for indice, tick in enumerate(tick_istantanee(sezioni))}
+    divergenti = [tick for tick, stato in gioco.scatola_nera.istantanee
+                  if tick in registrate and istantanea.impronta(stato) != istantanea.impronta(registrate[tick])]
+    return gioco, scena, divergenti, errore
+
+
+def mostra_crash(percorso):
+    """Stampa il contenuto di un file della scatola nera e prova a rigiocarlo"""
+    sezioni = salvataggio.leggi(percorso)
+    print(sezioni['crash.traccia'].decode('utf-8'), end="")
+    print(f"scena {sezioni['crash.scena'].decode('utf-8') or '-'}, {sezioni['crash.sistema'].decode('utf-8')}")
+
+    dati = sezioni['crash.tempi_frame']
+    tempi = struct.unpack(f'<{len(dati) // 4}f', dati)
+    if tempi:
+        budget = 1000 / config.FPS
+        lenti = sum(1 for tempo in tempi if tempo > 2 * budget)
+        print(f"{len(tempi)} frame: media {sum(tempi) / len(tempi):.1f} ms, massimo {max(tempi):.1f} ms, "
+              f"{lenti} oltre {2 * budget:.0f} ms")
+
+    if 'crash.registrazione' not in sezioni:
+        print("Il crash non è avvenuto durante una partita: niente da rigiocare")
+        return 1
+
+    gioco, _, divergenti, errore = riproduci_crash(sezioni)
+    tick = gioco.orologio_simulazione.tick
+    if divergenti:
+        print(f"La riproduzione diverge dalle istantanee registrate ai tick {divergenti}")
+    if errore is None:
+        print(f"Crash non riprodotto: simulazione arrivata al tick {tick} senza errori")
+        return 1
+    print(f"Crash riprodotto al tick {tick}:")
+    print("".join(traceback.format_exception(type(errore), errore, errore.__traceback__)), end="")
+    return 0
+
+
+def main():
+    """Punto di ingresso da riga di comando"""
+    parser = argparse.ArgumentParser(description="Riproduce una partita registrata di Invasori Infinito")
+    parser.add_argument("registrazione", help="file .inv o .crash da riprodurre")
+    argomenti = parser.parse_args()
+
+    if argomenti.registrazione.endswith(ESTENSIONE_CRASH):
+        return mostra_crash(argomenti.registrazione)
+
+    riproduttore = RiproduttoreInput.da_file(argomenti.registrazione)
+    if riproduttore.tick_finale is None:
+        parser.error("La registrazione non ha un tick finale")
+
+    inizio = time.perf_counter()
+    gioco, scena = riproduci(riproduttore)
+    durata = time.perf_counter() - inizio
+
+    print(f"seme {riproduttore.seme}, {riproduttore.frequenza} tick/s, {len(riproduttore.input)} input")
+    print(f"tick {gioco.orologio_simulazione.tick}  punteggio {scena.punteggio}  vite {scena.vite}  "
+          f"livello boss {scena.livello_boss}  game over {scena.game_over_status}")
+    print(f"riprodotta in {durata:.2f} s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
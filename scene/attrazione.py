@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+"""
+Modalità attrazione
+Rigioca le partite registrate dietro al menu con la simulazione e il
+rendering del gioco, disegnando un frame sì e uno no e portando ogni
+frame alla dimensione del menu con un solo ridimensionamento. Il lavoro è limitato da un budget di CPU fisso: quando il budget è
+esaurito la dimostrazione rallenta invece di appesantire il menu
+"""
+
+import os
+import time
+import pygame
+from core.headless import GiocoHeadless
+from core.registrazione import RiproduttoreFlusso, ESTENSIONE
+from core.record import NOME_MIGLIORE
+from scene.gioco import ScenaGioco
+
+
+class ModalitaAttrazione:
+    """Partite registrate rigiocate in sequenza come sfondo del menu"""
+
+    def __init__(self, cartella, budget_cpu, attesa, dimensione_sfondo):
+        """Prepara la dimostrazione; le partite si caricano al primo aggiornamento
+
+        budget_cpu è la frazione massima del tempo reale spesa a simulare e
+        disegnare; attesa sono i secondi senza input prima di ripartire;
+        dimensione_sfondo è la dimensione dello sfondo mostrato dal menu.
+        """
+        self.cartella = cartella
+        self.budget_cpu = budget_cpu
+        self.attesa = attesa * 1000
+
+        self.registrazioni = None  # Percorsi delle partite, letti alla prima richiesta
+        self.indice = 0
+        self.gioco = None
+        self.scena = None
+        self.riproduttore = None
+        self.accumulatore = 0.0
+
+        # Sfondo mostrato dal menu, rifatto solo nei frame in cui la partita viene disegnata
+        self.sfondo = pygame.Surface(dimensione_sfondo).convert()
+        # Grigio per scurire lo sfondo: il blit moltiplicativo è molto più veloce di fill()
+        self.velo = pygame.Surface(dimensione_sfondo).convert()
+        self.velo.fill((110, 110, 110))
+        self.pronta = False
+        self.frame = 0
+
+        # Credito di CPU in secondi: cresce con il tempo reale, il lavoro lo consuma
+        self.credito = 0.0
+        self.credito_massimo = 0.02
+        self.ultimo_controllo = time.perf_counter()
+        # Parte dopo la stessa attesa anche all'apertura del menu
+        self.tempo_ultimo_input = pygame.time.get_ticks()
+
+    def segnala_input(self):
+        """Sospende la dimostrazione: il menu risponde subito e torna lo sfondo fisso"""
+        self.tempo_ultimo_input = pygame.time.get_ticks()
+
+    def attiva(self):
+        """Indica se la dimostrazione sta girando"""
+        return pygame.time.get_ticks() - self.tempo_ultimo_input >= self.attesa
+
+    def ricarica_credito(self):
+        """Accredita la quota di CPU maturata dall'ultimo controllo; True se ce n'è"""
+        adesso = time.perf_counter()
+        self.credito = min(self.credito + (adesso - self.ultimo_controllo) * self.budget_cpu,
+                           self.credito_massimo)
+        self.ultimo_controllo = adesso
+        return self.credito > 0
+
+    def avvia_prossima(self):
+        """Avvia la prossima partita registrata; False se non ce n'è nessuna valida"""
+        self.chiudi()
+        if self.registrazioni is None:
+            try:
+                # La partita migliore è la copia di una delle altre: non va mostrata due volte
+                self.registrazioni = sorted(os.path.join(self.cartella, nome) for nome in os.listdir(self.cartella)
+                                            if nome.endswith(ESTENSIONE) and nome != NOME_MIGLIORE)
+            except OSError:
+                self.registrazioni = []
+
+        while self.registrazioni:
+            self.indice %= len(self.registrazioni)
+            percorso = self.registrazioni[self.indice]
+            try:
+                self.riproduttore = RiproduttoreFlusso(percorso)
+            except (OSError, ValueError):
+                # Registrazione illeggibile o di una versione precedente
+                del self.registrazioni[self.indice]
+                continue
+            self.indice += 1
+            break
+        else:
+            return False
+
+        self.gioco = GiocoHeadless(self.riproduttore.frequenza)
+        self.scena = ScenaGioco(self.gioco)
+        self.scena.seme = self.riproduttore.seme
+        self.scena.registra_input = False
+        self.scena.salvataggio_automatico = False
+        self.scena.riproduttore = self.riproduttore
+        self.gioco.gestore_scene.aggiungi_scena("gioco", self.scena)
+        self.gioco.cambia_scena("gioco")
+        self.accumulatore = 0.0
+        return True
+
+    def aggiorna(self, delta_tempo):
+        """Avanza la partita del tempo indicato, entro il budget di CPU"""
+        if not self.attiva() or not self.ricarica_credito():
+            return
+        inizio = time.perf_counter()
+        if self.scena is None or self.riproduttore.terminata(self.gioco.orologio_simulazione.tick):
+            avviata = self.avvia_prossima()
+            self.credito -= time.perf_counter() - inizio
+            if not avviata:
+                return
+
+        # Senza credito i tick non eseguiti vanno persi: la partita rallenta
+        self.accumulatore = min(self.accumulatore + delta_tempo, 4 * self.gioco.passo_simulazione)
+        inizio = time.perf_counter()
+        while self.accumulatore >= self.gioco.passo_simulazione and self.credito > time.perf_counter() - inizio:
+            self.gioco.passo()
+            self.accumulatore -= self.gioco.passo_simulazione
+        self.credito -= time.perf_counter() - inizio
+
+    def disegna(self):
+        """Aggiorna lo sfondo un frame sì e uno no; True se c'è uno sfondo da mostrare"""
+        if not self.attiva() or self.scena is None:
+            return False
+        self.frame += 1
+        if self.frame % 2 and self.pronta:
+            return True
+        if not self.ricarica_credito() and self.pronta:
+            return True
+
+        inizio = time.perf_counter()
+        # La scena ridisegna solo le aree cambiate sulla propria superficie
+        self.scena.disegna(self.gioco.schermo)
+        pygame.transform.scale(self.gioco.schermo, self.sfondo.get_size(), self.sfondo)
+        # Più scuro, perché titolo e pulsanti restino leggibili
+        self.sfondo.blit(self.velo, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        self.credito -= time.perf_counter() - inizio
+        self.pronta = True
+        return True
+
+    def chiudi(self):
+        """Chiude la partita in corso"""
+        if self.riproduttore:
+            self.riproduttore.chiudi()
+        self.gioco = self.scena = self.riproduttore = None
+        self.pronta = False
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+Fantasma della partita migliore
+Rigioca la registrazione della partita con il punteggio più alto in una
+simulazione senza finestra, al passo con la partita in corso, e ne disegna
+la nave semitrasparente: il giocatore gareggia contro il proprio record
+"""
+
+from core.font import ottieni_font
+from core.headless import GiocoHeadless
+from core.registrazione import RiproduttoreFlusso
+from scene.gioco import ScenaGioco
+
+
+class Fantasma:
+    """Partita registrata simulata in lockstep con quella del giocatore
+
+    La registrazione viene letta dal disco a blocchi mentre la partita
+    avanza. La simulazione non disegna nulla e non registra la storia del
+    rewind: per tick costa solo la logica di gioco, una frazione del frame.
+    """
+
+    ALFA = 110  # Opacità della nave fantasma (0-255)
+
+    def __init__(self, percorso, frequenza):
+        """Prepara la simulazione del fantasma dal tick 0"""
+        self.riproduttore = RiproduttoreFlusso(percorso)
+        if self.riproduttore.frequenza != frequenza:
+            self.riproduttore.chiudi()
+            raise ValueError(f"Fantasma registrato a {self.riproduttore.frequenza} tick/s, "
+                             f"il gioco ne usa {frequenza}")
+        self.seme = self.riproduttore.seme
+
+        # Il gestore eventi del fantasma non deve toccare il filtro della coda SDL
+        self.gioco = GiocoHeadless(frequenza)
+        self.scena = ScenaGioco(self.gioco)
+        self.scena.seme = self.seme
+        self.scena.registra_input = False
+        self.scena.salvataggio_automatico = False
+        self.scena.riproduttore = self.riproduttore
+        self.gioco.gestore_scene.aggiungi_scena("gioco", self.scena)
+        self.gioco.cambia_scena("gioco")
+
+        self.immagini = {}  # Livello di danno -> immagine semitrasparente
+
+    def finito(self):
+        """Indica se la partita del fantasma è conclusa"""
+        return self.scena.game_over_status or self.riproduttore.terminata(self.gioco.orologio_simulazione.tick)
+
+    def passo(self):
+        """Avanza il fantasma di un tick, finché la sua partita non è finita"""
+        if not self.finito():
+            self.gioco.passo()
+
+    def immagine(self, danno):
+        """Restituisce l'immagine semitrasparente della nave per il livello di danno"""
+        immagine = self.immagini.get(danno)
+        if immagine is None:
+            immagine = self.scena.nave_giocatore.immagini[danno].copy()
+            immagine.set_alpha(self.ALFA)
+            self.immagini[danno] = immagine
+        return immagine
+
+    def disegna(self, schermo, alfa, area_gioco):
+        """Disegna la nave e il punteggio del fantasma e restituisce le aree modificate"""
+        rettangoli = []
+        nave = self.scena.nave_giocatore
+        if not self.scena.game_over_status:
+            x_prec = getattr(nave, 'x_prec', nave.x)
+            y_prec = getattr(nave, 'y_prec', nave.y)
+            posizione = (int(x_prec + (nave.x - x_prec) * alfa), int(y_prec + (nave.y - y_prec) * alfa))
+            rettangoli.append(schermo.blit(self.immagine(nave.danno), posizione))
+
+        testo = ottieni_font("Arial", 18).render(f"Fantasma: {self.scena.punteggio}", True, (170, 200, 255))
+        rettangoli.append(schermo.blit(testo, (area_gioco.left + 10, 50)))
+        return rettangoli
+
+    def chiudi(self):
+        """Chiude la registrazione letta dal disco"""
+        self.riproduttore.chiudi()
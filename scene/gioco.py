@@ -9,29 +9,81 @@ import pygame
 import os
 import random
 import math  # Aggiunto import per la funzione sin
+import struct
+import numpy as np
 from core.scena import Scena
+from core.font import ottieni_font
+from core.risorse import caricatore_risorse
+from core.registrazione import RegistratoreInput, SINISTRA, DESTRA, SPARO
+from core import salvataggio
+from core.record import aggiorna_migliore, percorso_migliore
+from core.casuale import FlussiCasuali
 import config
-from logic.laser import Laser
-from logic.nemico import Nemico
-from logic.power_up import PowerUp
-from logic.boss import Boss, BossLaser, PallaDiFuoco
+from logic.laser import MagazzinoLaser
+from logic.nemico import MagazzinoNemici
+from logic.power_up import MagazzinoPowerUp
+from logic.boss import Boss, MagazzinoLaserBoss, MagazzinoPalleFuoco
+from logic.griglia import GrigliaSpaziale
+from logic import istantanea
+
+
+# Immagini usate dalla scena di gioco
+PERCORSO_SFONDO = os.path.join("assets", "img", "sfondo_gioco.jpg")
+FILE_NAVE = [
+    "Main Ship - Base - Full health.png",  # Nave intatta
+    "Main Ship - Base - Slight damage.png",  # Danno leggero
+    "Main Ship - Base - Damaged.png",  # Danno medio
+    "Main Ship - Base - Very damaged.png"  # Danno grave
+]
+
+
+def precarica_risorse():
+    """Avvia in background il caricamento delle immagini della partita"""
+    caricatore = caricatore_risorse()
+    caricatore.richiedi_immagine(PERCORSO_SFONDO, (config.GIOCO_LARGHEZZA, config.GIOCO_ALTEZZA), ritaglia=True)
+    for nome_file in FILE_NAVE:
+        caricatore.richiedi_immagine(os.path.join("entita", "Nave", nome_file), (Nave.LARGHEZZA, Nave.ALTEZZA), alpha=True)
+    for tipo in (1, 2, 3):
+        nome_file, larghezza, altezza = MagazzinoNemici.IMMAGINI[tipo]
+        caricatore.richiedi_immagine(os.path.join("entita", "Nautolan", nome_file), (larghezza, altezza), alpha=True)
+    caricatore.richiedi_immagine(Boss.PERCORSO_IMMAGINE, (Boss.LARGHEZZA, Boss.ALTEZZA), alpha=True)
 
 
 class ScenaGioco(Scena):
     """Scena principale del gioco"""
 
+    # Parametri di bilanciamento modificabili con applica_parametri
+    PARAMETRI_BILANCIAMENTO = (
+        'intervallo_spawn_base',
+        'intervallo_spawn_minimo',
+        'punteggio_intervallo_boss',
+        'punteggio_intervallo_power_up',
+    )
+
+    # Tasti che guidano la nave e comando corrispondente
+    TASTI_COMANDI = {
+        pygame.K_LEFT: SINISTRA,
+        pygame.K_RIGHT: DESTRA,
+        pygame.K_UP: SPARO,
+    }
+
     def __init__(self, gioco):
         """Inizializza la scena di gioco"""
         super().__init__(gioco)
+        self.dimensione_logica = (config.GIOCO_LARGHEZZA, config.GIOCO_ALTEZZA)
         self.sfondo = None
         self.area_gioco = None
         self.margine_laterale = 0
         self.nave_giocatore = None
-        self.lasers = []  # Lista per tenere traccia dei laser attivi
-        self.nemici = []
-        self.power_ups = []  # Lista per i power-up attivi
+        # Entità in array NumPy, una riga per entità (vedi logic/magazzino.py)
+        self.lasers = MagazzinoLaser()  # Laser sparati dal giocatore
+        self.nemici = MagazzinoNemici()
+        self.power_ups = MagazzinoPowerUp()  # Power-up in discesa
+        self.griglia_nemici = None  # Griglia spaziale dei nemici, ricostruita a ogni tick
         self.vite = 4  # Giocatore inizia con 4 vite
         self.game_over_status = False
+        self.tempo_game_over = 0
+        self.durata_game_over = 2000  # Attesa prima di tornare al menu (ms)
 
         # Parametri di spawn dei nemici
         self.intervallo_spawn_base = 1500  # Intervallo base (1.5 secondi)
@@ -49,17 +101,60 @@ class ScenaGioco(Scena):
 
         # Parametri per il boss
         self.boss = None
-        self.laser_boss = []  # Laser sparati dal boss
-        self.palle_fuoco = []  # Palle di fuoco lanciate dal boss
+        self.laser_boss = MagazzinoLaserBoss()  # Laser sparati dal boss
+        self.palle_fuoco = MagazzinoPalleFuoco()  # Palle di fuoco lanciate dal boss
         self.punteggio_ultimo_boss = 0
         self.punteggio_intervallo_boss = 2500  # Boss ogni 2500 punti
         self.livello_boss = 0  # Livello del boss (aumenta ogni volta che viene sconfitto)
         self.boss_attivo = False
+        self.parametri_boss = {}  # Sovrascrive Boss.PARAMETRI_PREDEFINITI
+
+        # Rendering a rettangoli sporchi
+        self.supporta_rettangoli_sporchi = True
+        self.ridisegno_completo = True
+        self.rettangoli_precedenti = []
+
+        # Seme casuale della partita (None = nuovo seme a ogni partita)
+        self.seme = None
+        self.seme_partita = None
+        self.casuale = FlussiCasuali()  # Un flusso per sottosistema: spawn, power_up, boss, palle_fuoco
+
+        # Registrazione e riproduzione degli input
+        self.registra_input = config.REGISTRA_PARTITE
+        self.registratore = None
+        self.riproduttore = None  # RiproduttoreInput che sostituisce la tastiera
+
+        # Salvataggi della partita
+        self.salvataggio_automatico = config.SALVATAGGIO_AUTOMATICO
+        self.scrittore = None  # ScrittoreSalvataggi, creato al primo salvataggio
+        self.slot = 1
+        self.da_caricare = None  # Salvataggio da cui riprendere all'avvio della scena
+        self.avviso = ""
+        self.tempo_avviso = 0
+        self.durata_avviso = 2000  # Millisecondi reali
+
+        # Gara contro la partita migliore (vedi scene/fantasma.py)
+        self.sfida_fantasma = False  # Da impostare prima di avviare la scena
+        self.fantasma = None
+
+    def applica_parametri(self, parametri):
+        """Imposta i parametri di bilanciamento (spawn, power-up, boss)"""
+        for nome, valore in parametri.items():
+            if nome.startswith("boss."):
+                self.parametri_boss[nome[len("boss."):]] = valore
+            elif nome in self.PARAMETRI_BILANCIAMENTO:
+                setattr(self, nome, valore)
+            else:
+                raise ValueError(f"Parametro di bilanciamento sconosciuto: {nome}")
+
+    def tempo_simulazione(self):
+        """Restituisce i millisecondi simulati dall'orologio del gioco"""
+        return self.gioco.orologio_simulazione.ottieni_ticks()
 
     def calcola_intervallo_spawn(self):
         """Calcola l'intervallo di spawn in base al punteggio"""
         # Calcola un valore di oscillazione tra 0 e 0.3 (30%) basato sul tempo
-        tempo_corrente = pygame.time.get_ticks()
+        tempo_corrente = self.tempo_simulazione()
         oscillazione = 0.3 * (0.5 + 0.5 * math.sin(tempo_corrente / 5000))  # Oscillazione tra 0 e 0.3 con periodo di 10 secondi
 
         if self.punteggio <= 2000:
@@ -78,6 +173,25 @@ class ScenaGioco(Scena):
         """Inizializza gli elementi del gioco"""
         super().inizializza()
 
+        # Ogni partita parte dal tick 0 con un seme noto, così è riproducibile
+        self.gioco.orologio_simulazione.azzera()
+
+        # Contro il fantasma si gioca la stessa ondata della partita migliore
+        self.fantasma = None
+        if self.sfida_fantasma:
+            self.sfida_fantasma = False
+            self.fantasma = self.crea_fantasma()
+        if self.fantasma:
+            self.seme_partita = self.fantasma.seme
+        else:
+            self.seme_partita = self.seme if self.seme is not None else random.randrange(2 ** 32)
+        self.casuale.inizializza(self.seme_partita)
+        frequenza = round(1 / self.gioco.passo_simulazione)
+        if self.registra_input and self.riproduttore is None:
+            self.registratore = RegistratoreInput(self.seme_partita, frequenza)
+        if self.gioco.scatola_nera:
+            self.gioco.scatola_nera.nuova_partita(self.seme_partita, frequenza)
+
         # Reset game state
         self.game_over_status = False
         self.vite = 4
@@ -87,21 +201,22 @@ class ScenaGioco(Scena):
         self.livello_boss = 0
         self.boss = None
         self.boss_attivo = False
-        self.laser_boss.clear()
-        self.palle_fuoco.clear()
-        self.lasers.clear()
-        self.nemici.clear()
-        self.power_ups.clear()
+        self.laser_boss.svuota()
+        self.palle_fuoco.svuota()
+        self.lasers.svuota()
+        self.nemici.svuota()
+        self.power_ups.svuota()
         self.messaggio_power_up = ""
         self.tempo_messaggio_power_up = 0
+        self.ridisegno_completo = True
+        self.rettangoli_precedenti = []
 
-        # Carica l'immagine di sfondo
-        percorso_sfondo = os.path.join("assets", "img", "sfondo_gioco.jpg")
+        # Carica l'immagine di sfondo (già pronta se precaricata dall'introduzione)
         try:
-            self.sfondo = self.carica_e_ritaglia_immagine(
-                percorso_sfondo,
-                config.GIOCO_LARGHEZZA,
-                config.GIOCO_ALTEZZA
+            self.sfondo = caricatore_risorse().ottieni_immagine(
+                PERCORSO_SFONDO,
+                (config.GIOCO_LARGHEZZA, config.GIOCO_ALTEZZA),
+                ritaglia=True
             )
         except Exception as e:
             print(f"Errore nel caricamento dello sfondo: {e}")
@@ -118,60 +233,30 @@ class ScenaGioco(Scena):
             larghezza_area_gioco,
             config.GIOCO_ALTEZZA
         )
+        self.griglia_nemici = GrigliaSpaziale(self.area_gioco)
 
         # Crea la nave del giocatore
         self.nave_giocatore = Nave(self.area_gioco)
 
-        # Aggiungi questa scena come osservatore degli eventi
-        self.gioco.gestore_eventi.aggiungi_osservatore(self)
+        # Aggiungi questa scena come osservatore dei soli tasti di gioco (R = rewind)
+        self.gioco.gestore_eventi.aggiungi_osservatore(
+            self,
+            tipi=(pygame.KEYDOWN, pygame.KEYUP),
+            tasti=tuple(self.TASTI_COMANDI) + (pygame.K_r, pygame.K_F5, pygame.K_F6, pygame.K_F9)
+        )
 
-        # Inizializza lista nemici e timing
-        self.nemici = []
-        self.tempo_ultimo_spawn = pygame.time.get_ticks()
+        # Inizializza il timing degli spawn
+        self.tempo_ultimo_spawn = self.tempo_simulazione()
         self.intervallo_spawn = 1500  # 1.5 secondi tra gli spawn
         self.punteggio = 0
 
-    def carica_e_ritaglia_immagine(self, percorso, larghezza_finale, altezza_finale):
-        """Carica un'immagine e la ritaglia mantenendo la parte centrale"""
-        try:
-            # Carica l'immagine originale
-            immagine_originale = pygame.image.load(percorso).convert()
-
-            # Dimensioni originali
-            larghezza_originale = immagine_originale.get_width()
-            altezza_originale = immagine_originale.get_height()
-
-            # Calcola il rapporto di aspetto
-            rapporto_originale = larghezza_originale / altezza_originale
-            rapporto_finale = larghezza_finale / altezza_finale
-
-            # Determina come ritagliare l'immagine in base ai rapports
-            if rapporto_originale > rapporto_finale:
-                # L'immagine è troppo larga, la ritaglia sui lati
-                nuova_larghezza = int(altezza_originale * rapporto_finale)
-                x_inizio = (larghezza_originale - nuova_larghezza) // 2
-                y_inizio = 0
-                area_ritaglio = (x_inizio, y_inizio, nuova_larghezza, altezza_originale)
-            else:
-                # L'immagine è troppo alta, la ritaglia in alto e in basso
-                nuova_altezza = int(larghezza_originale / rapporto_finale)
-                x_inizio = 0
-                y_inizio = (altezza_originale - nuova_altezza) // 2
-                area_ritaglio = (x_inizio, y_inizio, larghezza_originale, nuova_altezza)
-
-            # Ritaglia l'immagine
-            immagine_ritagliata = pygame.Surface((area_ritaglio[2], area_ritaglio[3]))
-            immagine_ritagliata.blit(immagine_originale, (0, 0), area_ritaglio)
-
-            # Ridimensiona al formato finale
-            return pygame.transform.scale(immagine_ritagliata, (larghezza_finale, altezza_finale))
-
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Errore nel caricamento dell'immagine: {e}")
-            # Fallback: crea una superficie vuota con la dimensione richiesta
-            superficie = pygame.Surface((larghezza_finale, altezza_finale))
-            superficie.fill((0, 0, 0))  # Riempi di nero
-            return superficie
+        # Riprende la partita salvata richiesta dal menu
+        if self.da_caricare:
+            percorso, self.da_caricare = self.da_caricare, None
+            try:
+                self.carica_partita(percorso)
+            except (OSError, ValueError) as e:
+                print(f"Errore nel caricamento del salvataggio: {e}")
 
     def termina(self):
         """Pulisce le risorse quando la scena non è più attiva"""
@@ -179,45 +264,200 @@ class ScenaGioco(Scena):
 
         # Rimuovi questa scena come osservatore degli eventi
         self.gioco.gestore_eventi.rimuovi_osservatore(self)
+        self.chiudi_fantasma()
+
+        # Un'ultima scrittura del salvataggio automatico, se la partita non è finita
+        if self.scrittore:
+            if self.salvataggio_automatico and not self.game_over_status and not self.riproduttore:
+                self.salva_partita(salvataggio.percorso_automatico(config.CARTELLA_SALVATAGGI))
+            self.scrittore.termina()
+            self.scrittore = None
+
+        # Salva la registrazione della partita appena conclusa
+        if self.registratore:
+            try:
+                percorso = self.registratore.salva(config.CARTELLA_REGISTRAZIONI,
+                                                   self.gioco.orologio_simulazione.tick)
+                print(f"Partita registrata in {percorso}")
+
+                # Il nuovo record diventa il fantasma delle prossime sfide
+                if aggiorna_migliore(config.CARTELLA_REGISTRAZIONI, percorso, self.punteggio):
+                    print(f"Nuovo record: {self.punteggio} punti")
+            except OSError as e:
+                print(f"Errore nel salvataggio della registrazione: {e}")
+            self.registratore = None
+
+
+    def crea_fantasma(self):
+        """Prepara il fantasma della partita migliore, o None se non è disponibile"""
+        from scene.fantasma import Fantasma
+        try:
+            return Fantasma(percorso_migliore(config.CARTELLA_REGISTRAZIONI), round(1 / self.gioco.passo_simulazione))
+        except (OSError, ValueError) as e:
+            print(f"Fantasma non disponibile: {e}")
+            return None
+
+    def chiudi_fantasma(self):
+        """Termina la gara contro il fantasma"""
+        if self.fantasma:
+            self.fantasma.chiudi()
+            self.fantasma = None
 
     def gestisci_evento(self, evento):
         """Gestisce gli eventi di input"""
-        if evento.type == pygame.USEREVENT:
-            # Timer per il game over
-            pygame.time.set_timer(pygame.USEREVENT, 0)  # Disattiva il timer
-            self.gioco.cambia_scena("menu")
+        # Durante una riproduzione o un rewind la tastiera viene ignorata
+        if self.riproduttore or self.gioco.modalita_rewind:
+            return
+
+        # Il rewind è disponibile anche dopo il game over
+        if evento.type == pygame.KEYDOWN and evento.key == pygame.K_r:
+            self.gioco.attiva_rewind()
+            return
+
+        # Slot di salvataggio: F6 cambia slot, F9 carica (anche dopo il game over), F5 salva
+        if evento.key in (pygame.K_F5, pygame.K_F6, pygame.K_F9):
+            if evento.type == pygame.KEYDOWN:
+                self.gestisci_slot(evento.key)
             return
 
         if self.game_over_status:
             return
 
-        if evento.type == pygame.KEYDOWN:
-            if evento.key == pygame.K_LEFT:
-                self.nave_giocatore.movimento_sinistra = True
-            elif evento.key == pygame.K_RIGHT:
-                self.nave_giocatore.movimento_destra = True
-            elif evento.key == pygame.K_UP:
-                self.nave_giocatore.sparo_attivo = True
-
-        elif evento.type == pygame.KEYUP:
-            if evento.key == pygame.K_LEFT:
-                self.nave_giocatore.movimento_sinistra = False
-            elif evento.key == pygame.K_RIGHT:
-                self.nave_giocatore.movimento_destra = False
-            elif evento.key == pygame.K_UP:
-                self.nave_giocatore.sparo_attivo = False
+        comando = self.TASTI_COMANDI.get(evento.key)
+        if comando is not None:
+            self.applica_input(comando, evento.type == pygame.KEYDOWN)
+
+    def gestisci_slot(self, tasto):
+        """Salva, carica o cambia lo slot di salvataggio corrente"""
+        percorso = salvataggio.percorso_slot(config.CARTELLA_SALVATAGGI, self.slot)
+        if tasto == pygame.K_F6:
+            self.slot = self.slot % config.NUMERO_SLOT + 1
+            self.mostra_avviso(f"SLOT {self.slot}")
+        elif tasto == pygame.K_F5:
+            if self.game_over_status:
+                return
+            self.salva_partita(percorso)
+            self.mostra_avviso(f"PARTITA SALVATA NELLO SLOT {self.slot}")
+        else:
+            try:
+                self.carica_partita(percorso)
+                self.mostra_avviso(f"SLOT {self.slot} CARICATO")
+            except FileNotFoundError:
+                self.mostra_avviso(f"SLOT {self.slot} VUOTO")
+            except (OSError, ValueError) as e:
+                print(f"Errore nel caricamento del salvataggio: {e}")
+                self.mostra_avviso(f"SLOT {self.slot} NON VALIDO")
+
+    def mostra_avviso(self, testo):
+        """Mostra per qualche istante un avviso (non fa parte dello stato di gioco)"""
+        self.avviso = testo
+        self.tempo_avviso = pygame.time.get_ticks()
+
+    def ottieni_scrittore(self):
+        """Restituisce lo scrittore dei salvataggi, avviandolo al primo utilizzo"""
+        if self.scrittore is None:
+            self.scrittore = salvataggio.ScrittoreSalvataggi()
+        return self.scrittore
+
+    def sezioni_salvataggio(self):
+        """Restituisce le sezioni del salvataggio: istantanea, seme e registrazione"""
+        sezioni = istantanea.cattura(self)
+        frequenza = round(1 / self.gioco.passo_simulazione)
+        sezioni['partita.seme'] = struct.pack('<QH', self.seme_partita, frequenza)
+        if self.registratore:
+            # La registrazione continua dopo la ripresa e resta riproducibile dall'inizio
+            sezioni['partita.registrazione'] = bytes(self.registratore.corpo)
+            sezioni['partita.ultimo_tick'] = struct.pack('<q', self.registratore.ultimo_tick)
+        return sezioni
+
+    def salva_partita(self, percorso):
+        """Cattura lo stato e ne affida la scrittura al thread dei salvataggi"""
+        self.ottieni_scrittore().richiedi(percorso, self.sezioni_salvataggio())
+
+    def carica_partita(self, percorso):
+        """Riporta la partita allo stato di un salvataggio"""
+        # Una scrittura dello stesso file potrebbe essere ancora in corso
+        if self.scrittore:
+            self.scrittore.attendi()
+        sezioni = salvataggio.leggi(percorso)
+
+        seme, frequenza = struct.unpack('<QH', sezioni['partita.seme'])
+        if frequenza != round(1 / self.gioco.passo_simulazione):
+            raise ValueError(f"Salvataggio a {frequenza} tick/s, il gioco ne usa {round(1 / self.gioco.passo_simulazione)}")
+
+        istantanea.ripristina(self, sezioni)
+        self.seme_partita = seme
+        # Senza gli input precedenti la registrazione non sarebbe riproducibile dall'inizio
+        self.registratore = None
+        if self.registra_input and self.riproduttore is None and 'partita.registrazione' in sezioni:
+            self.registratore = RegistratoreInput(seme, frequenza)
+            self.registratore.corpo = bytearray(sezioni['partita.registrazione'])
+            self.registratore.ultimo_tick, = struct.unpack('<q', sezioni['partita.ultimo_tick'])
+
+        # La storia del rewind apparteneva alla partita precedente, e il
+        # fantasma non è più alla pari
+        self.gioco.gestore_scene.linea_temporale.svuota()
+        self.chiudi_fantasma()
+        self.prepara_passo()
+        self.invalida_rettangoli()
+        self.riparti_scatola_nera()
+        if not self.riproduttore:
+            self.riallinea_comandi()
+
+    def riallinea_comandi(self):
+        """Allinea i comandi della nave ai tasti effettivamente premuti"""
+        for tasto, comando in self.TASTI_COMANDI.items():
+            self.applica_input(comando, bool(self.gioco.gestore_eventi.controlla_tasto_premuto(tasto)))
+
+    def riprendi_dopo_rewind(self):
+        """Riallinea registrazione e comandi quando il gioco riparte dopo un rewind"""
+        # Gli input registrati dopo lo stato ripreso non sono mai avvenuti
+        if self.registratore:
+            self.registratore.tronca(self.gioco.orologio_simulazione.tick)
+        self.riparti_scatola_nera()
+
+        # Il fantasma non torna indietro: dopo un rewind la gara finisce
+        self.chiudi_fantasma()
+
+        # I tasti rilasciati durante il rewind non devono restare premuti
+        self.riallinea_comandi()
+
+    def riparti_scatola_nera(self):
+        """Fa ripartire la scatola nera dallo stato attuale, che non segue quelli registrati"""
+        scatola = self.gioco.scatola_nera
+        if scatola:
+            scatola.nuova_partita(self.seme_partita, round(1 / self.gioco.passo_simulazione))
+            scatola.registra_istantanea(self.gioco.orologio_simulazione.tick, istantanea.cattura(self))
+
+    def applica_input(self, comando, premuto):
+        """Applica alla nave una transizione di comando, registrandola se necessario"""
+        nave = self.nave_giocatore
+        if comando == SINISTRA:
+            cambiato = nave.movimento_sinistra != premuto
+            nave.movimento_sinistra = premuto
+        elif comando == DESTRA:
+            cambiato = nave.movimento_destra != premuto
+            nave.movimento_destra = premuto
+        else:
+            cambiato = nave.sparo_attivo != premuto
+            nave.sparo_attivo = premuto
+
+        if cambiato and self.registratore:
+            self.registratore.registra(self.gioco.orologio_simulazione.tick, comando, premuto)
+        if cambiato and self.gioco.scatola_nera:
+            self.gioco.scatola_nera.registra_input(self.gioco.orologio_simulazione.tick, comando, premuto)
 
     def mostra_messaggio_power_up(self, tipo_power_up):
         """Mostra un messaggio che indica quale power-up è stato raccolto"""
         messaggi = {
-            PowerUp.TIPO_CLEAR_SCREEN: "ELIMINA NEMICI!",
-            PowerUp.TIPO_FIRE_RATE: "VELOCITÀ DI FUOCO +10%!",
-            PowerUp.TIPO_SPEED: "VELOCITÀ MOVIMENTO +10%!",
-            PowerUp.TIPO_EXTRA_LIFE: "VITA EXTRA!"
+            MagazzinoPowerUp.TIPO_CLEAR_SCREEN: "ELIMINA NEMICI!",
+            MagazzinoPowerUp.TIPO_FIRE_RATE: "VELOCITÀ DI FUOCO +10%!",
+            MagazzinoPowerUp.TIPO_SPEED: "VELOCITÀ MOVIMENTO +10%!",
+            MagazzinoPowerUp.TIPO_EXTRA_LIFE: "VITA EXTRA!"
         }
 
         self.messaggio_power_up = messaggi.get(tipo_power_up, "POWER-UP!")
-        self.tempo_messaggio_power_up = pygame.time.get_ticks()
+        self.tempo_messaggio_power_up = self.tempo_simulazione()
 
     def mostra_messaggio_boss(self, sconfitto=False):
         """Mostra un messaggio che indica l'arrivo o la sconfitta del boss"""
@@ -226,49 +466,100 @@ class ScenaGioco(Scena):
         else:
             self.messaggio_power_up = f"BOSS LIVELLO {self.livello_boss} IN ARRIVO!"
 
-        self.tempo_messaggio_power_up = pygame.time.get_ticks()
+        self.tempo_messaggio_power_up = self.tempo_simulazione()
 
     def controlla_boss(self):
         """Controlla se è ora di far apparire il boss"""
         if not self.boss_attivo and self.punteggio - self.punteggio_ultimo_boss >= self.punteggio_intervallo_boss:
             self.livello_boss += 1
-            self.boss = Boss(self.area_gioco, self.livello_boss)
+            self.boss = Boss(self.area_gioco, self.livello_boss, self.parametri_boss, self.casuale)
             self.boss_attivo = True
             self.mostra_messaggio_boss(False)  # Mostra messaggio di arrivo boss
             
             # Elimina tutti i nemici rimanenti sul campo
-            for nemico in self.nemici[:]:
-                nemico.attivo = False
-            self.nemici.clear()
+            self.nemici.svuota()
             
             return True
         return False
 
+    def magazzini(self):
+        """Restituisce i magazzini di tutte le entità in array"""
+        return (self.lasers, self.nemici, self.power_ups, self.laser_boss, self.palle_fuoco)
+
+    def prepara_passo(self):
+        """Memorizza le posizioni correnti prima del passo per l'interpolazione"""
+        for entita in (self.nave_giocatore, self.boss):
+            if entita:
+                entita.x_prec = entita.x
+                entita.y_prec = entita.y
+        for magazzino in self.magazzini():
+            magazzino.prepara_passo()
+
+    def disegna_interpolato(self, schermo, entita, alfa):
+        """Disegna un'entità interpolata tra la posizione precedente e quella attuale"""
+        rect = entita.rect
+        x_reale, y_reale = rect.x, rect.y
+
+        # Le entità appena create non hanno ancora una posizione precedente
+        x_prec = getattr(entita, 'x_prec', entita.x)
+        y_prec = getattr(entita, 'y_prec', entita.y)
+        rect.x = int(x_prec + (entita.x - x_prec) * alfa)
+        rect.y = int(y_prec + (entita.y - y_prec) * alfa)
+
+        area = entita.disegna(schermo)
+
+        # Ripristina il rect usato per le collisioni
+        rect.x, rect.y = x_reale, y_reale
+        return area
+
     def aggiorna(self, delta_tempo):
         """Aggiorna la logica del gioco"""
-        # Controlla se game over
+        # In riproduzione, gli input registrati arrivano prima del tick a cui si riferiscono
+        if self.riproduttore:
+            for _, comando, premuto in self.riproduttore.input_al_tick(self.gioco.orologio_simulazione.tick):
+                self.applica_input(comando, premuto)
+
+        # Il fantasma avanza allo stesso tick della partita
+        if self.fantasma:
+            self.fantasma.passo()
+
+        # Salvataggio automatico periodico: qui si cattura soltanto, la scrittura è in background
+        if (self.salvataggio_automatico and not self.riproduttore and not self.game_over_status
+                and self.gioco.orologio_simulazione.tick % self.passi_salvataggio_automatico() == 0):
+            self.salva_partita(salvataggio.percorso_automatico(config.CARTELLA_SALVATAGGI))
+
+        # Istantanea periodica della scatola nera, dopo gli input del tick come il salvataggio
+        scatola = self.gioco.scatola_nera
+        if scatola and self.gioco.orologio_simulazione.tick % scatola.passi_istantanea() == 0:
+            scatola.registra_istantanea(self.gioco.orologio_simulazione.tick, istantanea.cattura(self))
+
+        # Controlla se game over: torna al menu dopo un breve ritardo
         if self.game_over_status:
+            if self.tempo_simulazione() - self.tempo_game_over >= self.durata_game_over:
+                self.gioco.cambia_scena("menu")
             return
 
         # Aggiorna la nave del giocatore
         self.nave_giocatore.aggiorna(delta_tempo)
 
         # Gestione sparo continuo
-        tempo_corrente = pygame.time.get_ticks()
+        tempo_corrente = self.tempo_simulazione()
         if self.nave_giocatore.sparo_attivo:
             nuovo_laser = self.nave_giocatore.spara(tempo_corrente)
             if nuovo_laser:
-                self.lasers.append(nuovo_laser)
+                self.lasers.aggiungi(*nuovo_laser)
 
         # Aggiorna tutti i laser attivi
-        for laser in self.lasers[:]:
-            laser.aggiorna(delta_tempo)
-            if not laser.attivo:
-                self.lasers.remove(laser)
+        self.lasers.aggiorna(delta_tempo)
+        self.lasers.compatta()
 
         # Controlla se è ora di far apparire il boss
         self.controlla_boss()
 
+        rect_nave = self.nave_giocatore.rect
+        # Tragitto della nave nel passo: i proiettili la colpiscono anche se la attraversano tra due tick
+        movimento_nave = self.movimento(self.nave_giocatore)
+
         # Gestione del boss attivo
         if self.boss_attivo and self.boss:
             # Aggiorna il boss
@@ -277,63 +568,45 @@ class ScenaGioco(Scena):
             # Boss spara laser
             nuovo_laser = self.boss.spara(tempo_corrente)
             if nuovo_laser:
-                self.laser_boss.append(nuovo_laser)
+                self.laser_boss.aggiungi(*nuovo_laser)
 
             # Boss lancia palle di fuoco (dal livello 2 in poi)
-            if self.livello_boss >= 2:
+            if self.boss.usa_palle_fuoco:
                 nuova_palla = self.boss.lancia_palla_fuoco(tempo_corrente)
                 if nuova_palla:
-                    self.palle_fuoco.append(nuova_palla)
-
-            # Aggiorna tutti i laser del boss
-            for laser in self.laser_boss[:]:
-                laser.aggiorna(delta_tempo)
+                    self.palle_fuoco.aggiungi(*nuova_palla)
 
-                # Controlla se il laser ha colpito il giocatore
-                if laser.rect.colliderect(self.nave_giocatore.rect):
-                    self.perdi_vita()
-                    laser.attivo = False
+            # Aggiorna tutti i laser del boss e controlla se hanno colpito il giocatore
+            self.laser_boss.aggiorna(delta_tempo)
+            self.colpisci_giocatore(self.laser_boss, self.laser_boss.collide_nel_passo(movimento_nave))
+            self.laser_boss.compatta()
 
-                # Rimuovi laser non attivi
-                if not laser.attivo:
-                    self.laser_boss.remove(laser)
+            # Aggiorna tutte le palle di fuoco e controlla se hanno colpito il giocatore
+            self.palle_fuoco.aggiorna(delta_tempo)
+            self.colpisci_giocatore(self.palle_fuoco, self.palle_fuoco.collide_nel_passo(movimento_nave))
 
-            # Aggiorna tutte le palle di fuoco
-            for palla in self.palle_fuoco[:]:
-                palla.aggiorna(delta_tempo)
-
-                # Controlla se la palla ha colpito il giocatore
-                if palla.rect.colliderect(self.nave_giocatore.rect):
-                    self.perdi_vita()
-                    palla.attivo = False
-
-                # Se la palla è esplosa, crea i laser dell'esplosione
-                if palla.esplosa:
-                    laser_esplosione = palla.esplodi()
-                    self.laser_boss.extend(laser_esplosione)
-
-                # Rimuovi palle non attive
-                if not palla.attivo:
-                    self.palle_fuoco.remove(palla)
+            # Le palle esplose si trasformano nei laser dell'esplosione
+            for x, y in self.palle_fuoco.centri_esplosioni():
+                self.laser_boss.aggiungi_esplosione(x, y)
+            self.palle_fuoco.compatta()
 
             # Controlla collisioni laser-boss
-            for laser in self.lasers[:]:
-                if self.boss.collide_con(laser.rect):
-                    laser.attivo = False
-                    if self.boss.prendi_danno(1):  # Boss sconfitto
-                        self.boss_attivo = False
-                        self.punteggio_ultimo_boss = self.punteggio
+            for indice in np.flatnonzero(self.lasers.collide_nel_passo(self.movimento(self.boss))).tolist():
+                self.lasers.attivo[indice] = False
+                if self.boss.prendi_danno(1):  # Boss sconfitto
+                    self.boss_attivo = False
+                    self.punteggio_ultimo_boss = self.punteggio
 
-                        # Assegna punti per la sconfitta del boss
-                        punti_boss = 500 * self.livello_boss
-                        self.punteggio += punti_boss
+                    # Assegna punti per la sconfitta del boss
+                    punti_boss = 500 * self.livello_boss
+                    self.punteggio += punti_boss
 
-                        # Mostra messaggio
-                        self.mostra_messaggio_boss(True)  # Messaggio di boss sconfitto
+                    # Mostra messaggio
+                    self.mostra_messaggio_boss(True)  # Messaggio di boss sconfitto
 
-                        # Pulisci i laser e le palle di fuoco del boss
-                        self.laser_boss.clear()
-                        self.palle_fuoco.clear()
+                    # Pulisci i laser e le palle di fuoco del boss
+                    self.laser_boss.svuota()
+                    self.palle_fuoco.svuota()
 
         # Se non c'è un boss attivo, gestisci lo spawn normale dei nemici
         if not self.boss_attivo:
@@ -348,45 +621,54 @@ class ScenaGioco(Scena):
             self.punteggio_ultimo_power_up = self.punteggio
 
         # Aggiorna tutti i power-up attivi
-        for power_up in self.power_ups[:]:
-            power_up.aggiorna(delta_tempo)
-
-            # Controlla se il power-up ha colpito il giocatore
-            if power_up.rect.colliderect(self.nave_giocatore.rect):
-                self.mostra_messaggio_power_up(power_up.tipo)
-                power_up.applica_effetto(self)
-                power_up.attivo = False
-
-            # Rimuovi power-up non attivi
-            if not power_up.attivo:
-                self.power_ups.remove(power_up)
-
-        # Aggiorna tutti i nemici attivi e controlla collisioni con giocatore
-        for nemico in self.nemici[:]:
-            nemico.aggiorna(delta_tempo)
-
-            # Controlla se il nemico ha toccato il fondo
-            if nemico.rect.bottom >= self.nave_giocatore.rect.top:
-                self.perdi_vita()
-                nemico.attivo = False
-
-            # Controlla se il nemico ha colpito il giocatore
-            elif nemico.collide_con(self.nave_giocatore.rect):
-                self.perdi_vita()
-                nemico.attivo = False
-
-            # Rimuovi nemici non attivi
-            if not nemico.attivo:
-                self.nemici.remove(nemico)
-
-        # Controlla collisioni laser-nemico
-        for laser in self.lasers[:]:
-            for nemico in self.nemici[:]:
-                if nemico.collide_con(laser.rect):
-                    laser.attivo = False
-                    if nemico.prendi_danno(1):  # Nemico distrutto
-                        self.punteggio += nemico.punti
-                    break
+        self.power_ups.aggiorna(delta_tempo)
+
+        # Applica i power-up raccolti dal giocatore, nell'ordine in cui sono comparsi
+        if len(self.power_ups):
+            for indice in np.flatnonzero(self.power_ups.collide_nel_passo(movimento_nave)).tolist():
+                tipo = int(self.power_ups.tipo[indice])
+                self.mostra_messaggio_power_up(tipo)
+                self.power_ups.applica_effetto(tipo, self)
+                self.power_ups.attivo[indice] = False
+            self.power_ups.compatta()
+
+        # Aggiorna tutti i nemici e controlla se hanno toccato il fondo o colpito il giocatore
+        self.nemici.aggiorna(delta_tempo)
+        self.griglia_nemici.costruisci(self.nemici.movimenti())
+        _, y, _, altezza = self.nemici.rettangoli()
+        colpiti = y + altezza >= rect_nave.top
+        colpiti[self.griglia_nemici.interroga_rect(rect_nave)] = True
+        self.colpisci_giocatore(self.nemici, colpiti)
+
+        self.nemici.compatta()
+
+        # Controlla collisioni laser-nemico lungo i tragitti del passo: ogni laser colpisce al più il primo nemico.
+        # La griglia va rifatta perché compatta() ha spostato gli indici
+        self.griglia_nemici.costruisci(self.nemici.movimenti())
+        if len(self.nemici) and len(self.lasers):
+            colpiti = self.griglia_nemici.primo_colpito(self.lasers.movimenti())
+            a_segno = colpiti >= 0
+            if a_segno.any():
+                self.lasers.attivo[a_segno] = False
+                self.punteggio += self.nemici.prendi_danno(colpiti[a_segno])
+
+    def movimento(self, entita):
+        """Restituisce il tragitto di un'entità nel passo: (x_inizio, y_inizio, x, y, larghezza, altezza)"""
+        rect = entita.rect
+        # Le entità appena create non hanno ancora una posizione precedente
+        x_prec = getattr(entita, 'x_prec', entita.x)
+        y_prec = getattr(entita, 'y_prec', entita.y)
+        return int(x_prec), int(y_prec), rect.x, rect.y, rect.width, rect.height
+
+    def colpisci_giocatore(self, magazzino, colpiti):
+        """Toglie una vita per ogni entità che ha colpito il giocatore e la disattiva"""
+        for _ in range(int(np.count_nonzero(colpiti))):
+            self.perdi_vita()
+        magazzino.attivo[colpiti] = False
+
+    def passi_salvataggio_automatico(self):
+        """Restituisce il numero di tick tra due salvataggi automatici"""
+        return max(1, round(config.INTERVALLO_SALVATAGGIO_AUTOMATICO / self.gioco.passo_simulazione))
 
     def perdi_vita(self):
         """Gestisce la perdita di una vita"""
@@ -405,86 +687,91 @@ class ScenaGioco(Scena):
         """Gestisce la fine del gioco"""
         self.game_over_status = True
         print("Game Over!")
-        # Torna al menu dopo un breve ritardo
-        pygame.time.set_timer(pygame.USEREVENT, 2000)  # 2 secondi di attesa
+        # Una partita finita non si può più continuare
+        if self.salvataggio_automatico and not self.riproduttore:
+            self.ottieni_scrittore().rimuovi(salvataggio.percorso_automatico(config.CARTELLA_SALVATAGGI))
+        # Il ritorno al menu è gestito in aggiorna, sul tempo simulato
+        self.tempo_game_over = self.tempo_simulazione()
 
     def spawn_nemico(self):
         """Spawna un nuovo nemico in una posizione casuale"""
         # Calcola una posizione x casuale all'interno dell'area di gioco
         min_x = self.area_gioco.left + 10
         max_x = self.area_gioco.right - 70
-        x_pos = random.randint(min_x, max_x)
+        x_pos = self.casuale.spawn.randint(min_x, max_x)
 
         # Tipo di nemico casuale (1, 2 o 3)
-        tipo = random.randint(1, 3)
+        tipo = self.casuale.spawn.randint(1, 3)
 
         # Crea il nemico appena sopra lo schermo
-        nemico = Nemico(x_pos, -50, tipo)
-
-        # Aggiungi alla lista dei nemici attivi
-        self.nemici.append(nemico)
+        self.nemici.aggiungi(x_pos, -50, tipo)
 
     def spawn_power_up(self):
         """Spawna un nuovo power-up in una posizione casuale"""
         # Calcola una posizione x casuale all'interno dell'area di gioco
         min_x = self.area_gioco.left + 10
         max_x = self.area_gioco.right - 40
-        x_pos = random.randint(min_x, max_x)
+        x_pos = self.casuale.power_up.randint(min_x, max_x)
 
-        # Crea il power-up appena sopra lo schermo
-        power_up = PowerUp(x_pos, -30)
+        # Crea il power-up appena sopra lo schermo, di un tipo casuale
+        self.power_ups.aggiungi(x_pos, -30, self.casuale.power_up.randint(0, 3))
 
-        # Aggiungi alla lista dei power-up attivi
-        self.power_ups.append(power_up)
+    def invalida_rettangoli(self):
+        """Richiede di ridisegnare tutto lo schermo al prossimo frame"""
+        self.ridisegno_completo = True
 
     def disegna(self, schermo):
-        """Disegna gli elementi del gioco"""
-        # Disegna lo sfondo su tutto lo schermo
-        schermo.blit(self.sfondo, (0, 0))
+        """Disegna gli elementi del gioco e restituisce le aree modificate"""
+        if self.ridisegno_completo:
+            # Disegna lo sfondo su tutto lo schermo
+            schermo.blit(self.sfondo, (0, 0))
+        else:
+            # Ripristina lo sfondo solo dove si trovavano gli elementi nel frame precedente
+            for rect in self.rettangoli_precedenti:
+                schermo.blit(self.sfondo, rect, rect)
 
         # Disegna un bordo per l'area di gioco
         pygame.draw.rect(schermo, (100, 100, 100), self.area_gioco, 2)
 
-        # Disegna la nave del giocatore
-        self.nave_giocatore.disegna(schermo)
+        # Aree modificate in questo frame
+        rettangoli = []
+
+        # Frazione di passo per l'interpolazione tra gli ultimi due stati
+        alfa = self.gioco.alfa_interpolazione
 
-        # Disegna tutti i laser attivi
-        for laser in self.lasers:
-            laser.disegna(schermo)
+        # Disegna la nave del giocatore
+        rettangoli.append(self.disegna_interpolato(schermo, self.nave_giocatore, alfa))
 
-        # Disegna tutti i nemici attivi
-        for nemico in self.nemici:
-            nemico.disegna(schermo)
+        # Nave e punteggio del fantasma
+        if self.fantasma:
+            rettangoli.extend(self.fantasma.disegna(schermo, alfa, self.area_gioco))
 
-        # Disegna tutti i power-up attivi
-        for power_up in self.power_ups:
-            power_up.disegna(schermo)
+        # Disegna tutti i laser, i nemici e i power-up, un blits per magazzino
+        rettangoli.extend(self.lasers.disegna(schermo, alfa))
+        rettangoli.extend(self.nemici.disegna(schermo, alfa))
+        rettangoli.extend(self.power_ups.disegna(schermo, alfa))
 
         # Disegna il boss se attivo
         if self.boss_attivo and self.boss:
-            self.boss.disegna(schermo)
-
-        # Disegna tutti i laser del boss
-        for laser in self.laser_boss:
-            laser.disegna(schermo)
+            rettangoli.append(self.disegna_interpolato(schermo, self.boss, alfa))
 
-        # Disegna tutte le palle di fuoco
-        for palla in self.palle_fuoco:
-            palla.disegna(schermo)
+        # Disegna tutti i laser del boss e le palle di fuoco
+        rettangoli.extend(self.laser_boss.disegna(schermo, alfa))
+        rettangoli.extend(self.palle_fuoco.disegna(schermo, alfa))
 
         # Disegna il punteggio e le vite
-        font = pygame.font.SysFont("Arial", 24)
+        font = ottieni_font("Arial", 24)
         testo_punteggio = font.render(f"Punti: {self.punteggio}", True, (255, 255, 255))
-        schermo.blit(testo_punteggio, (self.area_gioco.left + 10, 20))
+        rettangoli.append(schermo.blit(testo_punteggio, (self.area_gioco.left + 10, 20)))
 
         testo_vite = font.render(f"Vite: {self.vite}", True, (255, 255, 255))
-        schermo.blit(testo_vite, (self.area_gioco.right - testo_vite.get_width() - 10, 20))
+        rettangoli.append(schermo.blit(testo_vite, (self.area_gioco.right - testo_vite.get_width() - 10, 20)))
 
         # Disegna il messaggio del power-up se è attivo
-        tempo_corrente = pygame.time.get_ticks()
+        tempo_corrente = self.tempo_simulazione()
         if self.messaggio_power_up and tempo_corrente - self.tempo_messaggio_power_up < self.durata_messaggio_power_up:
             # Crea un font più grande per il messaggio del power-up
-            font_power_up = pygame.font.SysFont("Arial", 36, bold=True)
+            font_power_up = ottieni_font("Arial", 36, True)
 
             # Crea il rendering del testo con un colore vivace
             testo_power_up = font_power_up.render(self.messaggio_power_up, True, (255, 255, 0))
@@ -497,112 +784,73 @@ class ScenaGioco(Scena):
             sfondo_msg = pygame.Surface((testo_power_up.get_width() + 20, testo_power_up.get_height() + 10))
             sfondo_msg.set_alpha(150)  # Imposta trasparenza
             sfondo_msg.fill((0, 0, 0))  # Colore nero
-            schermo.blit(sfondo_msg, (pos_x - 10, pos_y - 5))
+            rettangoli.append(schermo.blit(sfondo_msg, (pos_x - 10, pos_y - 5)))
 
             # Disegna il testo
             schermo.blit(testo_power_up, (pos_x, pos_y))
 
+        # Avvisi dei salvataggi, in basso al centro
+        if self.avviso and pygame.time.get_ticks() - self.tempo_avviso < self.durata_avviso:
+            testo_avviso = ottieni_font("Arial", 20).render(self.avviso, True, (200, 200, 255))
+            pos_x = (config.GIOCO_LARGHEZZA - testo_avviso.get_width()) // 2
+            rettangoli.append(schermo.blit(testo_avviso, (pos_x, config.GIOCO_ALTEZZA - 40)))
+
         # Mostra game over
         if self.game_over_status:
-            font_game_over = pygame.font.SysFont("Arial", 72, bold=True)
+            font_game_over = ottieni_font("Arial", 72, True)
             testo_game_over = font_game_over.render("GAME OVER", True, (255, 0, 0))
             pos_x = (self.gioco.schermo.get_width() - testo_game_over.get_width()) // 2
             pos_y = (self.gioco.schermo.get_height() - testo_game_over.get_height()) // 2
-            schermo.blit(testo_game_over, (pos_x, pos_y))
+            rettangoli.append(schermo.blit(testo_game_over, (pos_x, pos_y)))
 
-    def salva_stato(self):
-        """Salva lo stato attuale per il rewind"""
-        stato = {
-            'nave_x': self.nave_giocatore.x,
-            'nave_y': self.nave_giocatore.y,
-            'lasers': [(laser.x, laser.y) for laser in self.lasers],
-            'punteggio': self.punteggio,
-            'vite': self.vite
-        }
-
-        # Salva lo stato del boss se attivo
-        if self.boss_attivo and self.boss:
-            stato['boss_attivo'] = True
-            stato['boss_x'] = self.boss.x
-            stato['boss_y'] = self.boss.y
-            stato['boss_salute'] = self.boss.salute
-            stato['laser_boss'] = [(laser.x, laser.y) for laser in self.laser_boss]
-            stato['palle_fuoco'] = [(palla.x, palla.y) for palla in self.palle_fuoco]
+        # Le aree da aggiornare sono quelle vecchie (da ripulire) e quelle nuove
+        if self.ridisegno_completo:
+            aree_modificate = [schermo.get_rect()]
+            self.ridisegno_completo = False
         else:
-            stato['boss_attivo'] = False
+            aree_modificate = self.rettangoli_precedenti + rettangoli
+        self.rettangoli_precedenti = rettangoli
+        return aree_modificate
 
-        return stato
+    def salva_stato(self):
+        """Salva lo stato completo della scena per il rewind"""
+        return istantanea.cattura(self)
+
+    def impronta_stato(self):
+        """Restituisce un crc32 dello stato della simulazione, per confrontare due esecuzioni"""
+        return istantanea.impronta(istantanea.cattura(self))
+
+    def conteggi_entita(self):
+        """Restituisce il numero di entità vive per tipo, per il profiler"""
+        return {
+            'lasers': len(self.lasers),
+            'nemici': len(self.nemici),
+            'laser_boss': len(self.laser_boss),
+            'palle_fuoco': len(self.palle_fuoco),
+            'power_ups': len(self.power_ups),
+        }
 
     def carica_stato(self, stato):
         """Carica uno stato salvato durante il rewind"""
-        if not stato:
-            return
-
-        if 'nave_x' in stato:
-            self.nave_giocatore.x = stato['nave_x']
-            self.nave_giocatore.y = stato['nave_y']
-            self.nave_giocatore.rect.x = int(self.nave_giocatore.x)
-            self.nave_giocatore.rect.y = int(self.nave_giocatore.y)
-
-            # Ricrea i laser nella posizione salvata
-            self.lasers = []
-            if 'lasers' in stato:
-                for pos_laser in stato['lasers']:
-                    self.lasers.append(Laser(pos_laser[0], pos_laser[1]))
-
-            # Ripristina il punteggio e le vite
-            if 'punteggio' in stato:
-                self.punteggio = stato['punteggio']
-            if 'vite' in stato:
-                self.vite = stato['vite']
-                self.nave_giocatore.danno = 3 - self.vite
-                self.nave_giocatore.immagine = self.nave_giocatore.immagini[self.nave_giocatore.danno]
-
-            # Ripristina lo stato del boss
-            if 'boss_attivo' in stato:
-                self.boss_attivo = stato['boss_attivo']
-
-                if self.boss_attivo:
-                    # Se il boss era attivo ma non c'è più, ricrealo
-                    if not self.boss:
-                        self.boss = Boss(self.area_gioco, self.livello_boss)
-
-                    # Ripristina la posizione e la salute del boss
-                    if 'boss_x' in stato and 'boss_y' in stato:
-                        self.boss.x = stato['boss_x']
-                        self.boss.y = stato['boss_y']
-                        self.boss.rect.x = int(self.boss.x)
-                        self.boss.rect.y = int(self.boss.y)
-
-                    if 'boss_salute' in stato:
-                        self.boss.salute = stato['boss_salute']
-
-                    # Ricrea i laser del boss
-                    self.laser_boss = []
-                    if 'laser_boss' in stato:
-                        for pos_laser in stato['laser_boss']:
-                            self.laser_boss.append(BossLaser(pos_laser[0], pos_laser[1]))
-
-                    # Ricrea le palle di fuoco
-                    self.palle_fuoco = []
-                    if 'palle_fuoco' in stato:
-                        for pos_palla in stato['palle_fuoco']:
-                            self.palle_fuoco.append(PallaDiFuoco(pos_palla[0], pos_palla[1]))
-                else:
-                    # Se il boss non era attivo, assicurati che sia rimosso
-                    self.boss = None
-                    self.laser_boss.clear()
-                    self.palle_fuoco.clear()
+        if stato:
+            istantanea.ripristina(self, stato)
 
 
 class Nave:
     """Classe che rappresenta la nave del giocatore"""
 
+    __slots__ = ('area_gioco', 'larghezza', 'altezza', 'x', 'y', 'x_prec', 'y_prec', 'rect', 'velocita',
+                 'movimento_sinistra', 'movimento_destra', 'sparo_attivo', 'ritardo_sparo',
+                 'tempo_ultimo_sparo', 'danno', 'immagini', 'immagine')
+
+    LARGHEZZA = 50  # Modificato da 40
+    ALTEZZA = 50    # Modificato da 40
+
     def __init__(self, area_gioco):
         """Inizializza la nave del giocatore"""
         self.area_gioco = area_gioco
-        self.larghezza = 50  # Modificato da 40
-        self.altezza = 50    # Modificato da 40
+        self.larghezza = self.LARGHEZZA
+        self.altezza = self.ALTEZZA
         self.x = area_gioco.centerx - self.larghezza // 2
         self.y = area_gioco.bottom - self.altezza - 10
 
@@ -629,19 +877,13 @@ class Nave:
     def carica_immagini(self):
         """Carica le immagini della nave per i diversi livelli di danno"""
         immagini = []
-        nomi_file = [
-            "Main Ship - Base - Full health.png",  # Nave intatta
-            "Main Ship - Base - Slight damage.png",  # Danno leggero
-            "Main Ship - Base - Damaged.png",  # Danno medio
-            "Main Ship - Base - Very damaged.png"  # Danno grave
-        ]
-
-        for nome_file in nomi_file:
+
+        for nome_file in FILE_NAVE:
             try:
                 # Fix the path to match the actual directory structure
                 percorso = os.path.join("entita", "Nave", nome_file)
-                immagine = pygame.image.load(percorso).convert_alpha()
-                immagini.append(pygame.transform.scale(immagine, (self.larghezza, self.altezza)))
+                immagini.append(caricatore_risorse().ottieni_immagine(
+                    percorso, (self.larghezza, self.altezza), alpha=True))
             except Exception as e:
                 print(f"Errore nel caricamento dell'immagine {nome_file}: {e}")
                 # Create a placeholder with different color based on damage level
@@ -683,7 +925,7 @@ class Nave:
         self.rect.y = int(self.y)
 
     def spara(self, tempo_corrente):
-        """Spara un laser se è possibile"""
+        """Spara un laser se è possibile e ne restituisce la posizione, o None"""
         # Verifica che sia passato abbastanza tempo dall'ultimo sparo
         if tempo_corrente - self.tempo_ultimo_sparo < self.ritardo_sparo:
             return None
@@ -691,8 +933,8 @@ class Nave:
         x_laser = self.x + (self.larghezza // 2) - 2  # 2 è metà della larghezza del laser
         y_laser = self.y - 5  # Poco sopra la nave
         self.tempo_ultimo_sparo = tempo_corrente
-        return Laser(x_laser, y_laser)
+        return x_laser, y_laser
     
     def disegna(self, schermo):
-        """Disegna la nave sullo schermo"""
-        schermo.blit(self.immagine, self.rect)
\ No newline at end of file
+        """Disegna la nave sullo schermo e restituisce l'area modificata"""
+        return schermo.blit(self.immagine, self.rect)
\ No newline at end of file
@@ -10,6 +10,9 @@ import math
 import os
 import time
 from core.scena import Scena
+from core.font import ottieni_font
+from core.risorse import caricatore_risorse
+from scene.gioco import precarica_risorse
 import config
 
 class ScenaIntroduzione(Scena):
@@ -92,20 +95,23 @@ class ScenaIntroduzione(Scena):
         
         # Prepara i font (monospace per effetto terminale) - simplifié
         try:
-            self.font_titolo = pygame.font.SysFont("Arial", 28, bold=True)
-            self.font_testo = pygame.font.SysFont("Arial", 20)
+            self.font_titolo = ottieni_font("Arial", 28, True)
+            self.font_testo = ottieni_font("Arial", 20)
         except Exception as e:
             print(f"Errore nel caricare i font: {e}")
             # Fallback con font di sistema
             self.font_titolo = pygame.font.Font(None, 32)
             self.font_testo = pygame.font.Font(None, 24)
         
+        # Mentre il brief viene digitato, le immagini della partita si caricano in background
+        precarica_risorse()
+
         # Memorizza il tempo di inizio
         self.tempo_inizio = pygame.time.get_ticks()
         self.tempo_ultimo_carattere = self.tempo_inizio  # Inizializza anche questo
         
         # Aggiungi questa scena come osservatore degli eventi
-        self.gioco.gestore_eventi.aggiungi_osservatore(self)
+        self.gioco.gestore_eventi.aggiungi_osservatore(self, tipi=(pygame.KEYDOWN,), tasti=(pygame.K_ESCAPE,))
         
         # Imposta timer per quando il tasto skip diventa disponibile
         self.tempo_skip = pygame.time.get_ticks() + 2000  # 2 secondi prima di poter saltare
@@ -226,7 +232,7 @@ class ScenaIntroduzione(Scena):
         
         # Mostra suggerimento per saltare l'introduzione con ESC - position fixe en bas
         try:
-            font_hint = pygame.font.SysFont("Courier New", 18)  # Police plus grande
+            font_hint = ottieni_font("Courier New", 18)  # Police plus grande
             hint_text = font_hint.render("Premi ESC per saltare", True, (200, 200, 200))  # Couleur plus claire
             pos_x = 20
             pos_y = self.gioco.altezza - hint_text.get_height() - 20
@@ -236,6 +242,20 @@ class ScenaIntroduzione(Scena):
         
         # Dessinez une ligne de test juste pour vérifier que le rendu fonctionne
         pygame.draw.line(schermo, (255, 0, 0), (10, 10), (100, 10), 2)
+
+        # Barra di avanzamento del caricamento delle risorse
+        self.disegna_progresso(schermo)
+
+    def disegna_progresso(self, schermo):
+        """Disegna l'avanzamento del caricamento delle risorse della partita"""
+        progresso = caricatore_risorse().progresso()
+        larghezza_barra = 200
+        altezza_barra = 8
+        x_barra = self.gioco.larghezza - larghezza_barra - 20
+        y_barra = self.gioco.altezza - altezza_barra - 28
+
+        pygame.draw.rect(schermo, (0, 60, 0), (x_barra, y_barra, larghezza_barra, altezza_barra), 1)
+        pygame.draw.rect(schermo, (0, 255, 0), (x_barra, y_barra, int(larghezza_barra * progresso), altezza_barra))
     
     def disegna_effetto_crt(self, schermo):
         """Disegna un effetto CRT sul terminale"""
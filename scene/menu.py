@@ -9,6 +9,10 @@ import pygame
 import os
 import subprocess
 from core.scena import Scena
+from core.font import ottieni_font
+from core.risorse import caricatore_risorse
+from core import salvataggio
+from core.record import punteggio_migliore
 import config
 
 class MenuPrincipale(Scena):
@@ -17,6 +21,7 @@ class MenuPrincipale(Scena):
     def __init__(self, gioco):
         """Inizializza la scena del menu principale"""
         super().__init__(gioco)
+        self.dimensione_logica = (config.MENU_LARGHEZZA, config.MENU_ALTEZZA)
         self.font_titolo = None
         self.font_pulsante = None
         self.colore_titolo = (255, 255, 0)  # Giallo
@@ -24,7 +29,13 @@ class MenuPrincipale(Scena):
         self.colore_pulsante_hover = (150, 150, 255)  # Blu più chiaro quando hover
         self.pulsante_start = None
         self.mouse_su_pulsante = False
+        self.pulsante_continua = None  # Presente solo se c'è una partita da continuare
+        self.mouse_su_continua = False
+        self.pulsante_fantasma = None  # Presente solo se c'è una partita migliore registrata
+        self.mouse_su_fantasma = False
+        self.record = None
         self.immagine_sfondo = None
+        self.attrazione = None  # ModalitaAttrazione dietro al menu, se attiva
         
         # Konami code: ↑ ↑ ↓ ↓ ← → ← → B A Enter
         self.konami_code = [
@@ -38,48 +49,6 @@ class MenuPrincipale(Scena):
         self.konami_index = 0
         self.konami_attivato = False
     
-    def carica_e_ritaglia_immagine(self, percorso, larghezza_finale, altezza_finale):
-        """Carica un'immagine e la ritaglia mantenendo la parte centrale"""
-        try:
-            # Carica l'immagine originale
-            immagine_originale = pygame.image.load(percorso).convert()
-            
-            # Dimensioni originali
-            larghezza_originale = immagine_originale.get_width()
-            altezza_originale = immagine_originale.get_height()
-            
-            # Calcola il rapporto di aspetto
-            rapporto_originale = larghezza_originale / altezza_originale
-            rapporto_finale = larghezza_finale / altezza_finale
-            
-            # Determina come ritagliare l'immagine in base ai rapports
-            if rapporto_originale > rapporto_finale:
-                # L'immagine è troppo large, la rogniamo sur les côtés
-                nuova_larghezza = int(altezza_originale * rapporto_finale)
-                x_inizio = (larghezza_originale - nuova_larghezza) // 2
-                y_inizio = 0
-                area_ritaglio = (x_inizio, y_inizio, nuova_larghezza, altezza_originale)
-            else:
-                # L'immagine è troppo haute, la rogniamo en haut et en bas
-                nuova_altezza = int(larghezza_originale / rapporto_finale)
-                x_inizio = 0
-                y_inizio = (altezza_originale - nuova_altezza) // 2
-                area_ritaglio = (x_inizio, y_inizio, larghezza_originale, nuova_altezza)
-            
-            # Ritaglia l'immagine
-            immagine_ritagliata = pygame.Surface((area_ritaglio[2], area_ritaglio[3]))
-            immagine_ritagliata.blit(immagine_originale, (0, 0), area_ritaglio)
-            
-            # Ridimensiona al formato finale
-            return pygame.transform.scale(immagine_ritagliata, (larghezza_finale, altezza_finale))
-            
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Errore nel caricamento dell'immagine: {e}")
-            # Fallback: crea una superficie vuota con la dimensione richiesta
-            superficie = pygame.Surface((larghezza_finale, altezza_finale))
-            superficie.fill((0, 0, 0))  # Riempi di nero
-            return superficie
-    
     def inizializza(self):
         """Inizializza gli elementi del menu"""
         super().inizializza()
@@ -87,19 +56,20 @@ class MenuPrincipale(Scena):
         # Carica l'immagine di sfondo
         percorso_immagine = os.path.join("assets", "img", "sfondo_menu.jpg")  # Adjust as needed
         try:
-            self.immagine_sfondo = self.carica_e_ritaglia_immagine(
+            self.immagine_sfondo = caricatore_risorse().ottieni_immagine(
                 percorso_immagine,
-                config.MENU_LARGHEZZA,  # Usa la larghezza del menu
-                config.MENU_ALTEZZA     # Usa l'altezza del menu
+                (config.MENU_LARGHEZZA, config.MENU_ALTEZZA),  # Usa le dimensioni del menu
+                ritaglia=True
             )
-        except (pygame.error, FileNotFoundError):
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Errore nel caricamento dell'immagine: {e}")
             # Fallback se l'immagine non può essere caricata
             self.immagine_sfondo = pygame.Surface((config.MENU_LARGHEZZA, config.MENU_ALTEZZA))
             self.immagine_sfondo.fill((0, 0, 0))
         
         # Carica i font
-        self.font_titolo = pygame.font.SysFont("Arial", 64, bold=True)
-        self.font_pulsante = pygame.font.SysFont("Arial", 36)
+        self.font_titolo = ottieni_font("Arial", 64, True)
+        self.font_pulsante = ottieni_font("Arial", 36)
         
         # Definisci il pulsante di start
         larghezza_pulsante = 200
@@ -108,9 +78,32 @@ class MenuPrincipale(Scena):
         pos_y = (config.MENU_ALTEZZA - altezza_pulsante) // 2 + 50
         
         self.pulsante_start = pygame.Rect(pos_x, pos_y, larghezza_pulsante, altezza_pulsante)
+
+        # Il pulsante CONTINUA riprende l'ultima partita salvata automaticamente
+        self.pulsante_continua = None
+        self.mouse_su_continua = False
+        if os.path.exists(salvataggio.percorso_automatico(config.CARTELLA_SALVATAGGI)):
+            self.pulsante_continua = self.pulsante_start.move(0, altezza_pulsante + 20)
+
+        # Il pulsante SFIDA gareggia contro il fantasma della partita migliore
+        self.pulsante_fantasma = None
+        self.mouse_su_fantasma = False
+        self.record = punteggio_migliore(config.CARTELLA_REGISTRAZIONI)
+        if self.record is not None:
+            sopra = self.pulsante_continua or self.pulsante_start
+            self.pulsante_fantasma = sopra.move(0, altezza_pulsante + 20)
         
+        # Partite registrate come sfondo animato
+        if config.MODALITA_ATTRAZIONE:
+            from scene.attrazione import ModalitaAttrazione
+            self.attrazione = ModalitaAttrazione(config.CARTELLA_REGISTRAZIONI, config.ATTRAZIONE_BUDGET_CPU,
+                                                 config.ATTRAZIONE_ATTESA, (config.MENU_LARGHEZZA, config.MENU_ALTEZZA))
+
         # Aggiungi questo menu come osservatore degli eventi
-        self.gioco.gestore_eventi.aggiungi_osservatore(self)
+        self.gioco.gestore_eventi.aggiungi_osservatore(
+            self,
+            tipi=(pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.USEREVENT)
+        )
         
         # Reimposta l'indice Konami
         self.konami_index = 0
@@ -122,6 +115,10 @@ class MenuPrincipale(Scena):
         
         # Rimuovi questo menu come osservatore degli eventi
         self.gioco.gestore_eventi.rimuovi_osservatore(self)
+
+        if self.attrazione:
+            self.attrazione.chiudi()
+            self.attrazione = None
     
     def attiva_easter_egg(self):
         """Attiva l'easter egg quando il codice Konami è completato"""
@@ -142,15 +139,32 @@ class MenuPrincipale(Scena):
     
     def gestisci_evento(self, evento):
         """Gestisce gli eventi del menu"""
+        # Al primo input la dimostrazione si ferma e il menu ha tutta la CPU
+        if self.attrazione and evento.type != pygame.USEREVENT:
+            self.attrazione.segnala_input()
+
         if evento.type == pygame.MOUSEMOTION:
             # Controlla se il mouse è sopra il pulsante
             self.mouse_su_pulsante = self.pulsante_start.collidepoint(evento.pos)
+            self.mouse_su_continua = bool(self.pulsante_continua and self.pulsante_continua.collidepoint(evento.pos))
+            self.mouse_su_fantasma = bool(self.pulsante_fantasma and self.pulsante_fantasma.collidepoint(evento.pos))
         
         elif evento.type == pygame.MOUSEBUTTONDOWN:
             if evento.button == 1 and self.mouse_su_pulsante:  # Clic sinistro
                 print("Avvio dell'introduzione")
                 # Prima passa alla scena di introduzione
                 self.gioco.cambia_scena("intro")
+            elif evento.button == 1 and self.mouse_su_continua:
+                print("Ripresa della partita salvata")
+                # Salta l'introduzione e riparte dal salvataggio automatico
+                scena_gioco = self.gioco.gestore_scene.ottieni_scena("gioco")
+                scena_gioco.da_caricare = salvataggio.percorso_automatico(config.CARTELLA_SALVATAGGI)
+                self.gioco.cambia_scena("gioco")
+            elif evento.button == 1 and self.mouse_su_fantasma:
+                print("Sfida al fantasma della partita migliore")
+                scena_gioco = self.gioco.gestore_scene.ottieni_scena("gioco")
+                scena_gioco.sfida_fantasma = True
+                self.gioco.cambia_scena("gioco")
         
         elif evento.type == pygame.KEYDOWN:
             tasto_premuto = pygame.key.name(evento.key)
@@ -178,12 +192,15 @@ class MenuPrincipale(Scena):
     
     def aggiorna(self, delta_tempo):
         """Aggiorna la logica del menu"""
-        pass
+        if self.attrazione:
+            self.attrazione.aggiorna(delta_tempo)
     
     def disegna(self, schermo):
         """Disegna gli elementi del menu"""
-        # Disegna lo sfondo
-        if self.immagine_sfondo:
+        # Disegna lo sfondo: la partita dimostrativa o l'immagine fissa
+        if self.attrazione and self.attrazione.disegna():
+            schermo.blit(self.attrazione.sfondo, (0, 0))
+        elif self.immagine_sfondo:
             schermo.blit(self.immagine_sfondo, (0, 0))
         else:
             # Fallback se l'immagine non può essere caricata
@@ -203,10 +220,29 @@ class MenuPrincipale(Scena):
         testo_start = self.font_pulsante.render("INIZIO", True, (255, 255, 255))
         testo_rect = testo_start.get_rect(center=self.pulsante_start.center)
         schermo.blit(testo_start, testo_rect)
+
+        # Pulsante per continuare la partita salvata
+        if self.pulsante_continua:
+            colore_attuale = self.colore_pulsante_hover if self.mouse_su_continua else self.colore_pulsante
+            pygame.draw.rect(schermo, colore_attuale, self.pulsante_continua, border_radius=10)
+            pygame.draw.rect(schermo, (255, 255, 255), self.pulsante_continua, 2, border_radius=10)
+            testo_continua = self.font_pulsante.render("CONTINUA", True, (255, 255, 255))
+            schermo.blit(testo_continua, testo_continua.get_rect(center=self.pulsante_continua.center))
+
+        # Pulsante per la sfida al fantasma, con il record da battere
+        if self.pulsante_fantasma:
+            colore_attuale = self.colore_pulsante_hover if self.mouse_su_fantasma else self.colore_pulsante
+            pygame.draw.rect(schermo, colore_attuale, self.pulsante_fantasma, border_radius=10)
+            pygame.draw.rect(schermo, (255, 255, 255), self.pulsante_fantasma, 2, border_radius=10)
+            testo_fantasma = self.font_pulsante.render("SFIDA", True, (255, 255, 255))
+            schermo.blit(testo_fantasma, testo_fantasma.get_rect(center=self.pulsante_fantasma.center))
+            testo_record = ottieni_font("Arial", 18).render(f"Record: {self.record}", True, (200, 200, 200))
+            schermo.blit(testo_record, testo_record.get_rect(midleft=(self.pulsante_fantasma.right + 15,
+                                                                      self.pulsante_fantasma.centery)))
         
         # Mostra piccole stelle per indicare il progresso del codice Konami
         if self.konami_index >= 2:  # Mostra solo dopo aver iniziato la sequenza
-            font_stars = pygame.font.SysFont("Arial", 12)
+            font_stars = ottieni_font("Arial", 12)
             stars_text = ""
             
             # Aggiungi una stella per ogni tasto corretto inserito
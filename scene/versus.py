@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+"""
+Scena della modalità versus
+Due navi sulla stessa ondata di nemici, una per giocatore, sincronizzate in
+rete con il rollback: vince chi resiste più a lungo
+"""
+
+import pygame
+from core.scena import Scena
+from core.font import ottieni_font
+from core.headless import GiocoHeadless
+from core.pilota import PilotaAutomatico
+from core.rete import SessioneRollback, maschera_comandi, COMANDI
+import config
+from scene.gioco import ScenaGioco
+
+
+class PartitaVersus:
+    """Le due metà della partita, simulate in lockstep senza finestra
+
+    Ogni giocatore ha una ScenaGioco con il proprio orologio, i propri flussi
+    casuali e lo stesso seme: le due ondate sono identiche.
+    """
+
+    def __init__(self, seme, frequenza=config.FREQUENZA_SIMULAZIONE):
+        """Crea e avvia le due metà della partita"""
+        self.giochi = []
+        self.scene = []
+        for _ in range(2):
+            gioco = GiocoHeadless(frequenza)
+            scena = ScenaGioco(gioco)
+            scena.seme = seme
+            scena.registra_input = False
+            scena.salvataggio_automatico = False
+            gioco.gestore_scene.aggiungi_scena("gioco", scena)
+            gioco.cambia_scena("gioco")
+            self.giochi.append(gioco)
+            self.scene.append(scena)
+
+    def simula(self, maschere):
+        """Simula un frame di entrambe le metà con le maschere dei comandi"""
+        for indice, maschera in enumerate(maschere):
+            scena = self.scene[indice]
+            if not scena.game_over_status:
+                for comando in COMANDI:
+                    scena.applica_input(comando, bool(maschera & (1 << comando)))
+            self.giochi[indice].passo()
+
+    def salva_stato(self):
+        """Restituisce le istantanee di entrambe le metà"""
+        return [scena.salva_stato() for scena in self.scene]
+
+    def carica_stato(self, stati):
+        """Riporta entrambe le metà alle istantanee indicate"""
+        for scena, stato in zip(self.scene, stati):
+            scena.carica_stato(stato)
+
+    def vincitore(self):
+        """Restituisce l'indice del vincitore, -1 per il pareggio, None se si gioca ancora"""
+        finiti = [scena.game_over_status for scena in self.scene]
+        if not any(finiti):
+            return None
+        if all(finiti):
+            # Eliminati nello stesso frame: decide il punteggio
+            punteggi = [scena.punteggio for scena in self.scene]
+            if punteggi[0] == punteggi[1]:
+                return -1
+            return punteggi.index(max(punteggi))
+        return finiti.index(False)
+
+
+class AvversarioAutomatico:
+    """Secondo giocatore guidato dal pilota automatico, per le prove in loopback"""
+
+    def __init__(self, seme, trasporto, giocatore):
+        """Crea la partita e la sessione dell'avversario"""
+        self.partita = PartitaVersus(seme)
+        self.sessione = SessioneRollback(self.partita, trasporto, giocatore,
+                                         config.VERSUS_RITARDO_INPUT, config.VERSUS_MAX_ROLLBACK)
+        self.pilota = PilotaAutomatico(seme)
+        self.giocatore = giocatore
+
+    def avanza(self):
+        """Decide i tasti in base alla propria metà e avanza la sessione di un frame"""
+        scena = self.partita.scene[self.giocatore]
+        self.pilota.decidi(scena, scena.gioco.orologio_simulazione.tempo)
+        comandi = [ScenaGioco.TASTI_COMANDI[tasto] for tasto in self.pilota.tasti_premuti]
+        return self.sessione.avanza(maschera_comandi(comandi))
+
+
+class ScenaVersus(Scena):
+    """Scena della partita versus: la propria metà a sinistra, l'avversario a destra"""
+
+    def __init__(self, gioco):
+        """Inizializza la scena versus"""
+        super().__init__(gioco)
+        self.dimensione_logica = (config.GIOCO_LARGHEZZA * 2, config.GIOCO_ALTEZZA)
+
+        # Da impostare prima di attivare la scena
+        self.trasporto = None
+        self.giocatore = 0
+        self.seme = 0
+        self.avversario = None  # AvversarioAutomatico opzionale (loopback)
+
+        self.partita = None
+        self.sessione = None
+        self.superfici = []
+        self.risultato = None
+        self.tempo_risultato = 0
+        self.durata_risultato = 4000  # Millisecondi prima di tornare al menu
+
+    def inizializza(self):
+        """Avvia la partita e la sessione di rete"""
+        super().inizializza()
+        self.partita = PartitaVersus(self.seme)
+        self.sessione = SessioneRollback(self.partita, self.trasporto, self.giocatore,
+                                         config.VERSUS_RITARDO_INPUT, config.VERSUS_MAX_ROLLBACK)
+        self.superfici = [pygame.Surface((config.GIOCO_LARGHEZZA, config.GIOCO_ALTEZZA)) for _ in range(2)]
+        self.risultato = None
+
+        # I tasti vengono letti dall'istantanea dell'input, ma devono entrare nella coda
+        self.gioco.gestore_eventi.aggiungi_osservatore(
+            self,
+            tipi=(pygame.KEYDOWN, pygame.KEYUP),
+            tasti=tuple(ScenaGioco.TASTI_COMANDI) + (pygame.K_ESCAPE,)
+        )
+
+    def termina(self):
+        """Chiude la connessione"""
+        super().termina()
+        self.gioco.gestore_eventi.rimuovi_osservatore(self)
+        if self.sessione:
+            self.sessione.chiudi()
+        if self.avversario:
+            self.avversario.sessione.chiudi()
+            self.avversario = None
+
+    def gestisci_evento(self, evento):
+        """ESC abbandona la partita"""
+        if evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE:
+            self.gioco.cambia_scena("menu")
+
+    def maschera_locale(self):
+        """Legge i comandi del giocatore locale dai tasti premuti"""
+        gestore = self.gioco.gestore_eventi
+        comandi = [comando for tasto, comando in ScenaGioco.TASTI_COMANDI.items()
+                   if gestore.controlla_tasto_premuto(tasto)]
+        return maschera_comandi(comandi)
+
+    def aggiorna(self, delta_tempo):
+        """Avanza la sessione di rete di un frame"""
+        if self.risultato is not None:
+            if pygame.time.get_ticks() - self.tempo_risultato >= self.durata_risultato:
+                self.gioco.cambia_scena("menu")
+            return
+
+        if self.avversario:
+            self.avversario.avanza()
+        self.sessione.avanza(self.maschera_locale())
+
+        # Il risultato vale solo su frame simulati con input remoti confermati
+        if self.sessione.confermato():
+            vincitore = self.partita.vincitore()
+            if vincitore is not None:
+                self.risultato = vincitore
+                self.tempo_risultato = pygame.time.get_ticks()
+
+    def disegna(self, schermo):
+        """Disegna le due metà affiancate"""
+        # La propria metà sempre a sinistra
+        ordine = (self.giocatore, 1 - self.giocatore)
+        for posizione, indice in enumerate(ordine):
+            superficie = self.superfici[indice]
+            self.partita.scene[indice].disegna(superficie)
+            schermo.blit(superficie, (posizione * config.GIOCO_LARGHEZZA, 0))
+
+        font = ottieni_font("Arial", 20)
+        schermo.blit(font.render("TU", True, (100, 255, 100)), (20, config.GIOCO_ALTEZZA - 30))
+        schermo.blit(font.render("AVVERSARIO", True, (255, 100, 100)),
+                     (config.GIOCO_LARGHEZZA + 20, config.GIOCO_ALTEZZA - 30))
+
+        # Stato della rete
+        sessione = self.sessione
+        if sessione.frame - sessione.ultimo_remoto > sessione.max_rollback:
+            testo = "IN ATTESA DELL'AVVERSARIO..."
+        else:
+            testo = (f"frame {sessione.frame}  rollback {sessione.rollback} "
+                     f"(max {sessione.rollback_massimo})  attese {sessione.attese}")
+        superficie_testo = ottieni_font("Arial", 16).render(testo, True, (200, 200, 200))
+        schermo.blit(superficie_testo, (config.GIOCO_LARGHEZZA - superficie_testo.get_width() // 2, 5))
+
+        if self.risultato is not None:
+            if self.risultato == -1:
+                testo, colore = "PAREGGIO", (255, 255, 0)
+            elif self.risultato == self.giocatore:
+                testo, colore = "HAI VINTO!", (100, 255, 100)
+            else:
+                testo, colore = "HAI PERSO", (255, 80, 80)
+            superficie_testo = ottieni_font("Arial", 72, True).render(testo, True, colore)
+            schermo.blit(superficie_testo, superficie_testo.get_rect(center=schermo.get_rect().center))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+"""
+Simulazioni batch di ScenaGioco
+Esegue migliaia di partite con seme e input scriptati su tutti i core,
+anche al variare dei parametri di bilanciamento
+
+Esempio:
+    python simulazione_batch.py --partite 2000 \
+        --parametro intervallo_spawn_base=1200,1500,1800 \
+        --parametro boss.salute_per_livello=3,5
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Nessuna finestra né audio: va impostato prima che pygame venga inizializzato,
+# anche nei processi worker che reimportano questo modulo
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import config
+
+# Stato del processo worker, creato una sola volta da inizializza_worker
+_gioco_worker = None
+
+
+def inizializza_worker(frequenza):
+    """Prepara pygame senza finestra nel processo worker"""
+    global _gioco_worker
+    from core.headless import GiocoHeadless
+    _gioco_worker = GiocoHeadless(frequenza_simulazione=frequenza)
+
+
+def esegui_partita(compito):
+    """Esegue una partita completa e ne restituisce le statistiche"""
+    from scene.gioco import ScenaGioco
+    from core.pilota import PilotaAutomatico
+
+    indice_combinazione, parametri, seme, durata_massima = compito
+    gioco = _gioco_worker
+    gioco.orologio_simulazione.azzera()
+
+    # Scena nuova per ogni partita, così i parametri non si accumulano
+    scena = ScenaGioco(gioco)
+    scena.applica_parametri(parametri)
+    scena.seme = seme
+    scena.registra_input = False
+    scena.salvataggio_automatico = False
+    gioco.gestore_scene.aggiungi_scena("gioco", scena)
+
+    pilota = PilotaAutomatico(seme)
+    max_passi = int(durata_massima / gioco.passo_simulazione)
+
+    # Le stampe di debug delle scene non servono su migliaia di partite
+    with contextlib.redirect_stdout(io.StringIO()):
+        gioco.cambia_scena("gioco")
+        passi = 0
+        while passi < max_passi and not scena.game_over_status:
+            for evento in pilota.decidi(scena, gioco.orologio_simulazione.tempo):
+                gioco.invia_evento(evento)
+            gioco.passo()
+            passi += 1
+        scena.termina()
+
+    return {
+        'combinazione': indice_combinazione,
+        'seme': seme,
+        'sopravvivenza': gioco.orologio_simulazione.tempo,
+        'punteggio': scena.punteggio,
+        'livello_boss': scena.livello_boss,
+        'game_over': scena.game_over_status,
+    }
+
+
+def interpreta_valore(testo):
+    """Converte un valore della riga di comando in int o float"""
+    try:
+        return int(testo)
+    except ValueError:
+        return float(testo)
+
+
+def parametro_valido(nome):
+    """Verifica che il nome corrisponda a un parametro di bilanciamento"""
+    from scene.gioco import ScenaGioco
+    from logic.boss import Boss
+
+    if nome.startswith("boss."):
+        return nome[len("boss."):] in Boss.PARAMETRI_PREDEFINITI
+    return nome in ScenaGioco.PARAMETRI_BILANCIAMENTO
+
+
+def interpreta_griglia(specifiche):
+    """Converte le specifiche nome=v1,v2 nella lista di combinazioni di parametri"""
+    nomi = []
+    valori = []
+    for specifica in specifiche:
+        nome, _, elenco = specifica.partition("=")
+        if not elenco:
+            raise ValueError(f"Specifica di parametro non valida: {specifica}")
+        nome = nome.strip()
+        if not parametro_valido(nome):
+            raise ValueError(f"Parametro di bilanciamento sconosciuto: {nome}")
+        nomi.append(nome)
+        valori.append([interpreta_valore(v) for v in elenco.split(",")])
+
+    return [dict(zip(nomi, combinazione)) for combinazione in itertools.product(*valori)]
+
+
+def percentile(valori, p):
+    """Restituisce il percentile p (0-100) di una lista già ordinata"""
+    if not valori:
+        return 0
+    indice = min(len(valori) - 1, int(round(p / 100 * (len(valori) - 1))))
+    return valori[indice]
+
+
+def aggrega(risultati):
+    """Calcola le statistiche aggregate di un gruppo di partite"""
+    sopravvivenze = sorted(r['sopravvivenza'] for r in risultati)
+    punteggi = sorted(r['punteggio'] for r in risultati)
+    livelli = [r['livello_boss'] for r in risultati]
+    return {
+        'partite': len(risultati),
+        'sopravvivenza_media': statistics.fmean(sopravvivenze),
+        'sopravvivenza_mediana': statistics.median(sopravvivenze),
+        'sopravvivenza_p95': percentile(sopravvivenze, 95),
+        'punteggio_medio': statistics.fmean(punteggi),
+        'punteggio_mediano': statistics.median(punteggi),
+        'punteggio_p95': percentile(punteggi, 95),
+        'livello_boss_medio': statistics.fmean(livelli),
+        'livello_boss_massimo': max(livelli),
+        'sopravvissute': sum(1 for r in risultati if not r['game_over']),
+    }
+
+
+def esegui_batch(combinazioni, partite, seme_base, durata_massima, frequenza, processi):
+    """Distribuisce le partite sui processi e aggrega i risultati per combinazione"""
+    compiti = [
+        (indice, parametri, seme_base + n, durata_massima)
+        for indice, parametri in enumerate(combinazioni)
+        for n in range(partite)
+    ]
+
+    # Blocchi abbastanza grandi da ammortizzare il costo del pickling
+    blocco = max(1, len(compiti) // (processi * 8))
+
+    risultati_per_combinazione = [[] for _ in combinazioni]
+    # "spawn" evita di ereditare lo stato SDL del processo principale
+    contesto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processi, mp_context=contesto,
+                             initializer=inizializza_worker, initargs=(frequenza,)) as esecutore:
+        for risultato in esecutore.map(esegui_partita, compiti, chunksize=blocco):
+            risultati_per_combinazione[risultato['combinazione']].append(risultato)
+
+    return [aggrega(risultati) for risultati in risultati_per_combinazione]
+
+
+def stampa_tabella(combinazioni, statistiche):
+    """Stampa i risultati aggregati in forma tabellare"""
+    for parametri, stat in zip(combinazioni, statistiche):
+        descrizione = ", ".join(f"{nome}={valore}" for nome, valore in parametri.items()) or "predefiniti"
+        print(f"[{descrizione}]")
+        print(f"  partite: {stat['partite']}  (sopravvissute al limite: {stat['sopravvissute']})")
+        print(f"  sopravvivenza (s): media {stat['sopravvivenza_media']:.1f}  "
+              f"mediana {stat['sopravvivenza_mediana']:.1f}  p95 {stat['sopravvivenza_p95']:.1f}")
+        print(f"  punteggio: media {stat['punteggio_medio']:.0f}  "
+              f"mediana {stat['punteggio_mediano']:.0f}  p95 {stat['punteggio_p95']:.0f}")
+        print(f"  livello boss: medio {stat['livello_boss_medio']:.2f}  massimo {stat['livello_boss_massimo']}")
+
+
+def salva_csv(percorso, combinazioni, statistiche):
+    """Salva i risultati aggregati in un file CSV"""
+    nomi_parametri = sorted({nome for parametri in combinazioni for nome in parametri})
+    with open(percorso, "w", newline="") as file:
+        scrittore = csv.writer(file)
+        scrittore.writerow(nomi_parametri + list(statistiche[0].keys()))
+        for parametri, stat in zip(combinazioni, statistiche):
+            scrittore.writerow([parametri.get(nome, "") for nome in nomi_parametri] + list(stat.values()))
+
+
+def main():
+    """Punto di ingresso da riga di comando"""
+    parser = argparse.ArgumentParser(description="Simulazioni batch di Invasori Infinito")
+    parser.add_argument("--partite", type=int, default=100, help="partite per combinazione di parametri")
+    parser.add_argument("--seme", type=int, default=0, help="seme della prima partita")
+    parser.add_argument("--durata-max", type=float, default=600.0, help="secondi simulati massimi per partita")
+    parser.add_argument("--frequenza", type=int, default=config.FREQUENZA_SIMULAZIONE, help="tick logici al secondo")
+    parser.add_argument("--processi", type=int, default=os.cpu_count(), help="processi worker")
+    parser.add_argument("--parametro", action="append", default=[], metavar="NOME=V1,V2",
+                        help="valori da esplorare; prefisso 'boss.' per Boss.PARAMETRI_PREDEFINITI")
+    parser.add_argument("--csv", help="file CSV dove salvare i risultati aggregati")
+    argomenti = parser.parse_args()
+
+    try:
+        combinazioni = interpreta_griglia(argomenti.parametro) if argomenti.parametro else [{}]
+    except ValueError as errore:
+        parser.error(str(errore))
+
+    inizio = time.perf_counter()
+    statistiche = esegui_batch(combinazioni, argomenti.partite, argomenti.seme,
+                               argomenti.durata_max, argomenti.frequenza, argomenti.processi)
+    durata = time.perf_counter() - inizio
+
+    stampa_tabella(combinazioni, statistiche)
+    totale = len(combinazioni) * argomenti.partite
+    print(f"{totale} partite in {durata:.1f} s su {argomenti.processi} processi")
+
+    if argomenti.csv:
+        salva_csv(argomenti.csv, combinazioni, statistiche)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+Modalità versus in rete
+Avvia una partita a due giocatori sincronizzata con il rollback, su UDP
+oppure in loopback contro il pilota automatico con latenza, jitter e perdita
+di pacchetti simulati
+
+Esempi:
+    python versus.py --giocatore 0 --remoto 192.168.1.20
+    python versus.py --giocatore 1 --remoto 192.168.1.10
+    python versus.py --loopback --latenza 80 --jitter 30 --perdita 0.05
+    python versus.py --loopback --senza-finestra --frame 3600
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import config
+
+
+def impronta(stati):
+    """Restituisce l'impronta delle istantanee di entrambe le metà della partita"""
+    from logic import istantanea
+    return tuple(istantanea.impronta(stato) for stato in stati)
+
+
+def simula_loopback(frame, latenza, jitter, perdita, seme):
+    """Gioca una partita tra due piloti automatici in loopback, senza finestra
+
+    Usa un orologio simulato, quindi è riproducibile. Restituisce le due
+    sessioni e il numero di frame confermati in cui gli stati non coincidono.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from core.rete import crea_loopback
+    from scene.versus import AvversarioAutomatico
+
+    tick = [0]
+    orologio = lambda: tick[0] / config.FREQUENZA_SIMULAZIONE
+    trasporti = crea_loopback(latenza, jitter, perdita, seme, orologio)
+    giocatori = [AvversarioAutomatico(seme, trasporti[indice], indice) for indice in range(2)]
+
+    # Impronte degli stati confermati (quelli a cui si arriva solo con input
+    # remoti ricevuti), per verificare che i due lati coincidano
+    impronte = [{}, {}]
+    with contextlib.redirect_stdout(io.StringIO()):
+        while min(giocatore.sessione.frame for giocatore in giocatori) < frame:
+            for indice, giocatore in enumerate(giocatori):
+                giocatore.avanza()
+                sessione = giocatore.sessione
+                base = sessione.primo_frame_stati()
+                for frame_stato in range(base, min(sessione.ultimo_remoto + 2, sessione.frame)):
+                    if frame_stato not in impronte[indice]:
+                        impronte[indice][frame_stato] = impronta(sessione.stati[frame_stato - base])
+            tick[0] += 1
+
+    comuni = impronte[0].keys() & impronte[1].keys()
+    divergenze = sum(1 for frame_comune in comuni if impronte[0][frame_comune] != impronte[1][frame_comune])
+    return [giocatore.sessione for giocatore in giocatori], len(comuni), divergenze
+
+
+def avvia_finestra(trasporto, giocatore, seme, avversario=None):
+    """Apre la finestra del gioco direttamente sulla partita versus"""
+    import pygame
+    from core.gioco import Gioco
+    from core.font import avvia_ricerca_font
+
+    pygame.display.init()
+    pygame.font.init()
+    avvia_ricerca_font()
+
+    gioco = Gioco(titolo=config.TITOLO_GIOCO + " - Versus", larghezza=config.LARGHEZZA_SCHERMO,
+                  altezza=config.ALTEZZA_SCHERMO, fps=config.FPS)
+    gioco.gestore_scene.registra_scena("intro", "scene.introduzione", "ScenaIntroduzione")
+    gioco.gestore_scene.registra_scena("menu", "scene.menu", "MenuPrincipale")
+    gioco.gestore_scene.registra_scena("gioco", "scene.gioco", "ScenaGioco")
+    gioco.gestore_scene.registra_scena("versus", "scene.versus", "ScenaVersus")
+
+    scena = gioco.gestore_scene.ottieni_scena("versus")
+    scena.trasporto = trasporto
+    scena.giocatore = giocatore
+    scena.seme = seme
+    scena.avversario = avversario
+    gioco.cambia_scena("versus")
+
+    try:
+        gioco.esegui()
+    finally:
+        pygame.quit()
+
+
+def main():
+    """Punto di ingresso da riga di comando"""
+    parser = argparse.ArgumentParser(description="Partita versus di Invasori Infinito")
+    parser.add_argument("--giocatore", type=int, choices=(0, 1), default=0, help="indice di questo giocatore")
+    parser.add_argument("--remoto", help="host dell'altro giocatore (UDP)")
+    parser.add_argument("--porta", type=int, default=config.VERSUS_PORTA,
+                        help="porta del giocatore 0; il giocatore 1 usa quella successiva")
+    parser.add_argument("--seme", type=int, default=1, help="seme della partita, uguale per entrambi")
+    parser.add_argument("--loopback", action="store_true", help="gioca contro il pilota automatico in locale")
+    parser.add_argument("--latenza", type=float, default=60, help="latenza simulata in ms (loopback)")
+    parser.add_argument("--jitter", type=float, default=20, help="jitter simulato in ms (loopback)")
+    parser.add_argument("--perdita", type=float, default=0.0, help="probabilità di perdere un pacchetto (loopback)")
+    parser.add_argument("--senza-finestra", action="store_true", help="prova in loopback tra due piloti automatici")
+    parser.add_argument("--frame", type=int, default=3600, help="frame da simulare senza finestra")
+    argomenti = parser.parse_args()
+
+    latenza = argomenti.latenza / 1000
+    jitter = argomenti.jitter / 1000
+
+    if argomenti.senza_finestra:
+        inizio = time.perf_counter()
+        sessioni, confermati, divergenze = simula_loopback(argomenti.frame, latenza, jitter,
+                                                           argomenti.perdita, argomenti.seme)
+        durata = time.perf_counter() - inizio
+        for indice, sessione in enumerate(sessioni):
+            print(f"giocatore {indice}: {sessione.frame} frame, {sessione.rollback} rollback, "
+                  f"{sessione.frame_risimulati} frame risimulati (max {sessione.rollback_massimo}, "
+                  f"{sessione.tempo_rollback_massimo * 1000:.2f} ms), {sessione.attese} attese")
+        print(f"{confermati} frame confermati confrontati, {divergenze} divergenze, {durata:.2f} s")
+        return 1 if divergenze else 0
+
+    if argomenti.loopback:
+        from core.rete import crea_loopback
+        from scene.versus import AvversarioAutomatico
+
+        locale, remoto = crea_loopback(latenza, jitter, argomenti.perdita, argomenti.seme)
+        avversario = AvversarioAutomatico(argomenti.seme, remoto, 1 - argomenti.giocatore)
+        avvia_finestra(locale, argomenti.giocatore, argomenti.seme, avversario)
+        return 0
+
+    if not argomenti.remoto:
+        parser.error("Indicare --remoto oppure --loopback")
+
+    from core.rete import TrasportoUDP
+    porta_locale = argomenti.porta + argomenti.giocatore
+    porta_remota = argomenti.porta + 1 - argomenti.giocatore
+    trasporto = TrasportoUDP(porta_locale, (argomenti.remoto, porta_remota))
+    avvia_finestra(trasporto, argomenti.giocatore, argomenti.seme)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())